@@ -11,15 +11,42 @@ st.set_page_config(
 )
 
 # ---------- Imports ----------
-import fitz  # PyMuPDF
 import pandas as pd
-import re
-from io import StringIO
-import csv as pycsv
-from datetime import datetime, timedelta
+from io import BytesIO
+from datetime import datetime
+import atexit
+import math
 import os
-import requests
-
+import time
+
+from pepco_catalog import ProductCatalog
+from pepco_core import (
+    WASHING_CODES,
+    build_datafile_csv,
+    build_sheet_filename,
+    enrich_sheet,
+    extract_document,
+    finalize_sheet,
+    history_issues,
+    map_item_class_to_dept_label,
+    open_extraction_cache,
+    open_history,
+    open_reference_snapshots,
+    open_reference_store,
+    prescan_issues,
+    resolve_price_tier,
+    sheet_records,
+)
+from pepco_export import DatafileBundle
+from pepco_history import HistoryEntry
+from pepco_layout import LAYOUT_STATS
+from pepco_materials import MaterialTable
+from pepco_prices import PRICE_MATCH_MODES
+from pepco_reader import PdfDocument, as_document
+from pepco_pool import SheetPool
+from pepco_prescan import OrderIdPrescan
+from pepco_profile import ProfileRun, ProfileStore
+from pepco_trace import TRACER, traced
 
 # ================================================================
 #  LOGO & THEME
@@ -141,705 +168,333 @@ def check_password():
 # ================================================================
 #  CONSTANTS & MAPPINGS
 # ================================================================
-WASHING_CODES = {
-    '1': '১২৩৪৫', '2': '১৪৭৮৫', '3': 'djnst', '4': 'djnpt', '5': 'djnqt',
-    '6': 'djnqt', '7': 'gjnpt', '8': 'gjnpu', '9': 'gjnqt', '10': 'gjnqu',
-    '11': 'ijnst', '12': 'ijnsu', '13': 'ijnpu', '14': 'ijnsv', '15': 'djnsw'
+# WASHING_CODES → pepco_core.py
+
+PRICE_MATCH_LABELS = {
+    'exact': "Exact",
+    'nearest': "Nearest tier",
+    'next_higher': "Next higher tier",
 }
 
-COLLECTION_MAPPING = {
-    'b': {
-        'CROCO CLUB': 'MODERN 1',
-        'LITTLE SAILOR': 'MODERN 2',
-        'EXPLORE THE WORLD': 'MODERN 3',
-        'JURASIC ADVENTURE': 'MODERN 4',
-        'WESTERN SPIRIT': 'CLASSIC 1',
-        'SUMMER FUN': 'CLASSIC 2'
-    },
-    'a': {
-        'Rainbow Girl': 'MODERN 1',
-        'NEONS PICNIC': 'MODERN 2',
-        'COUNTRY SIDE': 'ROMANTIC 2',
-        'ESTER GARDENG': 'ROMANTIC 3'
-    },
-    'd': {
-        'LITTLE TREASURE': 'MODERN 1',
-        'DINO FRIENDS': 'CLASSIC 1',
-        'EXOTIC ANIMALS': 'CLASSIC 2'
-    },
-    'd_girls': {
-        'SWEEET PASTELS': 'MODERN 1',
-        'PORCELAIN': 'ROMANTIC 2',
-        'SUMMER VIBE': 'ROMANTIC 3'
-    },
-    'yg': {
-        'CUTE_JUMP': 'COLLECTION_1',
-        'SWEET_HEART': 'COLLECTION_2',
-        'DAISY': 'COLLECTION_3',
-        'SPECIAL OCC': 'COLLECTION_4',
-        'LILALOV': 'COLLECTION_5',
-        'COOL GIRL': 'COLLECTION_6',
-        'DEL MAR': 'COLLECTION_7'
-    }
+MULTI_SHEET_LABELS = {
+    'merged': "Merged (Order-IDs joined)",
+    'per_sheet': "One DATAFILE per sheet",
+}
+
+HISTORY_LOOKUP_LABELS = {
+    'barcode': "Barcode",
+    'sku': "SKU",
+    'order_id': "Order-ID",
+    'style': "Style",
+    'season': "Season",
 }
 
+# COLLECTION_MAPPING + classification rules → pepco_classify.py
+
 
 # ================================================================
 # PART 2 — DATA LOADERS + HELPER FUNCTIONS
 # ================================================================
 
+# Sheet URLs + CSV parsers → pepco_core.py
+
+
 # ================================================================
-#  PRICE DATA LOADER (Google Sheet)
+#  LOCAL SNAPSHOTS (SQLite, refreshed in background)
 # ================================================================
-@st.cache_data(ttl=600)
-def load_price_data():
-    """Load currency price ladder from Google Sheet."""
-    try:
-        url = (
-            "https://docs.google.com/spreadsheets/d/e/"
-            "2PACX-1vRdAQmBHwDEWCgmLdEdJc0HsFYpPSyERPHLwmr2tnTYU1BDWdBD6I0ZYfEDzataX0wTNhfLfnm-Te6w/"
-            "pub?gid=583402611&single=true&output=csv"
-        )
-        df = pd.read_csv(url)
+@st.cache_resource
+def get_reference_snapshots():
+    """Process-wide snapshot manager; starts the background refresher."""
+    snapshots = open_reference_snapshots()
+    snapshots.start()
+    return snapshots
 
-        if df.empty:
-            st.error("Price data sheet is empty")
-            return None
 
-        # Convert to dictionary {currency: [values]}
-        price_data = {}
-        for currency in df.columns:
-            price_data[currency] = df[currency].dropna().tolist()
+@st.cache_resource
+def get_reference_store():
+    """Built reference objects shared read-only by every session (swapped on refresh)."""
+    return open_reference_store(get_reference_snapshots())
 
-        return price_data
 
+# ================================================================
+#  PRICE DATA LOADER (Google Sheet)
+# ================================================================
+# ---------- Indexed ladder, built once per sheet version ----------
+@traced("load.prices")
+def load_price_ladder():
+    """Shared PriceLadder for the current price sheet version (None if unavailable)."""
+    try:
+        return get_reference_store().get("prices")
     except Exception as e:
         st.error(f"Failed to load price data: {str(e)}")
         return None
 
 
 # ================================================================
-#  PRODUCT TRANSLATION LOADER
+#  PRODUCT TRANSLATION LOADER (catalog index, built once per sheet version)
 # ================================================================
-@st.cache_data(ttl=600)
-def load_product_translations():
-    """Load product name translations from Google Sheet."""
+@traced("load.catalog")
+def load_product_catalog():
+    """Shared ProductCatalog for the current translation sheet version (empty on failure)."""
     try:
-        sheet_id = "1ue68TSJQQedKa7sVBB4syOc0OXJNaLS7p9vSnV52mKA"
-        sheet_name = "SS26 Product_Name"
-        encoded = requests.utils.quote(sheet_name)
-
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={encoded}"
-        df = pd.read_csv(url)
+        catalog = get_reference_store().get("translations")
 
-        if df.empty:
+        if catalog.empty:
             st.error("Loaded translations but sheet appears empty")
 
-        return df
+        return catalog
 
     except Exception as e:
         st.error(f"❌ Failed to load translations: {str(e)}")
-        return pd.DataFrame()
+        return ProductCatalog(None)
 
 
 # ================================================================
 #  MATERIAL TRANSLATION LOADER
 # ================================================================
-@st.cache_data(ttl=600)
+@traced("load.materials")
 def load_material_translations():
-    """Load material translations (AL, MK) with fallback."""
+    """Shared material translations (AL, MK) with fallback."""
     try:
-        url = (
-            "https://docs.google.com/spreadsheets/d/e/"
-            "2PACX-1vRdAQmBHwDEWCgmLdEdJc0HsFYpPSyERPHLwmr2tnTYU1BDWdBD6I0ZYfEDzataX0wTNhfLfnm-Te6w/"
-            "pub?gid=1096440227&single=true&output=csv"
-        )
-        df = pd.read_csv(url)
-
-        # Empty → go fallback
-        if df.empty:
-            st.warning("Material translations sheet empty — using fallback.")
-            raise ValueError("Empty sheet")
-
-        material_translations = []
-
-        for _, row in df.iterrows():
-            # Material name
-            name = None
-            if 'Name' in row and pd.notna(row['Name']):
-                name = row['Name']
-            else:
-                try:
-                    name = row.iloc[0]
-                except Exception:
-                    name = None
-
-            if not name or pd.isna(name):
-                continue
-
-            # Add AL & MK groups
-            for lang in ['AL', 'MK']:
-                tr = row.get(lang, "")
-                tr = "" if pd.isna(tr) else tr
-
-                material_translations.append({
-                    'material': name,
-                    'language': lang,
-                    'translation': tr
-                })
-
-        if not material_translations:
-            raise ValueError("No material rows produced")
-
-        return pd.DataFrame(material_translations)
+        return get_reference_store().get("materials")
 
     except Exception as e:
         # Fallback
         st.warning(f"Could not load material translations ({e}). Using fallback.")
-        fallback = [
-            {'material': 'Cotton', 'language': 'AL', 'translation': 'Cotton'},
-            {'material': 'Cotton', 'language': 'MK', 'translation': 'Cotton'}
-        ]
-        return pd.DataFrame(fallback)
+        return MaterialTable({('Cotton', 'AL'): 'Cotton', ('Cotton', 'MK'): 'Cotton'})
 
 
 # ================================================================
 #  HELPER FUNCTIONS
 # ================================================================
+# Pure helpers (price detection, classification, colour, SKU/barcode
+# pairing, DATAFILE builders) → pepco_core.py
 
-# ---------- Auto detect PLN price from PDF text ----------
-def detect_pl_sales_price(full_text):
-    try:
-        m = re.search(r"PL\s+[^\n]*?(\d+[\.,]\d+)", full_text)
-        if m:
-            return m.group(1).replace(',', '.')
-    except Exception:
-        pass
-    return None
-
-
-# ---------- Format numbers (PLN, EUR, RON, etc) ----------
-def format_number(value, currency):
-    """Format numeric pricing based on currency."""
-    try:
-        if isinstance(value, str):
-            value = float(value.replace(',', '.'))
-
-        if currency in ['EUR', 'BGN', 'BAM', 'RON', 'PLN']:
-            formatted = f"{float(value):,.2f}".replace(".", ",")
-
-            if ',' in formatted:
-                parts = formatted.split(',')
-                parts[0] = parts[0].replace('.', '')  # remove thousand separator
-                formatted = ','.join(parts)
-
-            return formatted
-
-        return str(int(float(value)))
-
-    except (ValueError, TypeError):
-        return str(value)
+# ---------- Issues from pepco_core → UI messages ----------
+def show_issues(issues):
+    """st.error / st.warning / st.info per Issue."""
+    for issue in issues:
+        getattr(st, issue.level, st.warning)(issue.message)
 
 
 # ---------- Match PLN to price ladder ----------
-def find_closest_price(pln_value):
-    """Returns matching row of other currencies for the PLN price."""
-    try:
-        price_data = load_price_data()
-
-        if not price_data or 'PLN' not in price_data:
-            st.error("❌ Price data not available")
-            return None
-
-        pln_value = float(pln_value)
-        ladder = price_data['PLN']
-
-        if pln_value not in ladder:
-            st.error(f"❌ PLN {pln_value} not found in price sheet.")
-            return None
-
-        idx = ladder.index(pln_value)
-
-        return {
-            currency: format_number(values[idx], currency)
-            for currency, values in price_data.items()
-            if currency != 'PLN'
-        }
-
-    except Exception as e:
-        st.error(f"Invalid price value: {str(e)}")
-        return None
-
-
-# ---------- Classification → mapping ----------
-def get_classification_type(item_class):
-    """Determine class type key used in COLLECTION_MAPPING."""
-    if not item_class:
-        return None
-
-    ic = item_class.lower()
-
-    if 'younger girls outerwear' in ic:
-        return 'yg'
-    if 'baby boys outerwear' in ic:
-        return 'b'
-    if 'baby girls outerwear' in ic:
-        return 'a'
-    if 'baby boys essentials' in ic:
-        return 'd'
-    if 'baby girls essentials' in ic:
-        return 'd_girls'
-    if 'younger boys outerwear' in ic:
-        return 'yg'
-    if 'older girls outerwear' in ic:
-        return 'yg'
-    if 'older boys outerwear' in ic:
-        return 'yg'
-    if 'ladies outerwear' in ic:
-        return 'a'
-    if 'mens outerwear' in ic:
-        return 'b'
-
-    return None
-
-
-# ---------- Map Item_classification → Dept label ----------
-def map_item_class_to_dept_label(item_class):
-    """Map item_class text to UI Department names."""
-    if not item_class:
-        return None
-
-    ic = item_class.lower()
-
-    if 'baby boys outerwear' in ic or 'baby boys essentials' in ic:
-        return "Baby Boy"
-    if 'baby girls outerwear' in ic or 'baby girls essentials' in ic:
-        return "Baby Girl"
-    if 'younger boys outerwear' in ic or 'older boys outerwear' in ic:
-        return "Boys"
-    if 'younger girls outerwear' in ic or 'older girls outerwear' in ic:
-        return "Girls"
-    if 'ladies outerwear' in ic:
-        return "Women"
-    if 'mens outerwear' in ic:
-        return "Mens"
-
-    return None
-
-
-# ---------- Map Item_classification → DEPT column ----------
-def get_dept_value(item_class):
-    """Maps classification → BABY / KIDS / TEENS / WOMEN / MEN."""
-    if not item_class:
-        return ""
-
-    ic = item_class.lower()
-
-    if any(x in ic for x in ['baby boys', 'baby girls']):
-        return "BABY"
-    if any(x in ic for x in ['younger boys', 'younger girls']):
-        return "KIDS"
-    if any(x in ic for x in ['older girls', 'older boys']):
-        return "TEENS"
-    if 'ladies outerwear' in ic:
-        return "WOMEN"
-    if 'mens outerwear' in ic:
-        return "MEN"
-
-    return ""
-
-
-# ---------- Modify collection name (add B/G) ----------
-def modify_collection(collection, item_class):
-    """Append B/G based on gender groups."""
-    if not item_class:
-        return collection
-
-    ic = item_class.lower()
-
-    if any(x in ic for x in ['younger boys', 'older boys']):
-        return f"{collection} B"
-
-    if any(x in ic for x in ['younger girls', 'older girls']):
-        return f"{collection} G"
-
-    return collection
-
-# ---------- Item_name_EN ----------
-
-
-def clean_item_name_english(name: str) -> str:
+def match_price_tier(pln_value, ladder=None, mode="exact"):
     """
-    Item_name_EN থেকে নিচের prefix গুলো বাদ দিয়ে
-    বাকি অংশ CAPITAL LETTERS এ রিটার্ন করবে।
+    Returns (ladder PLN, {currency: formatted}) for the PLN price,
+    or (None, None). mode: exact / nearest / next_higher.
     """
-    if not isinstance(name, str):
-        return ""
-
-    text = name.strip()
-    lower = text.lower()
-
-    # লম্বা phrase আগে, তারপর ছোট – যেন "baby girl basic" থাকলে
-    # শুধু "baby girl" কেটে না যায়।
-    prefixes = [
-        "baby girl basic",
-        "baby boy basic",
-        "baby girl",
-        "baby boy",
-        "girl's",
-        "boy's",
-        "men's",
-        "women's",
-    ]
-
-    for p in prefixes:
-        if lower.startswith(p):
-            # prefix এর দৈর্ঘ্য অনুযায়ী কাটবো
-            cut_len = len(p)
-            text = text[cut_len:].strip(" -_,./").strip()
-            break
-
-    # সবশেষে CAPITAL
-    return text.upper()
+    if ladder is None:
+        ladder = load_price_ladder()
 
+    match = resolve_price_tier(pln_value, ladder, mode)
+    show_issues(match.issues)
+    return match.pln, match.values
 
 
 # ================================================================
 # PART 3 — PDF EXTRACTION + MATERIAL SYSTEM + TRANSLATION FORMATTER
 # ================================================================
-import re
-
 
 # ================================================================
-#  COLOUR EXTRACTION (multiple PDF layout compatible)
+#  COLOUR FALLBACK (widget; detection itself → pepco_core.py)
 # ================================================================
-def extract_colour_from_page2(text, page_number=1):
-    """Old function: Extract colour from page2."""
-    try:
-        m = re.search(
-            r"Colour[^\n]*?\n\s*([A-Za-z]+)\s+([0-9]{2}-[0-9]{4}[A-Za-z]*)",
-            text,
-            re.IGNORECASE
-        )
-        if m:
-            colour_name = m.group(1).strip().upper()
-            pantone = m.group(2).strip().upper()
-            return f"{colour_name} {pantone}"
-        return "UNKNOWN"
-    except Exception:
-        return "UNKNOWN"
-
-
-def extract_colour_from_pdf_pages(pages_text):
-    """
-    Ultra-robust PEPCO Colour Detection
-    Supports:
-        ✔ Old 6-page PDF format
-        ✔ New 5-page PDF format
-        ✔ Broken layout (Colour row + size row merged)
-        ✔ Missing pantone
-    """
-    # -------- 1️⃣ Standard Colour Table --------
-    for txt in pages_text:
-        m = re.search(
-            r"Colour.*?\n.*?\n\s*([A-Za-z ]+)\s+[0-9]{2}-[0-9]{4}",
-            txt,
-            re.IGNORECASE | re.DOTALL
-        )
-        if m:
-            return m.group(1).strip().upper()
-
-    # -------- 2️⃣ Purchase Price block --------
-    for txt in pages_text:
-        m2 = re.search(
-            r"Purchase price.*?\n\s*([A-Za-z ]+)\s+[0-9]{2}-[0-9]{4}",
-            txt,
-            re.IGNORECASE | re.DOTALL
-        )
-        if m2:
-            return m2.group(1).strip().upper()
-
-    # -------- 3️⃣ Generic fallback using "colour" keyword --------
-    for txt in pages_text:
-        if "colour" in txt.lower():
-            for line in txt.splitlines():
-                if re.search(r"[A-Za-z ]+\s+[0-9]{2}-[0-9]{4}", line):
-                    name = line.split()[0:-1]
-                    if name:
-                        return " ".join(name).upper()
-
-    # -------- 4️⃣ Manual input fallback --------
+def manual_colour_input(key_prefix: str = ""):
+    """Manual colour entry when the PDF has no detectable colour."""
     st.warning("⚠️ Colour not found in PDF. Enter colour manually:")
-    manual = st.text_input("Colour (e.g. WHITE):", key="manual_colour_fix")
+    manual = st.text_input("Colour (e.g. WHITE):", key=f"{key_prefix}manual_colour_fix")
     return manual.strip().upper() if manual else "UNKNOWN"
 
 
 # ================================================================
-#  EXTRACT ORDER ID FROM PDF (for multiple uploads)
+#  EXTRACTION CACHE (content hash → page texts + parsed fields)
 # ================================================================
-def extract_order_id_only(file):
-    """Extract only Order ID from a PDF file."""
-    pos = None
-    try:
-        pos = file.tell()
-    except Exception:
-        pass
+@st.cache_resource
+def get_extraction_cache():
+    """Process-wide extraction cache (memory LRU + disk)."""
+    return open_extraction_cache()
 
-    try:
-        file.seek(0)
-    except Exception:
-        pass
 
-    try:
-        with fitz.open(stream=file.read(), filetype="pdf") as doc:
-            page1_text = doc[0].get_text() if len(doc) > 0 else ""
-    except Exception:
-        try:
-            file.seek(0 if pos is None else pos)
-        except Exception:
-            pass
-        return None
+@st.cache_resource
+def get_sheet_pool():
+    """Sandboxed sheet-extraction worker processes (shared by all sessions)."""
+    return SheetPool(int(os.environ.get("PEPCO_SHEET_WORKERS", "0")) or None)
 
-    try:
-        file.seek(0 if pos is None else pos)
-    except Exception:
-        pass
 
-    m = re.search(
-        r"Order\s*-\s*ID\s*\.{2,}\s*([A-Z0-9_+-]+)",
-        page1_text,
-        re.IGNORECASE
+@st.cache_resource
+def get_order_prescan():
+    """Page-1 Order-IDs per PDF content, read on the sheet pool and memoized across reruns."""
+    return OrderIdPrescan(pool=get_sheet_pool())
+
+
+# ================================================================
+#  DATAFILE HISTORY (issued SKU / barcode index)
+# ================================================================
+@st.cache_resource
+def get_history():
+    """Process-wide DATAFILE history (None when PEPCO_HISTORY=0); writes on its own thread."""
+    history = open_history()
+    if history is not None:
+        # Queued downloads are written before the server exits
+        atexit.register(history.close)
+    return history
+
+
+def record_downloads(entries):
+    """Download click → queue the issued DATAFILEs; never waits for the write."""
+    history = get_history()
+    if history is None:
+        return
+    now = time.time()
+    for entry in entries:
+        history.record(entry._replace(created_at=now))
+
+
+def prefetch_extractions(docs):
+    """Extract every uncached sheet on the pool; progress streams in as each finishes."""
+    cache = get_extraction_cache()
+    pending = {}
+    for doc in docs:
+        if doc.raw and doc.sha256 not in pending and cache.get(doc.sha256) is None:
+            pending[doc.sha256] = doc
+    if not pending:
+        return
+
+    status = st.status(f"Extracting {len(pending)} sheet(s) in parallel…", expanded=True)
+    progress = status.progress(0.0)
+    start = time.perf_counter()
+
+    jobs = [(key, doc.raw, doc.name) for key, doc in pending.items()]
+    for done, (key, extracted, error, seconds) in enumerate(get_sheet_pool().extract_many(jobs), 1):
+        name = pending[key].name or key[:12]
+        if error:
+            # The per-sheet pipeline tries once more on the pool and shows the error
+            status.write(f"⚠️ {name}: {error}")
+        else:
+            cache.put(key, extracted)
+            status.write(f"✅ {name} — {seconds:.2f}s")
+        progress.progress(done / len(pending), text=f"{done}/{len(pending)} sheets")
+
+    status.update(
+        label=f"Extracted {len(pending)} sheet(s) in {time.perf_counter() - start:.2f}s",
+        state="complete",
+        expanded=False,
     )
-    return m.group(1).strip() if m else None
 
 
 # ================================================================
 #  MAIN PDF EXTRACTION ENGINE
 # ================================================================
-def extract_data_from_pdf(file):
-    """Robust PEPCO extractor (5-page + 6-page)."""
+def extract_data_from_pdf(file, key_prefix: str = "", fresh: bool = False, in_process: bool = False):
+    """
+    Robust PEPCO extractor (5-page + 6-page), cached by PDF content →
+    SheetModel (document fields once, SKU / barcode columns). Parsing runs on the sandboxed sheet pool (timeout / memory cap), never
+    on the script thread; fresh=True parses again and overwrites the cached
+    entry. Profiled runs parse in-process (in_process / fresh) so cProfile
+    sees the parser, not the wait on the worker's pipe.
+    """
+    doc = None
     try:
-        raw = file.read()
-        if not raw:
+        doc = as_document(file)
+        if not doc.raw:
             st.error("Empty PDF uploaded.")
             return None
 
-        doc = fitz.open(stream=raw, filetype="pdf")
-
-        if len(doc) < 1:
+        pool = None if (fresh or in_process) else get_sheet_pool()
+        parsed = extract_document(doc, get_extraction_cache(), fresh, pool)["parsed"]
+        if parsed is None:
             st.error("PDF must have at least 1 page.")
             return None
 
-        pages_text = [doc[i].get_text() for i in range(len(doc))]
-        full_text = "\n".join(pages_text)
-        page1 = pages_text[0]
-
-        # ---------------- Item Name EN ----------------
-        item_name_en = None
-
-        m_item = re.search(
-            r"Item\s*name\s*English\s*[:\.]{1,}\s*(.+)",
-            full_text,
-            re.IGNORECASE
-        )
-        if not m_item:
-            m_item = re.search(
-                r"Item\s*name\s*[:\.]{1,}\s*(.+?)\n",
-                full_text,
-                re.IGNORECASE
-            )
-        if m_item:
-            item_name_en = m_item.group(1).strip()
-
-        # ---------------- Identifiers ----------------
-        merch_code = re.search(r"Merch\s*code\s*\.{2,}\s*([\w/]+)", page1)
-        season = re.search(r"Season\s*\.{2,}\s*(\w+)?\s*(\d{2})", page1)
-        style_code = re.search(r"\b\d{6}\b", page1)
-
-        style_suffix = ""
-        if merch_code and season:
-            style_suffix = f"{merch_code.group(1).strip()}{season.group(2)}"
-        elif merch_code:
-            style_suffix = merch_code.group(1).strip()
-
-        collection = re.search(r"Collection\s*\.{2,}\s*(.+)", page1)
-
-        date_match = re.search(
-            r"Handover\s*date\s*\.{2,}\s*(\d{2}/\d{2}/\d{4})",
-            page1
-        )
-
-        batch = "UNKNOWN"
-        if date_match:
-            try:
-                batch_date = datetime.strptime(date_match.group(1), "%d/%m/%Y")
-                batch = (batch_date - timedelta(days=20)).strftime("%m%Y")
-            except Exception:
-                pass
-
-        order_id = re.search(r"Order\s*-\s*ID\s*\.{2,}\s*(.+)", page1)
-        item_class = re.search(r"Item classification\s*\.{2,}\s*(.+)", page1)
-        supplier_code = re.search(r"Supplier product code\s*\.{2,}\s*(.+)", page1)
-        supplier_name = re.search(r"Supplier name\s*\.{2,}\s*(.+)", page1)
-
-        item_class_value = item_class.group(1).strip() if item_class else "UNKNOWN"
-
-        class_type = get_classification_type(item_class_value)
-
-        collection_value = (
-            collection.group(1).split("-")[0].strip()
-            if collection else "UNKNOWN"
-        )
-
-        # Collection mapping
-        if class_type and class_type in COLLECTION_MAPPING:
-            for orig, new in COLLECTION_MAPPING[class_type].items():
-                if orig.upper() in collection_value.upper():
-                    collection_value = new
-                    break
-
-        # ---------------- AUTO COLOUR EXTRACTION ----------------
-        colour = extract_colour_from_pdf_pages(pages_text)
-
-        # ---------------- SKU + BARCODE ----------------
-        skus = []
-        barcodes = []
-        excluded = set()
-
-        for txt in pages_text:
-            skus.extend(re.findall(r"\b\d{8}\b", txt))
-            barcodes.extend(re.findall(r"\b\d{13}\b", txt))
-            excluded.update(re.findall(r"barcode:\s*(\d{13})", txt))
-
-        # Dedupe
-        def _dedupe(seq):
-            seen = set()
-            out = []
-            for x in seq:
-                if x not in seen:
-                    seen.add(x)
-                    out.append(x)
-            return out
-
-        skus = _dedupe(skus)
-        barcodes = _dedupe(barcodes)
-
-        valid_barcodes = [b for b in barcodes if b not in excluded]
-
-        if not skus or not valid_barcodes:
-            st.error("SKU or Barcode missing.")
-            return None
-
-        # Align count mismatch
-        if len(skus) != len(valid_barcodes):
-            min_len = min(len(skus), len(valid_barcodes))
-            st.warning(
-                f"SKU ({len(skus)}) and Barcode ({len(valid_barcodes)}) differ. Using first {min_len}."
-            )
-            skus = skus[:min_len]
-            valid_barcodes = valid_barcodes[:min_len]
-
-        season_value = (
-            f"{season.group(1)}{season.group(2)}"
-            if season else "UNKNOWN"
-        )
-
-        # ---------------- BUILD RESULT ----------------
-        results = []
-        for sku, barcode in zip(skus, valid_barcodes):
-            results.append({
-                "Order_ID": order_id.group(1).strip() if order_id else "UNKNOWN",
-                "Style": style_code.group() if style_code else "UNKNOWN",
-                "Colour": colour,
-                "Supplier_product_code": supplier_code.group(1).strip() if supplier_code else "UNKNOWN",
-                "Item_classification": item_class_value,
-                "Supplier_name": supplier_name.group(1).strip() if supplier_name else "UNKNOWN",
-                "today_date": datetime.today().strftime('%d-%m-%Y'),
-                "Collection": collection_value,
-                "Colour_SKU": f"{colour} • SKU {sku}",
-                "Style_Merch_Season": (
-                    f"STYLE {style_code.group()} • {style_suffix} • Batch No./"
-                    if style_code else "STYLE UNKNOWN"
-                ),
-                "Batch": f"Data e prodhimit: {batch}",
-                "barcode": barcode,
-                "Item_name_EN": item_name_en or "",
-                "Season": season_value
-            })
+        # Manual fallback is a widget → never cached
+        colour = parsed["Colour"] or manual_colour_input(key_prefix)
 
-        return results
+        result = sheet_records(parsed, colour)
+        # Barcodes already issued in an earlier DATAFILE (other PDFs only)
+        show_issues(result.issues + history_issues(result.sheet, get_history(), doc.sha256))
+        return result.sheet
 
     except Exception as e:
         st.error(f"PDF error: {str(e)}")
         return None
+    finally:
+        # Reader opened here → close its fitz document (uploads' readers are
+        # closed by pepco_section)
+        if doc is not None and doc is not file:
+            doc.close()
+
+
+# ---------- Per-session stage memo ----------
+def memo_stage(key_prefix, stage, inputs, compute):
+    """
+    Last result of a pipeline stage, recomputed only when its inputs change.
+    One slot per stage and sheet in session_state; callers must not mutate
+    the returned value (copy first).
+    """
+    slot = f"{key_prefix}ui_stage_{stage}"
+    cached = st.session_state.get(slot)
+    if cached is not None and cached[0] == inputs:
+        return cached[1]
+    value = compute()
+    st.session_state[slot] = (inputs, value)
+    return value
 
 
 # ================================================================
-#  TRANSLATION FORMATTER (AL, ES, MK, etc)
+#  PROFILER CAPTURE (one slow run → replayable case folder)
 # ================================================================
-def format_product_translations(
-    product_name,
-    translation_row,
-    selected_materials=None,
-    material_translations=None,
-    material_compositions=None
-):
-    """Builds multilingual product description with material info."""
-    formatted = []
-
-    # Country suffix rules
-    country_suffixes = {
-        'BiH': " Sastav materijala na ušivenoj etiketi.",
-        'RS': " Sastav materijala nalazi se na ušivenoj etiketi.",
-    }
+@st.cache_resource
+def get_profile_store():
+    """Captured cases folder (replay: python pepco_profile.py <case>)."""
+    return ProfileStore.from_env()
+
+
+def profile_requested():
+    """'once' (admin armed the next run), 'slow' (PEPCO_PROFILE set) or None."""
+    if st.session_state.pop("admin_profile_next", False):
+        return "once"
+    if os.environ.get("PEPCO_PROFILE", "") not in ("", "0"):
+        return "slow"
+    return None
 
-    # EN fallback
-    en_text = translation_row.get('EN', product_name)
-    formatted.append(f"|EN| {en_text}")
 
-    # ES / ES_CA combined
-    combined_lang = {
-        'ES': (
-            f"{translation_row['ES']} / {translation_row['ES_CA']}"
-            if pd.notna(translation_row.get('ES_CA'))
-            else translation_row.get('ES')
-        )
+def save_profile_case(run, uploaded_pdf, extra_order_ids, key_prefix: str = ""):
+    """Profile + PDF + this sheet's UI selections + reference sheets → case folder."""
+    state = st.session_state
+    doc = as_document(uploaded_pdf)
+
+    rows = state.get(f"{key_prefix}mat_data", [])[:state.get(f"{key_prefix}mat_rows", 0)]
+    selections = {
+        "department": state.get(f"{key_prefix}ui_dept"),
+        "product": state.get(f"{key_prefix}ui_product"),
+        "washing_code": state.get(f"{key_prefix}ui_wash"),
+        "materials": [
+            {"mat": r["mat"], "pct": r["pct"]}
+            for r in rows if r["mat"] not in (None, "—") and r["pct"] > 0
+        ],
+        "pln_price": state.get(f"{key_prefix}ui_pln_price", ""),
+        "price_mode": state.get(f"{key_prefix}ui_price_mode", "exact"),
+        "manual_colour": (state.get(f"{key_prefix}manual_colour_fix") or "").strip().upper() or None,
+        "extra_order_ids": extra_order_ids or None,
     }
 
-    # Language order defined
-    language_order = [
-        'AL', 'BG', 'BiH', 'CZ', 'DE', 'EE',
-        'ES', 'GR', 'HR', 'HU', 'IT', 'LT',
-        'LV', 'MK', 'PL', 'PT', 'RO', 'RS',
-        'SI', 'SK'
-    ]
-
-    # Build translations
-    for lang in language_order:
-        if lang in combined_lang and combined_lang[lang] is not None:
-            text = combined_lang[lang]
-        else:
-            text = translation_row.get(lang, product_name)
-
-        # Material names or composition for AL + MK only
-        if selected_materials and material_translations and lang in ['AL', 'MK']:
-            comp = (material_compositions or {}).get(lang, "")
-            names = material_translations.get(lang, "")
+    references = {}
+    for name in ("prices", "translations", "materials"):
+        snap = get_reference_snapshots().get(name)
+        if snap is not None:
+            references[name] = (snap.sha256, snap.body)
 
-            if comp:
-                text = f"{text}: {comp}"
-            elif names:
-                text = f"{text}: {names}"
-
-        # Country suffix
-        if lang in country_suffixes:
-            if not text.endswith('.'):
-                text += "."
-            text += country_suffixes[lang]
-
-        formatted.append(f"|{lang}| {text}")
+    try:
+        path = get_profile_store().save(
+            run, doc.raw, doc.name, selections, references,
+            output=state.get("pepco_datafiles", {}).get(key_prefix)
+        )
+    except OSError as e:
+        st.warning(f"Could not save profile: {e}")
+        return None
 
-    return " ".join(formatted)
+    note = "" if run.active else " (no profile: another capture was running)"
+    st.toast(f"🧪 {run.seconds:.2f}s run saved → {path}{note}")
+    return path
 
 
 # ================================================================
@@ -847,77 +502,90 @@ def format_product_translations(
 # ================================================================
 
 # ================================================================
-#  MAIN WORKFLOW: PDF → DataFrame → UI → CSV
+#  MAIN WORKFLOW: PDF → sheet → UI → CSV
 # ================================================================
-def process_pepco_pdf(uploaded_pdf, extra_order_ids: str | None = None):
-    """Main pipeline: parse PDF, build DF, apply UI choices, export CSV."""
+def process_pepco_pdf(uploaded_pdf, extra_order_ids: str | None = None, key_prefix: str = ""):
+    """
+    Main pipeline: parse PDF, build sheet, apply UI choices, export CSV.
+    key_prefix namespaces every widget / session key (one per sheet in
+    multi-sheet mode). Returns (file_name, csv bytes) once a DATAFILE is ready.
+
+    Runs under cProfile when an admin armed a capture or PEPCO_PROFILE is
+    set (see save_profile_case).
+    """
+    mode = profile_requested()
+    if mode is None:
+        return run_pepco_pipeline(uploaded_pdf, extra_order_ids, key_prefix)
+
+    # Armed capture → parse for real (a cache hit would profile nothing);
+    # both modes parse on this thread — a pool worker is invisible to cProfile
+    with ProfileRun() as run:
+        result = run_pepco_pipeline(
+            uploaded_pdf, extra_order_ids, key_prefix, fresh=(mode == "once"), in_process=True
+        )
+
+    if mode == "once" or run.seconds >= float(os.environ.get("PEPCO_PROFILE_MIN_SECONDS", "5")):
+        save_profile_case(run, uploaded_pdf, extra_order_ids, key_prefix)
+    return result
+
+
+def run_pepco_pipeline(
+    uploaded_pdf, extra_order_ids=None, key_prefix: str = "", fresh: bool = False, in_process: bool = False
+):
+    """
+    Only the sheet / Department / Product / Washing part runs on a full app
+    rerun; materials → price → export are nested fragments, so an edit there
+    reruns just that fragment and the stages below it.
+    """
     # ----- Load reference data -----
-    translations_df = load_product_translations()
-    material_translations_df = load_material_translations()
+    catalog = load_product_catalog()
+    material_table = load_material_translations()
 
-    if not (uploaded_pdf and not translations_df.empty):
+    if not (uploaded_pdf and not catalog.empty):
         return
 
     # ----- Parse PDF to structured data -----
-    result_data = extract_data_from_pdf(uploaded_pdf)
-    if not result_data:
+    sheet = extract_data_from_pdf(uploaded_pdf, key_prefix, fresh=fresh, in_process=in_process)
+    if not sheet:
         return
 
-    df = pd.DataFrame(result_data)
-
-    # ----- Base values from first row -----
-    first_row = result_data[0] if len(result_data) > 0 else {}
-    pdf_item_class = first_row.get("Item_classification", "")
-    pdf_item_name_en = (first_row.get("Item_name_EN") or "").strip()
+    # ----- Document-level values -----
+    pdf_item_class = sheet.get("Item_classification", "")
+    pdf_item_name_en = (sheet.get("Item_name_EN") or "").strip()
 
     # ----- Merge extra Order IDs from other PDFs -----
     if extra_order_ids:
-        try:
-            df['Order_ID'] = df['Order_ID'].astype(str) + "+" + extra_order_ids
-        except Exception:
-            pass
+        sheet = sheet.with_fields(Order_ID=f"{sheet['Order_ID']}+{extra_order_ids}")
 
     # ============================================================
-    #  UI Controls (Department, Product, Washing, PLN)
+    #  UI Controls (Department, Product, Washing)
     # ============================================================
-    c1, c2, c3, c4 = st.columns(4)
+    c1, c2, c3 = st.columns(3)
 
     # -- Department select (default from item_class) --
-    depts = translations_df['DEPARTMENT'].dropna().unique().tolist()
-    default_dept_label = map_item_class_to_dept_label(pdf_item_class)
-    default_dept_index = 0
-
-    if default_dept_label:
-        for i, d in enumerate(depts):
-            if str(d).strip().lower() == str(default_dept_label).strip().lower():
-                default_dept_index = i
-                break
+    depts = catalog.departments
+    default_dept_index = catalog.department_index(
+        map_item_class_to_dept_label(pdf_item_class)
+    )
 
     with c1:
         selected_dept = st.selectbox(
             "Select Department",
             options=depts,
             index=default_dept_index,
-            key="ui_dept"
+            key=f"{key_prefix}ui_dept"
         )
 
     # -- Product list filtered by Department --
-    filtered = translations_df[translations_df['DEPARTMENT'] == selected_dept]
-    products = filtered['PRODUCT_NAME'].dropna().unique().tolist()
-
-    default_product_index = 0
-    if pdf_item_name_en:
-        for i, p in enumerate(products):
-            if str(p).strip().lower() == pdf_item_name_en.strip().lower():
-                default_product_index = i
-                break
+    products = catalog.products(selected_dept)
+    default_product_index = catalog.product_index(selected_dept, pdf_item_name_en)
 
     with c2:
         product_type = st.selectbox(
             "Select Product Type",
             options=products,
             index=default_product_index,
-            key="ui_product"
+            key=f"{key_prefix}ui_product"
         )
 
     # -- Washing code --
@@ -929,130 +597,122 @@ def process_pepco_pdf(uploaded_pdf, extra_order_ids: str | None = None):
             "Select Washing Code",
             options=washing_options,
             index=washing_default_index,
-            key="ui_wash"
+            key=f"{key_prefix}ui_wash"
         )
 
-    # -- PLN price manual input --
-    with c4:
-        pln_price_raw = st.text_input(
-            "Enter PLN Price",
-            key="ui_pln_price"
-        )
+    # Identifies the sheet + selections for the memoized stages below
+    sheet_key = (
+        getattr(uploaded_pdf, "sha256", None) or id(uploaded_pdf),
+        sheet.get("Colour"),
+        extra_order_ids,
+        catalog,
+        selected_dept,
+        product_type,
+        washing_code_key,
+    )
 
-    # ============================================================
-    #  Parse PLN price
-    # ============================================================
-    pln_price = None
-    if pln_price_raw.strip():
-        try:
-            pln_price = float(pln_price_raw.replace(",", "."))
-            if pln_price < 0:
-                st.error("❌ Price can't be negative.")
-                pln_price = None
-        except ValueError:
-            st.error("❌ Please enter a valid number like 12.50 or 12,50")
-            pln_price = None
+    return material_fragment(
+        sheet,
+        sheet_key,
+        catalog.template(selected_dept, product_type),
+        material_table,
+        washing_code_key,
+        key_prefix,
+        source=getattr(uploaded_pdf, "sha256", None)
+    )
 
-    # ============================================================
-    #  MATERIAL COMPOSITION UI
-    # ============================================================
+
+# ================================================================
+#  FRAGMENT 1 — MATERIAL COMPOSITION → enriched sheet
+# ================================================================
+def material_composition_editor(material_table, key_prefix: str = ""):
+    """Material rows UI; returns the valid [{"mat", "pct"}] rows."""
     st.markdown("### Material Composition (%)")
 
     # Session init
-    if "mat_rows" not in st.session_state:
-        st.session_state.mat_rows = 1
-    if "mat_data" not in st.session_state:
-        st.session_state.mat_data = [{"mat": "Cotton", "pct": 100}]
-
-    materials_list = (
-        material_translations_df['material'].dropna().unique().tolist()
-        if not material_translations_df.empty else []
-    )
+    rows_key = f"{key_prefix}mat_rows"
+    data_key = f"{key_prefix}mat_data"
+    if rows_key not in st.session_state:
+        st.session_state[rows_key] = 1
+    if data_key not in st.session_state:
+        st.session_state[data_key] = [{"mat": "Cotton", "pct": 100}]
+    mat_data = st.session_state[data_key]
+
+    materials_list = material_table.materials
     if "Cotton" not in materials_list:
-        materials_list = ["Cotton"] + materials_list
+        materials_list = ("Cotton", *materials_list)
 
     def _ensure_row(i):
-        while i >= len(st.session_state.mat_data):
-            st.session_state.mat_data.append({"mat": None, "pct": 0})
+        while i >= len(mat_data):
+            mat_data.append({"mat": None, "pct": 0})
 
-    # ------ Per-row UI ------
-    for i in range(st.session_state.mat_rows):
+    def _row_ui(i):
         _ensure_row(i)
 
-        prev_total = sum(r["pct"] for r in st.session_state.mat_data[:i] if r["pct"])
+        prev_total = sum(r["pct"] for r in mat_data[:i] if r["pct"])
         remain = max(0, 100 - prev_total)
 
         cA, cB = st.columns([3, 1.3])
 
         # Material select
         with cA:
-            cur_mat = st.session_state.mat_data[i]["mat"]
-            options = ["—"] + materials_list
+            cur_mat = mat_data[i]["mat"]
+            options = ["—", *materials_list]
             idx = options.index(cur_mat) if (cur_mat in options) else 0
 
-            st.session_state.mat_data[i]["mat"] = st.selectbox(
+            mat_data[i]["mat"] = st.selectbox(
                 "Select Material(s)" if i == 0 else f"Select Material(s) #{i+1}",
                 options,
                 index=idx,
-                key=f"mat_sel_{i}"
+                key=f"{key_prefix}mat_sel_{i}"
             )
 
         # Percentage input
         with cB:
-            cur_pct = st.session_state.mat_data[i]["pct"]
+            cur_pct = mat_data[i]["pct"]
             default_pct = (
-                100 if (i == 0 and not cur_pct and st.session_state.mat_data[i]["mat"] == "Cotton")
+                100 if (i == 0 and not cur_pct and mat_data[i]["mat"] == "Cotton")
                 else min(cur_pct, remain)
             )
 
-            if i == 0 and st.session_state.mat_data[i]["mat"] == "Cotton" and cur_pct in (None, 0):
+            if i == 0 and mat_data[i]["mat"] == "Cotton" and cur_pct in (None, 0):
                 default_pct = 100
-                st.session_state.mat_data[i]["pct"] = 100
+                mat_data[i]["pct"] = 100
 
-            st.session_state.mat_data[i]["pct"] = st.number_input(
+            mat_data[i]["pct"] = st.number_input(
                 "Composition (%)" if i == 0 else f"Composition (%) #{i+1}",
                 min_value=0,
                 max_value=remain,
                 step=1,
                 value=default_pct,
-                key=f"mat_pct_{i}"
+                key=f"{key_prefix}mat_pct_{i}"
             )
 
+    # ------ Per-row UI ------
+    for i in range(st.session_state[rows_key]):
+        _row_ui(i)
+
     # Valid rows
     valid_rows = [
-        r for r in st.session_state.mat_data[:st.session_state.mat_rows]
+        r for r in mat_data[:st.session_state[rows_key]]
         if r["mat"] not in (None, "—") and r["pct"] > 0
     ]
     running_total = sum(r["pct"] for r in valid_rows)
 
-    # Auto-add next material row
-    if running_total < 100 and st.session_state.mat_rows < 5:
-        last = st.session_state.mat_data[st.session_state.mat_rows - 1]
+    # Auto-add next material row (drawn in this run — an empty row changes
+    # nothing downstream, so no rerun is needed)
+    if running_total < 100 and st.session_state[rows_key] < 5:
+        last = mat_data[st.session_state[rows_key] - 1]
         if last["mat"] not in (None, "—") and last["pct"] > 0:
-            st.session_state.mat_rows += 1
-            _ensure_row(st.session_state.mat_rows - 1)
-            st.rerun()
+            st.session_state[rows_key] += 1
+            _row_ui(st.session_state[rows_key] - 1)
 
     # If total >= 100 → trim extra rows visually
-    if running_total >= 100 and st.session_state.mat_rows > len(valid_rows):
-        st.session_state.mat_rows = len(valid_rows)
-
-    selected_materials = [r["mat"] for r in valid_rows]
-
-    # Cotton flag
-    cotton_value = ""
-    if len(valid_rows) == 1:
-        mat0 = (valid_rows[0]["mat"] or "").strip().lower()
-        try:
-            pct0_int = int(valid_rows[0]["pct"])
-        except Exception:
-            pct0_int = 0
-
-        if mat0 == "cotton" and pct0_int == 100:
-            cotton_value = "Y"
+    if running_total >= 100 and st.session_state[rows_key] > len(valid_rows):
+        st.session_state[rows_key] = len(valid_rows)
 
     # Info about totals
-    if st.session_state.mat_rows == 1 and valid_rows and valid_rows[0]["pct"] == 100 and (
+    if st.session_state[rows_key] == 1 and valid_rows and valid_rows[0]["pct"] == 100 and (
         valid_rows[0]["mat"] or ""
     ).lower() == "cotton":
         st.info("✅ 100% selected")
@@ -1060,144 +720,221 @@ def process_pepco_pdf(uploaded_pdf, extra_order_ids: str | None = None):
         st.error("⚠️ Total exceeds 100%")
 
     st.write(f"**Total: {running_total}%**")
+    return valid_rows
+
+
+@st.fragment
+def material_fragment(
+    base_sheet,
+    sheet_key,
+    product_template,
+    material_table,
+    washing_code_key,
+    key_prefix: str = "",
+    source: str | None = None
+):
+    """Materials editor → enriched sheet (Dept, Cotton, Collection, Product, Washing)."""
+    valid_rows = material_composition_editor(material_table, key_prefix)
 
-    # ============================================================
-    #  Material Translation for AL / MK
-    # ============================================================
-    material_trans_dict = {}
-    material_compositions = {}
-
-    if selected_materials and not material_translations_df.empty:
-        for lang in ['AL', 'MK']:
-            names = []
-            comp = []
-
-            for r in valid_rows:
-                t = material_translations_df[
-                    (material_translations_df['material'] == r['mat']) &
-                    (material_translations_df['language'] == lang)
-                ]
-                if not t.empty:
-                    tr = t['translation'].iloc[0]
-                    names.append(tr)
-                    comp.append(f"{r['pct']}% {tr}")
-
-            if names:
-                material_trans_dict[lang] = ", ".join(names)
-            if comp:
-                material_compositions[lang] = ", ".join(comp)
+    enriched_key = (
+        sheet_key,
+        material_table,
+        tuple((r["mat"], r["pct"]) for r in valid_rows),
+    )
+    sheet = memo_stage(
+        key_prefix, "enriched", enriched_key,
+        lambda: enrich_sheet(
+            base_sheet,
+            product_template,
+            valid_rows,
+            material_table,
+            washing_code_key
+        )
+    )
+    return price_fragment(sheet, enriched_key, key_prefix, source)
 
-    # ============================================================
-    #  DataFrame enrichment (Dept, Cotton, Collection, Product, Washing)
-    # ============================================================
-    df['Dept'] = df['Item_classification'].apply(get_dept_value)
 
-    if cotton_value == "Y":
-        df['Cotton'] = cotton_value
-    else:
-        if 'Cotton' in df.columns:
-            df = df.drop(columns=['Cotton'])
+# ================================================================
+#  FRAGMENT 2 — PLN PRICE → price ladder columns
+# ================================================================
+@st.fragment
+def price_fragment(enriched_sheet, enriched_key, key_prefix: str = "", source: str | None = None):
+    """PLN price input → price tier → final DATAFILE sheet."""
+    outputs = st.session_state.setdefault("pepco_datafiles", {})
+
+    c1, c2 = st.columns(2)
+    with c1:
+        pln_price_raw = st.text_input(
+            "Enter PLN Price",
+            key=f"{key_prefix}ui_pln_price"
+        )
+    with c2:
+        price_mode = st.selectbox(
+            "Price match",
+            options=list(PRICE_MATCH_MODES),
+            format_func=PRICE_MATCH_LABELS.get,
+            key=f"{key_prefix}ui_price_mode"
+        )
+
+    # ----- Parse PLN price -----
+    pln_price = None
+    if pln_price_raw.strip():
+        try:
+            pln_price = float(pln_price_raw.replace(",", "."))
+            if not math.isfinite(pln_price):
+                raise ValueError(pln_price_raw)
+            if pln_price < 0:
+                st.error("❌ Price can't be negative.")
+                pln_price = None
+        except ValueError:
+            st.error("❌ Please enter a valid number like 12.50 or 12,50")
+            pln_price = None
 
-    df['Collection'] = df.apply(
-        lambda r: modify_collection(r['Collection'], r['Item_classification']),
-        axis=1
+    if pln_price is None:
+        outputs.pop(key_prefix, None)
+        return
+
+    tier_pln, currency_values = match_price_tier(pln_price, mode=price_mode)
+    if not currency_values:
+        outputs.pop(key_prefix, None)
+        st.warning("⚠️ Processing stopped - valid PLN price not found")
+        return
+
+    if tier_pln != pln_price:
+        st.info(f"ℹ️ PLN {pln_price} not in price sheet → using tier PLN {tier_pln}")
+        pln_price = tier_pln
+
+    sheet, final_cols = memo_stage(
+        key_prefix, "final",
+        (enriched_key, pln_price, tuple(currency_values.items())),
+        lambda: finalize_sheet(enriched_sheet, currency_values, pln_price)
     )
 
-    product_row = filtered[filtered['PRODUCT_NAME'] == product_type]
-    if not product_row.empty:
-        df['product_name'] = format_product_translations(
-            product_type,
-            product_row.iloc[0],
-            selected_materials,
-            material_trans_dict,
-            material_compositions
-        )
-    else:
-        df['product_name'] = ""
+    st.success("✅ Done!")
+    return export_fragment(sheet, final_cols, key_prefix, source)
 
-    df['washing_code'] = WASHING_CODES[washing_code_key]
 
-    # ============================================================
-       #  PRICE LADDER + CSV EXPORT
-    # ============================================================
-    if pln_price is not None:
-        currency_values = find_closest_price(pln_price)
-
-        if currency_values:
-            # Fill currency columns
-            for cur in ['EUR', 'BGN', 'BAM', 'RON', 'CZK', 'MKD', 'RSD', 'HUF']:
-                df[cur] = currency_values.get(cur, "")
-
-            df['PLN'] = format_number(pln_price, 'PLN')
-
-            # NEW COLUMN → Item name English (cleaned & CAPITAL)
-            df["Item_name_English"] = df["Item_name_EN"].apply(clean_item_name_english)
-
-            final_cols = [
-                "Order_ID", "Style", "Colour", "Supplier_product_code",
-                "Item_classification", "Supplier_name", "today_date",
-                "Collection", "Colour_SKU", "Style_Merch_Season",
-                "Batch", "barcode", "washing_code", "EUR", "BGN",
-                "BAM", "PLN", "RON", "CZK", "MKD", "RSD", "HUF",
-                "product_name", "Dept", "Item_name_English", "Season"
-            ]
-
-            # Optionally include Cotton column
-            if 'Cotton' in df.columns and 'Cotton' not in final_cols:
-                final_cols.append("Cotton")
-
-            # Ensure all columns exist
-            for col in final_cols:
-                if col not in df.columns:
-                    df[col] = ""
-
-            st.success("✅ Done!")
-            st.subheader("Edit Before Download")
-
-            edited_df = st.data_editor(df[final_cols])
-
-            # Build CSV with ; separator & quoted fields
-            csv_buffer = StringIO()
-            writer = pycsv.writer(
-                csv_buffer,
-                delimiter=';',
-                quoting=pycsv.QUOTE_ALL
-            )
-            writer.writerow(final_cols)
+# ================================================================
+#  FRAGMENT 3 — EDIT + CSV EXPORT
+# ================================================================
+@st.fragment
+def export_fragment(sheet, final_cols, key_prefix: str = "", source: str | None = None):
+    """
+    Editable preview → DATAFILE CSV download. A download is recorded in the
+    DATAFILE history (source = PDF sha256) exactly as exported, edits included.
+    """
+    st.subheader("Edit Before Download")
+
+    # Rows materialized only here, for the editor
+    edited_df = st.data_editor(sheet.to_frame(final_cols))
 
-            for row in edited_df.itertuples(index=False):
-                writer.writerow(row)
+    file_name = build_sheet_filename(sheet)
+    csv_bytes = build_datafile_csv(edited_df, final_cols)
 
-            # ---------- Custom CSV filename ----------
-            first_row_df = df.iloc[0]
-            season_val = first_row_df.get("Season", "UNKNOWN").upper()
+    entry = HistoryEntry.from_frame(file_name, edited_df, csv_bytes, source)
 
-            all_skus = df['Colour_SKU'].apply(
-                lambda x: re.sub(r".*SKU\s*", "", x)
-            ).tolist()
-            sku_val = "_".join(all_skus) if all_skus else "UNKNOWN"
+    st.download_button(
+        "📥 Download CSV",
+        csv_bytes,
+        file_name=file_name,
+        mime="text/csv",
+        on_click=record_downloads,
+        args=([entry],)
+    )
 
-            supplier_code = first_row_df.get("Supplier_product_code", "UNKNOWN")
-            style_val = first_row_df.get("Style", "UNKNOWN")
+    # Latest output per sheet (fragment reruns have no caller to return to)
+    st.session_state.setdefault("pepco_datafiles", {})[key_prefix] = (file_name, csv_bytes)
+    st.session_state.setdefault("pepco_history_entries", {})[key_prefix] = entry
+    return file_name, csv_bytes
 
-            custom_filename = (
-                f"PEPCO_{season_val}_{sku_val}_DATAFILE_"
-                f"{supplier_code}_00_{style_val}.csv"
-            )
 
-            st.download_button(
-                "📥 Download CSV",
-                csv_buffer.getvalue().encode('utf-8-sig'),
-                file_name=custom_filename,
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Processing stopped - valid PLN price not found")
+# ================================================================
+#  MULTI-SHEET (merged / one DATAFILE per sheet)
+# ================================================================
+def process_merged(primary_doc, others):
+    """Primary sheet's DATAFILE with the other sheets' Order-IDs joined."""
+    # Order-ID from page 1 of every other PDF: in parallel, once per file content
+    if others:
+        with st.spinner(f"Reading Order-IDs from {len(others)} sheet(s)…"):
+            report = get_order_prescan().scan(primary_doc, others)
+        show_issues(prescan_issues(report))
+        extra_order_ids = report.extra_order_ids
+    else:
+        extra_order_ids = ""
+    return process_pepco_pdf(primary_doc, extra_order_ids=extra_order_ids)
+
+
+def multi_sheet_section(docs):
+    """Merged (primary extracted, others prescanned) or every sheet extracted on the pool."""
+    mode = st.radio(
+        "Output",
+        options=list(MULTI_SHEET_LABELS),
+        format_func=MULTI_SHEET_LABELS.get,
+        horizontal=True,
+        key="pepco_multi_mode"
+    )
+
+    if mode == "merged":
+        # Only the primary is fully parsed; the others need just their page-1 Order-ID
+        prefetch_extractions(docs[:1])
+        process_merged(docs[0], docs[1:])
+        return
+
+    prefetch_extractions(docs)
+
+    # Same file uploaded twice → one tab
+    unique = list({doc.sha256: doc for doc in reversed(docs)}.values())[::-1]
+    if len(unique) < len(docs):
+        st.caption(f"{len(docs) - len(unique)} duplicate upload(s) skipped.")
+
+    prefixes = [f"pepco_{doc.sha256[:10]}_" for doc in unique]
+    outputs = st.session_state.setdefault("pepco_datafiles", {})
+    tabs = st.tabs([doc.name or f"Sheet {i + 1}" for i, doc in enumerate(unique)])
+    for tab, doc in zip(tabs, unique):
+        with tab:
+            process_pepco_pdf(doc, key_prefix=f"pepco_{doc.sha256[:10]}_")
+
+    def _zip_ready():
+        # Built on click (outside the script run) → includes every edit made
+        # in fragment reruns since this button was drawn
+        buffer = BytesIO()
+        with DatafileBundle(buffer) as bundle:
+            for prefix in prefixes:
+                if prefix in outputs:
+                    bundle.add_bytes(*outputs[prefix])
+        return buffer.getvalue()
+
+    def _record_zip():
+        entries = st.session_state.get("pepco_history_entries", {})
+        record_downloads([entries[p] for p in prefixes if p in outputs and p in entries])
+
+    ready = sum(prefix in outputs for prefix in prefixes)
+    if ready > 1:
+        st.download_button(
+            f"📦 Download all {ready} DATAFILEs (ZIP)",
+            _zip_ready,
+            file_name="PEPCO_DATAFILES.zip",
+            mime="application/zip",
+            on_click=_record_zip
+        )
 
 
 # ================================================================
 #  PEPCO SECTION (Uploader + Reset)
 # ================================================================
+def upload_documents(uploaded_pdfs):
+    """PdfDocument per upload; content hashes kept per upload (file_id) → reruns do not hash again."""
+    known = st.session_state.setdefault("pepco_upload_sha256", {})
+    docs = []
+    for f in uploaded_pdfs:
+        file_id = getattr(f, "file_id", None)
+        doc = PdfDocument.from_upload(f, sha256=known.get(file_id))
+        if file_id is not None:
+            known[file_id] = doc.sha256
+        docs.append(doc)
+    return docs
+
+
 def pepco_section():
     """Main PEPCO UI section (upload + reset + extra order IDs merge)."""
     st.subheader("PEPCO Data Processing")
@@ -1236,28 +973,226 @@ def pepco_section():
         if not isinstance(uploaded_pdfs, list):
             uploaded_pdfs = [uploaded_pdfs]
 
-        primary_pdf = uploaded_pdfs[0]
-        others = uploaded_pdfs[1:]
+        # One reader per upload → each PDF opened once, pages on demand
+        docs = upload_documents(uploaded_pdfs)
 
-        # Collect Order_ID from additional PDFs
-        other_ids = []
-        for f in others:
-            try:
-                f.seek(0)
-            except Exception:
-                pass
+        try:
+            if len(docs) > 1 and st.toggle(
+                "⚡ Process every sheet (parallel)", key="pepco_multi_sheet"
+            ):
+                multi_sheet_section(docs)
+            else:
+                process_merged(docs[0], docs[1:])
+        finally:
+            for doc in docs:
+                doc.close()
 
-            oid = extract_order_id_only(f)
-            if oid:
-                other_ids.append(oid)
+    render_history_panel()
+    render_debug_panel()
 
-            try:
-                f.seek(0)
-            except Exception:
-                pass
 
-        concatenated_ids = "+".join(other_ids) if other_ids else ""
-        process_pepco_pdf(primary_pdf, extra_order_ids=concatenated_ids)
+# ================================================================
+#  HISTORY PANEL (which DATAFILE contained barcode X)
+# ================================================================
+def render_history_panel():
+    """Look up issued DATAFILEs by barcode, SKU, Order-ID, Style or Season."""
+    history = get_history()
+    if history is None:
+        return
+
+    with st.expander("🔎 DATAFILE history", expanded=False):
+        c1, c2 = st.columns([1, 3])
+        with c1:
+            field = st.selectbox(
+                "Search by",
+                options=list(HISTORY_LOOKUP_LABELS),
+                format_func=HISTORY_LOOKUP_LABELS.get,
+                key="history_field"
+            )
+        with c2:
+            value = st.text_input("Value", key="history_value")
+
+        if value.strip():
+            start = time.perf_counter()
+            hits = history.lookup(field, value)
+            ms = (time.perf_counter() - start) * 1000
+            if hits:
+                st.dataframe(pd.DataFrame([
+                    {
+                        "DATAFILE": hit.file_name,
+                        "Order-ID": hit.order_id,
+                        "Style": hit.style,
+                        "Season": hit.season,
+                        "SKU": hit.sku,
+                        "Barcode": hit.barcode,
+                        "Issued": datetime.fromtimestamp(hit.created_at).strftime("%d-%m-%Y %H:%M"),
+                    }
+                    for hit in hits
+                ]), hide_index=True)
+            else:
+                st.info("Not found in any issued DATAFILE.")
+            st.caption(f"{len(hits)} match(es) in {ms:.2f} ms")
+
+        stats = history.stats()
+        caption = f"{stats['datafiles']} DATAFILEs, {stats['items']} SKU rows indexed"
+        if stats["errors"]:
+            caption += f" — {stats['errors']} not saved: {stats['last_error']}"
+        st.caption(caption)
+
+
+# ================================================================
+#  DEBUG PANEL (cache stats)
+# ================================================================
+def render_debug_panel():
+    """Collapsed debug info: extraction cache hits/misses + bytes held."""
+    with st.expander("🛠 Debug", expanded=False):
+        stats = get_extraction_cache().stats()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Cache hits (memory / disk)", f"{stats['hits_memory']} / {stats['hits_disk']}")
+        c2.metric("Cache misses", stats["misses"])
+        c3.metric(
+            "Cached (memory / disk)",
+            f"{stats['memory_bytes'] / 1024:.0f} KB / {stats['disk_bytes'] / 1024:.0f} KB"
+        )
+        st.caption(
+            f"{stats['memory_items']} in memory, {stats['disk_items']} on disk"
+        )
+        prescan = get_order_prescan().stats()
+        st.caption(
+            f"Order-ID prescan: {prescan['items']} files memoized, "
+            f"{prescan['hits']} hits / {prescan['misses']} reads"
+        )
+
+        # Reference sheet snapshots (version, age, last refresh error, shared object build)
+        now = datetime.now().timestamp()
+        rows = []
+        shared = get_reference_store().status()
+        for name, info in get_reference_snapshots().status().items():
+            rows.append({
+                "sheet": name,
+                "version": info["version"],
+                "sha256": info["sha256"],
+                "KB": round(info["bytes"] / 1024, 1),
+                "fetched (min ago)": round((now - info["fetched_at"]) / 60, 1) if info["fetched_at"] else None,
+                "checked (min ago)": round((now - info["checked_at"]) / 60, 1) if info["checked_at"] else None,
+                "fetch ms": round(info["fetch_ms"]) if info["fetch_ms"] is not None else None,
+                "parse ms": round(info["parse_ms"]) if info["parse_ms"] is not None else None,
+                "shared build ms": round(shared[name]["build_ms"]) if name in shared else None,
+                "refresh error": info["error"] or "",
+            })
+        st.dataframe(pd.DataFrame(rows), hide_index=True)
+
+        # Layout fast path: sheets parsed per layout, fingerprints that fell back
+        layouts = LAYOUT_STATS.snapshot()
+        parsed_total = sum(layouts["hits"].values())
+        if parsed_total:
+            fast = parsed_total - layouts["hits"].get("generic", 0)
+            st.caption(
+                f"Layout fast path: {fast}/{parsed_total} sheets ("
+                + ", ".join(f"{name} {n}" for name, n in sorted(layouts["hits"].items())) + ")"
+            )
+            if layouts["unknown"]:
+                st.dataframe(
+                    pd.DataFrame(
+                        [{"fingerprint": key, "sheets": n} for key, n in layouts["unknown"].items()]
+                    ),
+                    hide_index=True,
+                )
+
+        # Stage timings / memory (admin only)
+        if admin_unlocked():
+            render_trace_panel()
+            render_profile_panel()
+
+
+def admin_unlocked():
+    """Admin mode for this session (password from secrets / env; off when unset)."""
+    expected = None
+    try:
+        expected = st.secrets.get("admin_password", None)
+    except Exception:
+        expected = None
+
+    if expected is None:
+        expected = os.environ.get("PEPCO_ADMIN_PASSWORD")
+
+    if not expected:
+        return False
+
+    if st.session_state.get("admin_unlocked") is True:
+        return True
+
+    def _admin_entered():
+        st.session_state["admin_unlocked"] = st.session_state.get("admin_password") == expected
+        st.session_state.pop("admin_password", None)
+
+    st.text_input("Admin password", type="password", key="admin_password", on_change=_admin_entered)
+    if st.session_state.get("admin_unlocked") is False:
+        st.error("Wrong admin password")
+    return False
+
+
+def render_trace_panel():
+    """Per-stage wall time + tracemalloc peak (pepco_trace spans)."""
+    st.markdown("#### ⏱ Stage timings")
+
+    on = st.toggle("Record stage timings", value=TRACER.enabled, key="admin_trace_on")
+    if on != TRACER.enabled:
+        if on:
+            TRACER.enable()
+        else:
+            TRACER.disable()
+        st.caption("Takes effect from the next run.")
+
+    summary = TRACER.summary()
+    if not summary:
+        st.caption("No spans recorded yet.")
+        return
+
+    st.dataframe(pd.DataFrame(summary), hide_index=True)
+    st.caption("Latest spans")
+    st.dataframe(pd.DataFrame(list(TRACER.recent)[-50:][::-1]), hide_index=True)
+
+    sinks = [f"log: {TRACER.log_path}" if TRACER.log_path else "",
+             f"prometheus: {TRACER.prom_path}" if TRACER.prom_path else ""]
+    sinks = [s for s in sinks if s]
+    if sinks:
+        st.caption(" • ".join(sinks))
+    if st.button("Clear timings", key="admin_trace_reset"):
+        TRACER.reset()
+
+
+def render_profile_panel():
+    """Arm a profiled re-run of the current sheet + list captured cases."""
+    st.markdown("#### 🧪 Profiler")
+
+    def _arm():
+        st.session_state["admin_profile_next"] = True
+
+    st.button(
+        "Re-run this sheet under the profiler",
+        key="admin_profile_arm",
+        on_click=_arm,
+        help="Parses the PDF again (no cache) under cProfile and saves a replayable case."
+    )
+
+    store = get_profile_store()
+    cases = store.cases()[:10]
+    if not cases:
+        st.caption(f"No captured cases in {store.root}")
+        return
+
+    st.dataframe(pd.DataFrame([
+        {
+            "case": os.path.basename(path),
+            "sec": case["seconds"],
+            "pdf": case["pdf"]["name"],
+            "department": case["selections"].get("department"),
+            "product": case["selections"].get("product"),
+        }
+        for path, case in cases
+    ]), hide_index=True)
+    st.caption("Replay offline: `python pepco_profile.py <case folder>`")
 
 
 # ================================================================
@@ -1296,6 +1231,9 @@ def main():
     # Main content
     pepco_section()
 
+    # Prometheus text file (throttled; no-op unless PEPCO_TRACE_PROM is set)
+    TRACER.flush()
+
     st.markdown("---")
     st.caption("This app developed by Ovi")
 
@@ -1305,8 +1243,3 @@ def main():
 # ================================================================
 if __name__ == "__main__":
     main()
-
-
-
-
-
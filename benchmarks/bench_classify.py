@@ -0,0 +1,208 @@
+# benchmarks/bench_classify.py
+# Throughput: item classification → class type / dept label / DEPT / B-G suffix
+#   legacy  → four separate lowercase + substring chains, df.apply per row (as before)
+#   engine  → pepco_classify.CLASSIFIER (one rule table, memoized per string)
+# Also checks legacy == engine on every single-phrase classification.
+# ব্যবহার:
+#   python benchmarks/bench_classify.py [--rows 200000] [--distinct 300]
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from pepco_classify import CLASSIFIER, CLASSIFICATION_RULES, ClassificationRules  # noqa: E402
+
+GROUPS = [
+    "Baby Boys", "Baby Girls", "Younger Boys", "Younger Girls",
+    "Older Boys", "Older Girls", "Ladies", "Mens", "Home", "Unisex",
+]
+LINES = ["Outerwear", "Essentials", "Underwear", "Accessories", "Nightwear"]
+
+
+# ---------- Pre-table implementation ----------
+def legacy_class_type(item_class):
+    """Determine class type key used in COLLECTION_MAPPING."""
+    if not item_class:
+        return None
+
+    ic = item_class.lower()
+
+    if 'younger girls outerwear' in ic:
+        return 'yg'
+    if 'baby boys outerwear' in ic:
+        return 'b'
+    if 'baby girls outerwear' in ic:
+        return 'a'
+    if 'baby boys essentials' in ic:
+        return 'd'
+    if 'baby girls essentials' in ic:
+        return 'd_girls'
+    if 'younger boys outerwear' in ic:
+        return 'yg'
+    if 'older girls outerwear' in ic:
+        return 'yg'
+    if 'older boys outerwear' in ic:
+        return 'yg'
+    if 'ladies outerwear' in ic:
+        return 'a'
+    if 'mens outerwear' in ic:
+        return 'b'
+
+    return None
+
+
+# ---------- Map Item_classification → Dept label ----------
+def legacy_dept_label(item_class):
+    """Map item_class text to UI Department names."""
+    if not item_class:
+        return None
+
+    ic = item_class.lower()
+
+    if 'baby boys outerwear' in ic or 'baby boys essentials' in ic:
+        return "Baby Boy"
+    if 'baby girls outerwear' in ic or 'baby girls essentials' in ic:
+        return "Baby Girl"
+    if 'younger boys outerwear' in ic or 'older boys outerwear' in ic:
+        return "Boys"
+    if 'younger girls outerwear' in ic or 'older girls outerwear' in ic:
+        return "Girls"
+    if 'ladies outerwear' in ic:
+        return "Women"
+    if 'mens outerwear' in ic:
+        return "Mens"
+
+    return None
+
+
+# ---------- Map Item_classification → DEPT column ----------
+def legacy_dept_code(item_class):
+    """Maps classification → BABY / KIDS / TEENS / WOMEN / MEN."""
+    if not item_class:
+        return ""
+
+    ic = item_class.lower()
+
+    if any(x in ic for x in ['baby boys', 'baby girls']):
+        return "BABY"
+    if any(x in ic for x in ['younger boys', 'younger girls']):
+        return "KIDS"
+    if any(x in ic for x in ['older girls', 'older boys']):
+        return "TEENS"
+    if 'ladies outerwear' in ic:
+        return "WOMEN"
+    if 'mens outerwear' in ic:
+        return "MEN"
+
+    return ""
+
+
+# ---------- Modify collection name (add B/G) ----------
+def legacy_modify_collection(collection, item_class):
+    """Append B/G based on gender groups."""
+    if not item_class:
+        return collection
+
+    ic = item_class.lower()
+
+    if any(x in ic for x in ['younger boys', 'older boys']):
+        return f"{collection} B"
+
+    if any(x in ic for x in ['younger girls', 'older girls']):
+        return f"{collection} G"
+
+    return collection
+
+
+def legacy_row(ic, collection):
+    return (
+        legacy_class_type(ic), legacy_dept_label(ic),
+        legacy_dept_code(ic), legacy_modify_collection(collection, ic),
+    )
+
+
+def engine_row(ic, collection):
+    info = CLASSIFIER.classify(ic)
+    return (
+        info.class_type, info.dept_label,
+        info.dept_code, CLASSIFIER.collection_with_gender(collection, ic),
+    )
+
+
+def synthetic_classifications(rows, distinct, seed=26):
+    """`rows` strings drawn from `distinct` realistic classification values."""
+    rng = random.Random(seed)
+    vocab = [
+        f"{rng.choice(GROUPS)} {rng.choice(LINES)} {rng.randint(100, 999)}"
+        for _ in range(distinct)
+    ]
+    return [rng.choice(vocab) for _ in range(rows)]
+
+
+def check_equivalence():
+    """Every group × line (+ casing / padding variants) agrees with legacy."""
+    samples = ["", "UNKNOWN"]
+    for g in GROUPS:
+        for line in LINES:
+            text = f"{g} {line}"
+            samples += [text, text.upper(), f"  {text.lower()} 26 "]
+    for text in samples:
+        assert legacy_row(text, "CROCO") == engine_row(text, "CROCO"), text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    check_equivalence()
+    values = synthetic_classifications(args.rows, args.distinct)
+
+    # -- scalar throughput --
+    start = time.perf_counter()
+    for ic in values:
+        legacy_row(ic, "CROCO")
+    legacy = time.perf_counter() - start
+
+    cold = ClassificationRules(CLASSIFICATION_RULES)
+    start = time.perf_counter()
+    for ic in values:
+        cold.classify(ic)
+    engine = time.perf_counter() - start
+
+    print(f"{args.rows} classifications, {args.distinct} distinct")
+    print(f"  legacy  : {args.rows / legacy:>12,.0f} /s")
+    print(f"  engine  : {args.rows / engine:>12,.0f} /s  ({legacy / engine:.1f}x)")
+
+    # -- DataFrame enrichment (one PO = many SKUs, same classification) --
+    df = pd.DataFrame({"Item_classification": values, "Collection": "CROCO"})
+
+    start = time.perf_counter()
+    dept = df['Item_classification'].apply(legacy_dept_code)
+    coll = df.apply(lambda r: legacy_modify_collection(r['Collection'], r['Item_classification']), axis=1)
+    legacy_df = time.perf_counter() - start
+
+    start = time.perf_counter()
+    item_classes = df['Item_classification']
+    dept2 = item_classes.map({ic: CLASSIFIER.classify(ic).dept_code for ic in item_classes.unique()})
+    pairs = list(zip(df['Collection'], item_classes))
+    collections = {p: CLASSIFIER.collection_with_gender(*p) for p in set(pairs)}
+    coll2 = [collections[p] for p in pairs]
+    engine_df = time.perf_counter() - start
+
+    assert dept.tolist() == dept2.tolist() and coll.tolist() == coll2
+    print(f"  enrich legacy apply : {legacy_df * 1000:>8.1f} ms")
+    print(f"  enrich broadcast    : {engine_df * 1000:>8.1f} ms  ({legacy_df / engine_df:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
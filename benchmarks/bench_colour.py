@@ -0,0 +1,196 @@
+# benchmarks/bench_colour.py
+# Colour detection — legacy DOTALL regex বনাম pepco_colour.COLOUR_DETECTOR
+#   1. corpus: sheet_factory-র প্রতিটা layout-এ দুটোর result এক
+#   2. differential: seeded random page (header / row / blank / merged line মিশিয়ে) — result এক
+#   3. adversarial: legacy যেখানে quadratic / cubic (অনেক newline, লম্বা letter/space line,
+#      header-এর পরে হাজার হাজার non-matching row) — প্রতিটা size-এ detector-এর সময়
+#      budget-এর ভেতরে আর size 16x হলে সময় ≤ ~16x (linear) কিনা check করে
+# কোনো check fail করলে exit code 1।
+# ব্যবহার:
+#   python benchmarks/bench_colour.py
+#   python benchmarks/bench_colour.py --cases 20000 --legacy      # legacy-র সময়ও (ধীর!)
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pepco_colour import COLOUR_DETECTOR, HEADER_WINDOW  # noqa: E402
+
+
+def legacy_detect(pages_text):
+    """The pre-engine implementation (three DOTALL / per-line searches)."""
+    for txt in pages_text:
+        m = re.search(
+            r"Colour.*?\n.*?\n\s*([A-Za-z ]+)\s+[0-9]{2}-[0-9]{4}",
+            txt,
+            re.IGNORECASE | re.DOTALL
+        )
+        if m:
+            return m.group(1).strip().upper()
+
+    for txt in pages_text:
+        m2 = re.search(
+            r"Purchase price.*?\n\s*([A-Za-z ]+)\s+[0-9]{2}-[0-9]{4}",
+            txt,
+            re.IGNORECASE | re.DOTALL
+        )
+        if m2:
+            return m2.group(1).strip().upper()
+
+    for txt in pages_text:
+        if "colour" in txt.lower():
+            for line in txt.splitlines():
+                if re.search(r"[A-Za-z ]+\s+[0-9]{2}-[0-9]{4}", line):
+                    name = line.split()[0:-1]
+                    if name:
+                        return " ".join(name).upper()
+
+    return None
+
+
+# ---------- 1. corpus ----------
+def check_corpus():
+    from sheet_factory import DEFAULT_CORPUS, sheet_pages
+
+    failures = []
+    for spec in DEFAULT_CORPUS:
+        pages = ["\n".join(lines) + "\n" for lines in sheet_pages(spec)]
+        old, new = legacy_detect(pages), COLOUR_DETECTOR.detect(pages)
+        if old != new:
+            failures.append(f"{spec.name}: legacy {old!r} ≠ engine {new!r}")
+    return len(DEFAULT_CORPUS), failures
+
+
+# ---------- 2. differential ----------
+LINES = [
+    "Colour", "colour:", "COLOUR table", "Main colour: RED 18-1664", "Purchase price",
+    "purchase PRICE block", "Name Pantone Code", "NAVY 19-4024", "navy blue  19-4024TCX",
+    "NAVY", "NAVY   ", "19-4024", "  19-4024", "", "   ", "\t", "A  12-3456", " 12-3456",
+    "x 1-2345", "NAVY19-4024", "NAVY\t\t19-4024 2.15", "All sizes   2.15",
+    "Incoterm FOB   Currency USD", "56 | 10000000 | 5901234560009",
+    "Colour NAVY 19-4024 56 | 10000000 | 5901234560009", "RED 18-1664 2.15",
+    "Sales prices", "PL 29,99 PLN", "12-3456 NAVY", "Ivory 11-0507 / Ecru", "- 12-3456",
+    "  NAVY 19-4024", " ", "  ", "NAVY \t", "\t 19-4024", " \t", "Off White", "Colour NAVY",
+]
+
+
+def random_pages(rng):
+    pages = []
+    for _ in range(rng.randint(1, 3)):
+        # Short pages: every row stays inside the header window, where the
+        # engine must agree with legacy exactly
+        lines = [rng.choice(LINES) for _ in range(rng.randint(0, HEADER_WINDOW - 2))]
+        pages.append("\n".join(lines) + rng.choice(["", "\n"]))
+    return pages
+
+
+def check_differential(cases, seed):
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(cases):
+        pages = random_pages(rng)
+        old, new = legacy_detect(pages), COLOUR_DETECTOR.detect(pages)
+        if old != new:
+            failures.append(f"{pages!r}: legacy {old!r} ≠ engine {new!r}")
+    return failures
+
+
+# ---------- 3. adversarial ----------
+ADVERSARIAL = {
+    # header followed by thousands of newlines, nothing matches
+    "newlines": lambda n: ["Colour\n" + "x\n" * n],
+    # one long letter/space line after the header
+    "letter-space line": lambda n: ["Colour\nhead\n" + "A " * n + "\n"],
+    # letter + long whitespace run, digit but no pantone
+    "space run": lambda n: ["colour\n" + "A" + " " * n + "1\n"],
+    # many name-only rows (no pantone anywhere)
+    "name rows": lambda n: ["Colour\n" + "NAVY BLUE\n" * n],
+    # a header on every line
+    "header every line": lambda n: ["Colour NAVY\n" * n],
+    # purchase block with trailing-space rows
+    "purchase rows": lambda n: ["Purchase price\n" + "AB CD  \n" * n],
+    # fallback scan: pantone-like tokens without a name
+    "fallback tokens": lambda n: ["colour\n" + " 12-3456" * n + "\n"],
+    # colour far down a long page (found by the fallback)
+    "late row": lambda n: ["Colour\n" + "filler line\n" * n + "NAVY 19-4024\n"],
+}
+
+
+def _seconds(fn, pages, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_adversarial(sizes, budget_ms, legacy, legacy_max):
+    failures = []
+    print(f"\n{'case':<20}" + "".join(f"{n:>12}" for n in sizes) + "   (engine ms" + (" / legacy ms)" if legacy else ")"))
+    for name, make in ADVERSARIAL.items():
+        times = []
+        cells = []
+        for n in sizes:
+            pages = make(n)
+            t = _seconds(COLOUR_DETECTOR.detect, pages)
+            times.append(t)
+            cell = f"{t * 1000:.2f}"
+            if legacy and n <= legacy_max:
+                cell += f"/{_seconds(legacy_detect, pages, repeat=1) * 1000:.0f}"
+            cells.append(cell)
+            if t * 1000 > budget_ms:
+                failures.append(f"{name} n={n}: {t * 1000:.1f} ms > budget {budget_ms} ms")
+        print(f"{name:<20}" + "".join(f"{c:>12}" for c in cells))
+
+        # Linear: growing the input k-fold may cost at most ~2k-fold (timer noise)
+        growth = sizes[-1] / sizes[0]
+        floor = 0.05e-3            # below 50 µs ratios are noise
+        if times[-1] > floor and times[-1] / max(times[0], floor) > 2 * growth:
+            failures.append(
+                f"{name}: {growth:.0f}x input → {times[-1] / max(times[0], floor):.0f}x time (not linear)"
+            )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Colour detection: equivalence + bounded cost")
+    parser.add_argument("--cases", type=int, default=5000, help="random differential cases")
+    parser.add_argument("--seed", type=int, default=26)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="max engine time per page set")
+    parser.add_argument("--legacy", action="store_true", help="also time legacy (quadratic: slow)")
+    parser.add_argument("--legacy-max", type=int, default=1000, help="largest size legacy is timed at")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    n_corpus, corpus_failures = check_corpus()
+    failures += corpus_failures
+    print(f"corpus:       {n_corpus - len(corpus_failures)}/{n_corpus} sheets match legacy")
+
+    diff_failures = check_differential(args.cases, args.seed)
+    failures += diff_failures
+    print(f"differential: {args.cases - len(diff_failures)}/{args.cases} random page sets match legacy")
+
+    failures += check_adversarial(sorted(args.sizes), args.budget_ms, args.legacy, args.legacy_max)
+
+    if failures:
+        print(f"\n❌ {len(failures)} failure(s)")
+        for f in failures[:20]:
+            print("  " + f)
+        return 1
+    print("\n✅ engine matches legacy and stays linear / within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
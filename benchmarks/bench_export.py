@@ -0,0 +1,119 @@
+# benchmarks/bench_export.py
+# DATAFILE CSV export: legacy itertuples → csv.writer → StringIO → str → bytes
+# vs pepco_export (chunked, column-wise, straight to bytes). Output must be
+# byte-identical; also bundles N datafiles into one ZIP.
+# ব্যবহার:
+#   python benchmarks/bench_export.py [--rows 10000] [--files 20]
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from pepco_export import DatafileBundle, datafile_csv_bytes  # noqa: E402
+
+COLUMNS = [
+    "Order_ID", "Style", "Colour", "Supplier_product_code",
+    "Item_classification", "Supplier_name", "today_date",
+    "Collection", "Colour_SKU", "Style_Merch_Season",
+    "Batch", "barcode", "washing_code", "EUR", "BGN",
+    "BAM", "PLN", "RON", "CZK", "MKD", "RSD", "HUF",
+    "product_name", "Dept", "Item_name_English", "Season", "Cotton",
+]
+
+
+def legacy_csv(df, final_cols):
+    """The pre-streaming implementation."""
+    csv_buffer = io.StringIO()
+    writer = csv.writer(csv_buffer, delimiter=';', quoting=csv.QUOTE_ALL)
+    writer.writerow(final_cols)
+    for row in df.itertuples(index=False):
+        writer.writerow(row)
+    return csv_buffer.getvalue().encode('utf-8-sig')
+
+
+def synthetic_datafile(rows):
+    product = (
+        '|EN| Baby boy basic T-shirt |AL| Bluzë: 95% Pambuk, 5% Elastan |BG| Тениска '
+        '|BiH| Majica. Sastav materijala na ušivenoj etiketi. |MK| Маица: 95% Памук '
+        '|RS| Majica "basic". Sastav materijala nalazi se na ušivenoj etiketi.'
+    )
+    data = {c: [f"{c}-{i % 97}" for i in range(rows)] for c in COLUMNS}
+    data["product_name"] = [product] * rows
+    data["barcode"] = [str(5901234000000 + i) for i in range(rows)]
+    data["Colour_SKU"] = [f"NAVY • SKU {10000000 + i}" for i in range(rows)]
+    return pd.DataFrame(data)
+
+
+def edge_cases():
+    """Mixed types / quotes / newlines / separators → must match csv.writer."""
+    df = pd.DataFrame({
+        "a": ["x", None, 'say "hi"', "semi;colon", "line\r\nbreak", "", "\x00nul"],
+        "b": [1.5, float("nan"), 3.0, 1e20, -0.0, 2.25, 7.0],
+        "c": [1, 2, 3, 4, 5, 6, 7],
+        "d": [True, False, None, "ü", "\x01", "tab\t", '"'],
+    })
+    return df, list(df.columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df, cols = edge_cases()
+    for chunk in (1, 2, 4096):
+        assert datafile_csv_bytes(df, cols, chunk) == legacy_csv(df, cols), "edge cases differ"
+    assert datafile_csv_bytes(df.iloc[:0], cols) == legacy_csv(df.iloc[:0], cols)
+
+    df = synthetic_datafile(args.rows)
+    legacy = legacy_csv(df, COLUMNS)
+    assert datafile_csv_bytes(df, COLUMNS) == legacy, "10k export differs"
+
+    print(f"{args.rows} rows × {len(COLUMNS)} cols → {len(legacy) / 1e6:.1f} MB")
+    results = {}
+    for name, fn in (("legacy", legacy_csv), ("streaming", datafile_csv_bytes)):
+        best = min(_timed(fn, df) for _ in range(5))
+        tracemalloc.start()
+        fn(df, COLUMNS)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = best
+        print(f"  {name:<10} {best * 1000:>8.1f} ms   peak {peak / 1e6:>6.1f} MB")
+    print(f"  speedup    {results['legacy'] / results['streaming']:.1f}x")
+
+    # -- ZIP bundle of many datafiles, written entry by entry --
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bundle.zip")
+        start = time.perf_counter()
+        with DatafileBundle(path) as bundle:
+            for _ in range(args.files):
+                bundle.add("PEPCO_SS26_DATAFILE.csv", df, COLUMNS)
+        elapsed = time.perf_counter() - start
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            assert zf.read(names[-1]) == legacy
+        print(f"  zip {args.files} files: {elapsed * 1000:.0f} ms, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB ({names[1]}, ...)")
+
+
+def _timed(fn, df):
+    start = time.perf_counter()
+    fn(df, COLUMNS)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_fetch.py
+# Cold-start reference fetch: sequential pd.read_csv(url) (old way) vs
+# ReferenceFetcher.fetch_all (pooled session, concurrent, parse in workers)
+# against the local SheetsServer with injected delay / failure / hang.
+# ব্যবহার:
+#   python benchmarks/bench_fetch.py [--delay 0.5]
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+from pepco_fetch import ReferenceFetcher  # noqa: E402
+from sheets_server import SheetsServer  # noqa: E402
+
+SHEETS = ("prices", "translations", "materials")
+
+
+def _write_csvs(root):
+    pd.DataFrame({
+        "PLN": [9.99, 19.99, 29.99], "EUR": [2.5, 4.99, 7.49], "HUF": [999, 1999, 2999],
+    }).to_csv(os.path.join(root, "prices.csv"), index=False)
+    pd.DataFrame({
+        "DEPARTMENT": ["Baby Boy"] * 200, "PRODUCT_NAME": [f"P{i}" for i in range(200)],
+        "EN": ["x"] * 200, "AL": ["y"] * 200,
+    }).to_csv(os.path.join(root, "translations.csv"), index=False)
+    pd.DataFrame({
+        "Name": ["Cotton", "Elastane"], "AL": ["Pambuk", "Elastan"], "MK": ["Памук", "Еластан"],
+    }).to_csv(os.path.join(root, "materials.csv"), index=False)
+
+
+def _parse(body):
+    return pd.read_csv(BytesIO(body))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=0.5, help="Injected per-sheet server delay (s)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        _write_csvs(root)
+        with SheetsServer(root) as server:
+            urls = {name: f"{server.url}/{name}.csv?delay={args.delay}" for name in SHEETS}
+
+            # -- old: three blocking pd.read_csv(url) in a row --
+            start = time.perf_counter()
+            for url in urls.values():
+                pd.read_csv(url)
+            sequential = time.perf_counter() - start
+
+            # -- new: concurrent, pooled, parsed in workers --
+            fetcher = ReferenceFetcher(retries=2, backoff=0.1)
+            start = time.perf_counter()
+            results = fetcher.fetch_all(
+                {name: (url, {}) for name, url in urls.items()},
+                parsers={name: _parse for name in SHEETS},
+            )
+            concurrent = time.perf_counter() - start
+
+            print(f"sequential read_csv : {sequential:.2f}s")
+            print(f"concurrent fetch_all: {concurrent:.2f}s")
+            for r in results.values():
+                print(f"  {r.name:<13} status={r.status} fetch={r.fetch_seconds * 1000:.0f}ms "
+                      f"parse={r.parse_seconds * 1000:.1f}ms error={r.error}")
+
+            # -- fault injection: 2x 503 then OK (retried), and a hung socket --
+            faulty = {
+                "prices": (f"{server.url}/prices.csv?fail=2", {}),
+                "materials": (f"{server.url}/materials.csv?hang=1", {}),
+            }
+            hang_fetcher = ReferenceFetcher(read_timeout=1.0, retries=2, backoff=0.1)
+            start = time.perf_counter()
+            faulty_results = hang_fetcher.fetch_all(faulty, parsers={"prices": _parse})
+            print(f"fault injection     : {time.perf_counter() - start:.2f}s")
+            for r in faulty_results.values():
+                print(f"  {r.name:<13} status={r.status} error={(r.error or '')[:70]}")
+
+            fetcher.close()
+            hang_fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
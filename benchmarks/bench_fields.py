@@ -0,0 +1,119 @@
+# benchmarks/bench_fields.py
+# Micro-benchmark: page-1 identifier extraction
+#   legacy    → one re.search per field (module-level re cache), as before
+#   combined  → single alternation scan over all labels (reference only)
+#   engine    → pepco_fields.FIELD_EXTRACTOR (precompiled table)
+# ব্যবহার:
+#   python benchmarks/bench_fields.py [--pages 6] [--number 2000]
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pepco_fields import FIELD_EXTRACTOR, FIELD_SPECS  # noqa: E402
+
+LEGACY_FIELDS = [
+    "item_name_en", "merch_code", "season", "style_code", "collection",
+    "handover_date", "order_id", "item_class", "supplier_code", "supplier_name",
+]
+
+
+def synthetic_pages(page_count=6, filler_lines=40):
+    """Page 1 with identifiers spread between filler lines + filler pages."""
+    labels = [
+        "Style 654321  Version 3",
+        "Merch code ........ BB/12",
+        "Season ........ SS 26",
+        "Collection ........ CROCO CLUB - summer",
+        "Handover date ........ 15/03/2026",
+        "Order - ID ........ 4500123_AB",
+        "Item classification ........ Baby Boys Outerwear",
+        "Supplier product code ........ SP-001",
+        "Supplier name ........ ACME LTD",
+        "Item name English: Baby boy basic T-shirt",
+    ]
+    filler = [
+        f"Lorem ipsum dolor sit amet {i} consectetur adipiscing elit sed do"
+        for i in range(filler_lines)
+    ]
+    half = filler_lines // 2
+    page1 = "\n".join(["PEPCO Product Data Sheet"] + filler[:half] + labels + filler[half:]) + "\n"
+    return [page1] + ["\n".join(filler) + "\n" for _ in range(page_count - 1)]
+
+
+def legacy_extract(pages_text):
+    """The pre-table implementation (per-field re.search on joined text)."""
+    full_text = "\n".join(pages_text)
+    page1 = pages_text[0]
+
+    m_item = re.search(r"Item\s*name\s*English\s*[:\.]{1,}\s*(.+)", full_text, re.IGNORECASE)
+    if not m_item:
+        m_item = re.search(r"Item\s*name\s*[:\.]{1,}\s*(.+?)\n", full_text, re.IGNORECASE)
+
+    return {
+        "item_name_en": m_item,
+        "merch_code": re.search(r"Merch\s*code\s*\.{2,}\s*([\w/]+)", page1),
+        "season": re.search(r"Season\s*\.{2,}\s*(\w+)?\s*(\d{2})", page1),
+        "style_code": re.search(r"\b\d{6}\b", page1),
+        "collection": re.search(r"Collection\s*\.{2,}\s*(.+)", page1),
+        "handover_date": re.search(r"Handover\s*date\s*\.{2,}\s*(\d{2}/\d{2}/\d{4})", page1),
+        "order_id": re.search(r"Order\s*-\s*ID\s*\.{2,}\s*(.+)", page1),
+        "item_class": re.search(r"Item classification\s*\.{2,}\s*(.+)", page1),
+        "supplier_code": re.search(r"Supplier product code\s*\.{2,}\s*(.+)", page1),
+        "supplier_name": re.search(r"Supplier name\s*\.{2,}\s*(.+)", page1),
+    }
+
+
+_COMBINED = re.compile("|".join(
+    f"(?=(?P<{s.name}>{s.label}{s.value}))" for s in FIELD_SPECS if s.name in LEGACY_FIELDS
+), re.IGNORECASE)
+
+
+def combined_extract(pages_text):
+    """Single-pass alternation (lookahead per field) over page 1."""
+    found = {}
+    for m in _COMBINED.finditer(pages_text[0]):
+        found.setdefault(m.lastgroup, m)
+        if len(found) == len(LEGACY_FIELDS):
+            break
+    return found
+
+
+def engine_extract(pages_text):
+    return FIELD_EXTRACTOR.extract(pages_text, names=LEGACY_FIELDS)
+
+
+def _values(result):
+    out = {}
+    for name in LEGACY_FIELDS:
+        m = result.get(name)
+        out[name] = None if m is None else m.group(0)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    pages = synthetic_pages(args.pages)
+    assert _values(legacy_extract(pages)) == _values(engine_extract(pages)), "engine ≠ legacy"
+
+    print(f"{'variant':<10} {'µs/sheet':>10}")
+    base = None
+    for name, fn in (("legacy", legacy_extract), ("combined", combined_extract), ("engine", engine_extract)):
+        best = min(timeit.repeat(lambda: fn(pages), number=args.number, repeat=5))
+        us = best / args.number * 1e6
+        base = base or us
+        print(f"{name:<10} {us:>10.1f}  ({base / us:.2f}x vs legacy)")
+
+
+if __name__ == "__main__":
+    main()
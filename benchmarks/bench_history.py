@@ -0,0 +1,143 @@
+# benchmarks/bench_history.py
+# DATAFILE history index (pepco_history) — লাখ row-এ write / lookup
+#   - --datafiles টা DATAFILE (প্রতিটায় --skus row) background writer দিয়ে লেখা:
+#     record() call কত µs (UI thread এটুকুই অপেক্ষা করে), মোট write throughput
+#   - barcode / SKU / Order-ID / Style / Season lookup: median / p99 (hit আর miss)
+#   - duplicates(): একটা নতুন sheet-এর সব barcode একবারে history-র সাথে মেলানো
+#   - lookup p99 budget (--budget-ms, default 1 ms) ছাড়ালে exit code 1
+# ব্যবহার:
+#   python benchmarks/bench_history.py
+#   python benchmarks/bench_history.py --datafiles 20000 --skus 24 --lookups 5000
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pepco_history import DatafileHistory, HistoryEntry  # noqa: E402
+from sheet_factory import ean13  # noqa: E402
+
+SEASONS = ("SS25", "AW25", "SS26", "AW26")
+
+
+def entry(n, skus):
+    """Synthetic issued DATAFILE n (unique SKUs / barcodes, two Order-IDs on every 10th)."""
+    first = 10_000_000 + n * 100
+    style = str(600_000 + n)
+    orders = (str(4_500_000 + n),) + ((str(4_600_000 + n),) if n % 10 == 0 else ())
+    sku_list = tuple(str(first + i) for i in range(skus))
+    return HistoryEntry(
+        f"PEPCO_{SEASONS[n % 4]}_{sku_list[0]}_DATAFILE_SP-{n % 500:03d}_00_{style}.csv",
+        orders, style, SEASONS[n % 4], f"SP-{n % 500:03d}",
+        f"{n:064x}", f"{n + 1:064x}", time.time(),
+        sku_list,
+        tuple(ean13(590_000_000_000 + n * 100 + i) for i in range(skus)),
+    )
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DATAFILE history: background writes, indexed lookups")
+    parser.add_argument("--datafiles", type=int, default=10_000)
+    parser.add_argument("--skus", type=int, default=30, help="rows per DATAFILE")
+    parser.add_argument("--lookups", type=int, default=2000, help="lookups per field")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="max p99 lookup time")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as root:
+        history = DatafileHistory(os.path.join(root, "history.sqlite3"))
+
+        # -- Writes: record() latency on the caller's thread, then total throughput --
+        entries = [entry(n, args.skus) for n in range(args.datafiles)]
+        calls = []
+        start = time.perf_counter()
+        for e in entries:
+            t = time.perf_counter()
+            history.record(e)
+            calls.append(time.perf_counter() - t)
+        history.flush()
+        wall = time.perf_counter() - start
+        stats = history.stats()
+        print(f"{stats['datafiles']} DATAFILEs, {stats['items']} SKU rows written in {wall:.2f}s "
+              f"({stats['items'] / wall:,.0f} rows/s)")
+        print(f"record(): median {statistics.median(calls) * 1e6:.1f} µs, "
+              f"p99 {percentile(calls, 0.99) * 1e6:.1f} µs on the calling thread")
+
+        # -- Lookups (existing values + misses) --
+        picks = [entries[rng.randrange(len(entries))] for _ in range(args.lookups)]
+        values = {
+            "barcode": [rng.choice(e.barcodes) for e in picks],
+            "sku": [rng.choice(e.skus) for e in picks],
+            "order_id": [e.order_ids[-1] for e in picks],
+            "style": [e.style for e in picks],
+            "season": [e.season for e in picks],
+        }
+        misses = {"barcode": "5909999999999", "sku": "99999999", "order_id": "1",
+                  "style": "1", "season": "XX99"}
+
+        failures = []
+        print(f"\n{'field':>9} {'median µs':>10} {'p99 µs':>8} {'miss µs':>8} {'hits':>6}")
+        for field, wanted in values.items():
+            samples, found = [], 0
+            for value in wanted:
+                t = time.perf_counter()
+                hits = history.lookup(field, value, limit=20)
+                samples.append(time.perf_counter() - t)
+                found += bool(hits)
+            t = time.perf_counter()
+            history.lookup(field, misses[field])
+            miss = time.perf_counter() - t
+            p99 = percentile(samples, 0.99)
+            print(f"{field:>9} {statistics.median(samples) * 1e6:>10.1f} {p99 * 1e6:>8.1f} "
+                  f"{miss * 1e6:>8.1f} {found:>6}")
+            if found != len(wanted):
+                failures.append(f"{field}: {len(wanted) - found} recorded values not found")
+            if p99 * 1000 > args.budget_ms:
+                failures.append(f"{field}: p99 {p99 * 1000:.2f} ms > budget {args.budget_ms} ms")
+
+        # -- Duplicate check of one new upload (half its barcodes issued before) --
+        new = entry(args.datafiles + 1, 240)
+        issued = entries[rng.randrange(len(entries))].barcodes
+        barcodes = issued + new.barcodes[len(issued):]
+        samples = []
+        for _ in range(50):
+            t = time.perf_counter()
+            dupes = history.duplicates(barcodes)
+            samples.append(time.perf_counter() - t)
+        print(f"\nduplicates() for a {len(barcodes)}-barcode sheet: "
+              f"median {statistics.median(samples) * 1000:.2f} ms, {len(dupes)} flagged")
+        if len(dupes) != len(issued):
+            failures.append(f"duplicates: {len(dupes)} flagged, expected {len(issued)}")
+
+        # Same CSV downloaded again → not recorded twice
+        history.record(entries[0])
+        history.flush()
+        if history.stats()["datafiles"] != args.datafiles:
+            failures.append("re-recorded CSV counted twice")
+        history.close()
+
+    if failures:
+        print(f"\n❌ {len(failures)} failure(s)")
+        for f in failures:
+            print("  " + f)
+        return 1
+    print(f"\n✅ every lookup p99 under {args.budget_ms} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
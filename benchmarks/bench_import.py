@@ -0,0 +1,99 @@
+# benchmarks/bench_import.py
+# Import / worker start-up time — প্রতিটা measurement একটা নতুন python process-এ
+#   - import <module>: শুধু import (interpreter start বাদ)
+#   - worker: spawn হওয়া pool worker যা করে — pepco_pool import + প্রথম sheet extract
+# সাথে দেখায় কোন heavy package (streamlit / pandas / fitz / requests) load হয়েছে।
+# ব্যবহার:
+#   python benchmarks/bench_import.py
+#   python benchmarks/bench_import.py --repeat 15 --json imports.json
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("streamlit", "pandas", "fitz", "requests", "sqlite3")
+
+MODULES = ("pepco_core", "pepco_pool", "pepco_batch", "app")
+
+_IMPORT = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_WORKER = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+raw = open({pdf!r}, "rb").read()
+start = time.perf_counter()
+from pepco_pool import extract_sheet
+extracted, _ = extract_sheet(raw, "bench.pdf")
+seconds = time.perf_counter() - start
+assert extracted["parsed"]["skus"]
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _run(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(code, repeat):
+    runs = [_run(code) for _ in range(repeat)]
+    samples = [r["seconds"] * 1000 for r in runs]
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import and worker start-up time")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", help="write results here")
+    args = parser.parse_args(argv)
+
+    from sheet_factory import SheetSpec, make_sheet
+
+    pdf = os.path.join(ROOT, ".pepco_cache", "bench_import_sheet.pdf")
+    os.makedirs(os.path.dirname(pdf), exist_ok=True)
+    with open(pdf, "wb") as fh:
+        fh.write(make_sheet(SheetSpec()))
+
+    results = {}
+    for module in MODULES:
+        results[f"import {module}"] = measure(
+            _IMPORT.format(root=ROOT, module=module, heavy=HEAVY), args.repeat
+        )
+    results["worker: import + first sheet"] = measure(
+        _WORKER.format(root=ROOT, pdf=pdf, heavy=HEAVY), args.repeat
+    )
+
+    print(f"{'':<32} {'median ms':>10} {'min ms':>8}  heavy modules loaded")
+    for name, r in results.items():
+        print(f"{name:<32} {r['median_ms']:>10.1f} {r['min_ms']:>8.1f}  {', '.join(r['loaded']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"→ {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# benchmarks/bench_pipeline.py
+# Per-stage timing of the whole DATAFILE pipeline on a synthetic sheet corpus
+#   open → text → fields → colour → pairing → enrich → translate → prices → export
+#   document = open + parse_pdf_document (layout fingerprint → শুধু দরকারি page extract)
+# প্রতিটা stage আলাদা করে মাপা হয় (setup সময় বাদ), প্রতি sheet-এ median / min।
+# Result JSON-এ যায়; আগের run-এর JSON (--baseline) এর সাথে তুলনা করে
+# threshold-এর বেশি ধীর হলে regression হিসেবে দেখায় এবং exit code 1।
+# ব্যবহার:
+#   python benchmarks/bench_pipeline.py --json base.json
+#   python benchmarks/bench_pipeline.py --json new.json --baseline base.json [--threshold 0.15]
+#   python benchmarks/bench_pipeline.py --corpus /tmp/sheets          # নিজের PDF folder
+#   python benchmarks/bench_pipeline.py --against new.json --baseline base.json   # শুধু তুলনা
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+import pepco_core as core  # noqa: E402
+from pepco_catalog import LANGUAGE_ORDER, ProductCatalog  # noqa: E402
+from pepco_fields import FIELD_EXTRACTOR  # noqa: E402
+from pepco_materials import MaterialTable  # noqa: E402
+from pepco_prices import PriceLadder  # noqa: E402
+from pepco_reader import PdfDocument  # noqa: E402
+from sheet_factory import DEFAULT_CORPUS, make_sheet  # noqa: E402
+
+STAGES = (
+    "open", "text", "fields", "colour", "pairing", "document",
+    "enrich", "translate", "prices", "export",
+)
+
+SCHEMA = 1
+
+VALID_ROWS = [{"mat": "Cotton", "pct": 95}, {"mat": "Elastane", "pct": 5}]
+
+
+# ---------- Reference data (what the Google Sheets would provide) ----------
+def reference_data(product="Baby boy basic T-shirt", dept="Baby Boy"):
+    row = {"DEPARTMENT": dept, "PRODUCT_NAME": product, "EN": product, "ES_CA": f"{product} (CA)"}
+    row.update({lang: f"{product} [{lang}]" for lang in LANGUAGE_ORDER})
+    catalog = ProductCatalog(pd.DataFrame([row]))
+
+    materials = MaterialTable.from_records(
+        {"material": m, "language": lang, "translation": f"{m} ({lang})"}
+        for m in ("Cotton", "Elastane", "Polyester")
+        for lang in ("AL", "MK")
+    )
+
+    ladder = PriceLadder({
+        "PLN": [19.99, 29.99, 39.99], "EUR": [4.99, 7.49, 9.99],
+        "BGN": [9.8, 14.7, 19.6], "BAM": [9.8, 14.7, 19.6],
+        "RON": [23.99, 35.99, 47.99], "CZK": [119.0, 179.0, 239.0],
+        "MKD": [299.0, 449.0, 599.0], "RSD": [599.0, 899.0, 1199.0],
+        "HUF": [1999.0, 2999.0, 3999.0],
+    })
+    return catalog.template(dept, product), materials, ladder
+
+
+# ---------- Timing ----------
+def _measure(setup, fn, repeat, min_sample=0.002):
+    """
+    (seconds per call samples, calls per sample): `repeat` samples, each the
+    mean of enough calls (inputs prepared by setup() beforehand) to last
+    >= min_sample.
+    """
+    number = 1
+    while True:
+        args = [setup() for _ in range(number)]
+        start = time.perf_counter()
+        for a in args:
+            fn(a)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample or number >= 1 << 14:
+            break
+        number *= 4
+
+    samples = []
+    for _ in range(repeat):
+        args = [setup() for _ in range(number)]
+        start = time.perf_counter()
+        for a in args:
+            fn(a)
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def bench_sheet(raw, repeat, reference):
+    """{stage: {"median_ms", "min_ms", "samples", "loops"}, "_rows": n} for one sheet."""
+    template, materials, ladder = reference
+
+    # One straight run → inputs of every stage (doc stays open: word boxes
+    # of split-cell tables are part of the pairing stage)
+    words_doc = PdfDocument(raw)
+    pages = list(words_doc)
+    parsed = core.parse_pdf_pages(pages, words_doc.page_words)
+    colour = parsed["Colour"] or "UNKNOWN"
+    base = core.build_sheet(parsed, colour, parsed["skus"], parsed["barcodes"])
+    enriched = core.enrich_sheet(base, template, VALID_ROWS, materials, "9")
+    match = core.resolve_price_tier(29.99, ladder)
+    final, final_cols = core.finalize_sheet(enriched, match.values, match.pln)
+
+    def _open(r):
+        doc = PdfDocument(r)
+        len(doc)
+        doc.close()
+
+    def _open_doc():
+        doc = PdfDocument(raw)
+        len(doc)
+        return doc
+
+    def _text(doc):
+        list(doc)
+        doc.close()
+
+    def _document(doc):
+        core.parse_pdf_document(doc)
+        doc.close()
+
+    def _pairing(_):
+        pairing = core.extract_sku_barcodes(pages, words_doc.page_words)
+        core.build_sheet(parsed, colour, pairing.skus, pairing.barcodes)
+
+    def _translate(_):
+        names, compositions = core.translate_material_rows(VALID_ROWS, materials)
+        template.render([r["mat"] for r in VALID_ROWS], names, compositions)
+
+    def _prices(sheet):
+        match = core.resolve_price_tier(29.99, ladder)
+        core.finalize_sheet(sheet, match.values, match.pln)
+
+    plan = {
+        "open": (lambda: raw, _open),
+        "text": (_open_doc, _text),
+        "fields": (lambda: pages, FIELD_EXTRACTOR.extract),
+        "colour": (lambda: pages, core.detect_colour_from_pdf_pages),
+        "pairing": (lambda: None, _pairing),
+        "document": (_open_doc, _document),
+        "enrich": (
+            lambda: base,
+            lambda sheet: core.enrich_sheet(sheet, template, VALID_ROWS, materials, "9"),
+        ),
+        "translate": (lambda: None, _translate),
+        "prices": (lambda: enriched, _prices),
+        "export": (lambda: final, lambda sheet: core.build_datafile_csv(sheet, final_cols)),
+    }
+
+    out = {}
+    for stage in STAGES:
+        setup, fn = plan[stage]
+        samples, loops = _measure(setup, fn, repeat)
+        out[stage] = {
+            "median_ms": round(statistics.median(samples) * 1000, 4),
+            "min_ms": round(min(samples) * 1000, 4),
+            "samples": repeat,
+            "loops": loops,
+        }
+    words_doc.close()
+    out["_rows"] = len(base)
+    return out
+
+
+def environment():
+    try:
+        import fitz
+        pymupdf = fitz.VersionBind
+    except Exception:
+        pymupdf = None
+    try:
+        rev = subprocess.run(
+            ["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        rev = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pymupdf": pymupdf,
+        "pandas": pd.__version__,
+        "git": rev,
+    }
+
+
+def load_corpus(folder=None):
+    """[(name, raw bytes)] from a PDF folder, else the generated default corpus."""
+    if folder:
+        paths = sorted(glob.glob(os.path.join(folder, "*.pdf")))
+        return [(os.path.splitext(os.path.basename(p))[0], open(p, "rb").read()) for p in paths]
+    return [(spec.name, make_sheet(spec)) for spec in DEFAULT_CORPUS]
+
+
+def run(corpus, repeat):
+    reference = reference_data()
+    results = {}
+    for name, raw in corpus:
+        results[name] = bench_sheet(raw, repeat, reference)
+
+    totals = {
+        stage: round(sum(r[stage]["median_ms"] for r in results.values()), 4)
+        for stage in STAGES
+    }
+    return {
+        "schema": SCHEMA,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {"repeat": repeat, "sheets": len(results)},
+        "results": results,
+        "totals_ms": totals,
+    }
+
+
+# ---------- Regression check ----------
+def compare(baseline, current, threshold=0.15, min_delta_ms=0.01, metric="min_ms"):
+    """
+    [(sheet, stage, base_ms, new_ms, ratio)] where metric (min_ms: least
+    sensitive to scheduler noise) got slower by more than threshold
+    (relative) AND min_delta_ms (absolute, noise floor).
+    """
+    regressions = []
+    for sheet, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(sheet)
+        if not base_stages:
+            continue
+        for stage in STAGES:
+            if stage not in stages or stage not in base_stages:
+                continue
+            old = base_stages[stage][metric]
+            new = stages[stage][metric]
+            if new > old * (1 + threshold) and new - old > min_delta_ms:
+                regressions.append((sheet, stage, old, new, new / old if old else float("inf")))
+    return regressions
+
+
+def print_table(report):
+    results = report["results"]
+    width = max([len(n) for n in results] + [5])
+    print(f"{'sheet':<{width}} {'rows':>5} " + " ".join(f"{s:>9}" for s in STAGES))
+    for name, stages in results.items():
+        cells = " ".join(f"{stages[s]['median_ms']:>9.3f}" for s in STAGES)
+        print(f"{name:<{width}} {stages['_rows']:>5} {cells}")
+    totals = report["totals_ms"]
+    print(f"{'total ms':<{width}} {'':>5} " + " ".join(f"{totals[s]:>9.3f}" for s in STAGES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage pipeline benchmark")
+    parser.add_argument("--corpus", help="folder of PDFs (default: generated corpus)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", help="write results here")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--against", help="compare this results JSON instead of running")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown flagged (0.15 = 15%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.01, help="ignore smaller absolute slowdowns")
+    parser.add_argument("--metric", choices=("min_ms", "median_ms"), default="min_ms")
+    args = parser.parse_args(argv)
+
+    if args.against:
+        with open(args.against, encoding="utf-8") as fh:
+            report = json.load(fh)
+    else:
+        report = run(load_corpus(args.corpus), args.repeat)
+        print_table(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+            print(f"→ {args.json}")
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("schema") != report.get("schema"):
+        print(f"⚠️ schema mismatch ({baseline.get('schema')} vs {report.get('schema')})")
+
+    regressions = compare(baseline, report, args.threshold, args.min_delta_ms, args.metric)
+    if not regressions:
+        print(f"✅ no stage slower than +{args.threshold:.0%} vs {args.baseline}")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) vs {args.baseline} (> +{args.threshold:.0%}, {args.metric}):")
+    for sheet, stage, old, new, ratio in regressions:
+        print(f"  {sheet:<32} {stage:<10} {old:>9.3f} → {new:>9.3f} ms  ({ratio:.2f}x)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
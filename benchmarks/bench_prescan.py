@@ -0,0 +1,153 @@
+# benchmarks/bench_prescan.py
+# Merged upload Order-ID prescan — legacy (প্রতি rerun-এ serial, প্রতিটা PDF open)
+# বনাম OrderIdPrescan (pool-এ parallel, content hash ধরে memoize)
+#   - --sheets টা secondary sheet (+ কয়েকটা হুবহু একই file আর একই Order-ID-র
+#     আলাদা file), প্রতিটা --pad-kb পর্যন্ত বড় (আসল upload-এর মতো hash / transfer খরচ)
+#   - প্রথম pass (cold) আর rerun: প্রতি rerun-এ upload থেকে নতুন PdfDocument, যেমন app-এ
+#     (upload-এর hash আগের pass থেকে জানা → আবার hash হয় না)
+#   - merge হওয়া Order-ID, duplicate file, repeated Order-ID ঠিক আছে কিনা; rerun-এ
+#     কোনো file আবার পড়া হলে বা --budget-ms ছাড়ালে exit code 1
+# ব্যবহার:
+#   python benchmarks/bench_prescan.py
+#   python benchmarks/bench_prescan.py --sheets 60 --pad-kb 800 --workers 4
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pepco_core import extract_order_id_only  # noqa: E402
+from pepco_pool import SheetPool  # noqa: E402
+from pepco_prescan import OrderIdPrescan  # noqa: E402
+from pepco_reader import PdfDocument  # noqa: E402
+from sheet_factory import SheetSpec, make_sheet  # noqa: E402
+
+
+def padded(raw: bytes, kb: int, seed: int) -> bytes:
+    """Same sheet with an embedded file, so the PDF is about `kb` KB."""
+    if kb <= 0:
+        return raw
+    import fitz
+
+    doc = fitz.open(stream=raw, filetype="pdf")
+    doc.embfile_add("scan.bin", os.urandom(kb * 1024), filename=f"scan{seed}.bin")
+    out = doc.tobytes()
+    doc.close()
+    return out
+
+
+def uploads(sheets: int, dupes: int, repeats: int, pad_kb: int):
+    """(primary + secondary (name, raw) list, expected merged Order-IDs)."""
+    files = []
+    for n in range(sheets + 1):
+        spec = SheetSpec(style=str(654_321 + n), order_id=f"45{n:05d}_AB", sku_base=10_000_000 + n * 100)
+        files.append((f"{spec.style}.pdf", padded(make_sheet(spec), pad_kb, n)))
+    expected = [f"45{n:05d}_AB" for n in range(1, sheets + 1)]
+
+    # Same PDF uploaded again / another sheet of an Order-ID already merged
+    for i in range(dupes):
+        name, raw = files[1 + i % sheets]
+        files.append((f"copy of {name}", raw))
+    for i in range(repeats):
+        n = 1 + i % sheets
+        spec = SheetSpec(style=str(700_000 + i), order_id=f"45{n:05d}_AB", colour="RED")
+        files.append((f"{spec.style}.pdf", padded(make_sheet(spec), pad_kb, 10_000 + i)))
+    return files, expected
+
+
+def documents(files, known=None):
+    """Fresh readers over the uploaded bytes (what every app rerun builds)."""
+    known = known or {}
+    return [PdfDocument(raw, name=name, sha256=known.get(i)) for i, (name, raw) in enumerate(files)]
+
+
+def legacy(docs) -> str:
+    """Pre-prescan process_merged: every other PDF opened, one after another."""
+    ids = [extract_order_id_only(doc) for doc in docs[1:]]
+    for doc in docs:
+        doc.close()
+    return "+".join(oid for oid in ids if oid)
+
+
+def _split(docs):
+    """(primary, others) as process_merged gets them."""
+    return docs[0], docs[1:]
+
+
+def timed(fn, runs: int):
+    samples, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Order-ID prescan: serial per rerun vs parallel + memoized")
+    parser.add_argument("--sheets", type=int, default=40, help="distinct secondary sheets")
+    parser.add_argument("--dupes", type=int, default=3, help="identical re-uploads")
+    parser.add_argument("--repeats", type=int, default=2, help="other files with an Order-ID already present")
+    parser.add_argument("--pad-kb", type=int, default=300, help="approximate size of each PDF")
+    parser.add_argument("--workers", type=int, default=0, help="pool workers (0 = default)")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=2.0, help="max median rerun time")
+    args = parser.parse_args(argv)
+
+    files, expected = uploads(args.sheets, args.dupes, args.repeats, args.pad_kb)
+    mb = sum(len(raw) for _, raw in files) / 1e6
+    print(f"1 primary + {len(files) - 1} other sheets ({mb:.1f} MB): "
+          f"{args.sheets} distinct, {args.dupes} identical re-uploads, {args.repeats} repeated Order-IDs")
+
+    legacy_s, legacy_ids = timed(lambda: legacy(documents(files)), 3)
+    print(f"\nlegacy (serial, every rerun): {legacy_s * 1000:8.1f} ms, "
+          f"{len(legacy_ids.split('+'))} Order-IDs merged")
+
+    failures = []
+    pool = SheetPool(args.workers or None)
+    try:
+        # Worker start-up is paid once per server, not per upload
+        pool.run(files[0][1], files[0][0], task="order_id")
+        rows = [("threads", OrderIdPrescan()), ("sheet pool", OrderIdPrescan(pool=pool))]
+        for label, prescan in rows:
+            start = time.perf_counter()
+            docs = documents(files)
+            report = prescan.scan(*_split(docs))
+            cold = time.perf_counter() - start
+            known = {i: doc.sha256 for i, doc in enumerate(docs)}
+            rerun, again = timed(lambda: prescan.scan(*_split(documents(files, known))), args.reruns)
+            print(f"{label + ' first pass':>22}: {cold * 1000:8.1f} ms ({report.scanned} files read)")
+            print(f"{label + ' rerun':>22}: {rerun * 1000:8.2f} ms ({again.scanned} files read)")
+
+            if list(report.order_ids) != expected or again != report._replace(scanned=0, seconds=again.seconds):
+                failures.append(f"{label}: merged Order-IDs differ from expected")
+            if len(report.duplicate_files) != args.dupes:
+                failures.append(f"{label}: {len(report.duplicate_files)} duplicate files, expected {args.dupes}")
+            if sum(len(names) - 1 for _, names in report.repeated_ids) != args.repeats:
+                failures.append(f"{label}: repeated Order-IDs not all reported")
+            if report.missing or report.errors:
+                failures.append(f"{label}: missing {report.missing}, errors {report.errors}")
+            if again.scanned:
+                failures.append(f"{label}: {again.scanned} files read again on rerun")
+            if rerun * 1000 > args.budget_ms:
+                failures.append(f"{label}: rerun {rerun * 1000:.1f} ms > budget {args.budget_ms} ms")
+    finally:
+        pool.close()
+
+    if failures:
+        print(f"\n❌ {len(failures)} failure(s)")
+        for f in failures:
+            print("  " + f)
+        return 1
+    print("\n✅ Order-IDs merged once, duplicates reported, reruns read no PDF")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
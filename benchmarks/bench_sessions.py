@@ -0,0 +1,167 @@
+# benchmarks/bench_sessions.py
+# Multi-session memory check for the reference loaders (app.py, Streamlit bare mode)
+#   - local SheetsServer-এ realistic size-এর prices / translations / materials CSV
+#   - N টা "session", প্রতিটা কয়েকবার rerun করে loader-গুলো call করে আর result
+#     নিজের state-এ রেখে দেয় (session_state-এর মতো)
+#   - tracemalloc: session প্রতি memory বৃদ্ধি budget-এর ভেতরে (flat) কিনা,
+#     সব session একই object পায় কিনা, rerun প্রতি loader-এর সময়
+#   - refresh: translations sheet বদলালে নতুন catalog swap হয়, পুরনো session-এর
+#     হাতে থাকা catalog অপরিবর্তিত থাকে
+# কোনো check fail করলে exit code 1।
+# ব্যবহার:
+#   python benchmarks/bench_sessions.py
+#   python benchmarks/bench_sessions.py --sessions 1 20 100 --reruns 3 --products 4000
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+from pepco_catalog import LANGUAGE_ORDER  # noqa: E402
+from sheets_server import SheetsServer  # noqa: E402
+
+SHEETS = ("prices", "translations", "materials")
+DEPARTMENTS = ("Baby Boy", "Baby Girl", "Boys", "Girls", "Women", "Men", "Home", "Accessories")
+
+
+def _write_csvs(root, products, materials, tiers):
+    rows = []
+    for i in range(products):
+        name = f"PRODUCT {i:05d}"
+        row = {"DEPARTMENT": DEPARTMENTS[i % len(DEPARTMENTS)], "PRODUCT_NAME": name, "EN": name}
+        row.update({lang: f"{name} ({lang}) — opis produktu" for lang in LANGUAGE_ORDER})
+        row["ES_CA"] = f"{name} (CA)"
+        rows.append(row)
+    pd.DataFrame(rows).to_csv(os.path.join(root, "translations.csv"), index=False)
+
+    pd.DataFrame({
+        "Name": [f"Material {i}" for i in range(materials)],
+        "AL": [f"Materiali {i}" for i in range(materials)],
+        "MK": [f"Материјал {i}" for i in range(materials)],
+    }).to_csv(os.path.join(root, "materials.csv"), index=False)
+
+    pln = [round(4.99 + 5 * i, 2) for i in range(tiers)]
+    pd.DataFrame({
+        "PLN": pln, "EUR": [round(p / 4, 2) for p in pln], "BGN": [round(p / 2, 2) for p in pln],
+        "BAM": [round(p / 2, 2) for p in pln], "RON": [round(p * 1.2, 2) for p in pln],
+        "CZK": [round(p * 6) for p in pln], "MKD": [round(p * 15) for p in pln],
+        "RSD": [round(p * 30) for p in pln], "HUF": [round(p * 100) for p in pln],
+    }).to_csv(os.path.join(root, "prices.csv"), index=False)
+
+
+def _rerun(app):
+    """What one script run of a session keeps from the reference loaders."""
+    return {
+        "catalog": app.load_product_catalog(),
+        "materials": app.load_material_translations(),
+        "ladder": app.load_price_ladder(),
+    }
+
+
+def run(app, checkpoints, reruns, budget_kb):
+    failures = []
+    sessions = [_rerun(app)]            # warm-up session: objects built / cached once
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+
+    print(f"\n{'sessions':>9} {'held KB':>10} {'KB/session':>11} {'rerun µs':>9}")
+    rerun_seconds = []
+    for target in sorted(checkpoints):
+        while len(sessions) < target:
+            state = None
+            for _ in range(reruns):
+                start = time.perf_counter()
+                state = _rerun(app)
+                rerun_seconds.append(time.perf_counter() - start)
+            sessions.append(state)
+        held = (tracemalloc.get_traced_memory()[0] - base) / 1024
+        per_session = held / max(1, len(sessions) - 1)
+        mean_us = sum(rerun_seconds) / len(rerun_seconds) * 1e6 if rerun_seconds else 0.0
+        print(f"{len(sessions):>9} {held:>10.1f} {per_session:>11.2f} {mean_us:>9.0f}")
+        if len(sessions) > 1 and per_session > budget_kb:
+            failures.append(f"{len(sessions)} sessions: {per_session:.1f} KB/session > budget {budget_kb} KB")
+    tracemalloc.stop()
+
+    for key in ("catalog", "materials", "ladder"):
+        if any(s[key] is not sessions[0][key] for s in sessions):
+            failures.append(f"{key}: sessions hold separate copies")
+    return sessions, failures
+
+
+def check_refresh(app, root, sessions):
+    """New translations version → new shared catalog; sessions' old one unchanged."""
+    failures = []
+    old = sessions[0]["catalog"]
+    before = {dept: old.products(dept) for dept in old.departments}
+
+    df = pd.read_csv(os.path.join(root, "translations.csv"))
+    extra = df.iloc[[0]].copy()
+    extra["PRODUCT_NAME"] = "ADDED AFTER REFRESH"
+    pd.concat([df, extra]).to_csv(os.path.join(root, "translations.csv"), index=False)
+
+    result = app.get_reference_snapshots().refresh("translations")
+    new = app.load_product_catalog()
+    if result != "updated" or new is old:
+        failures.append(f"refresh: {result}, catalog swapped: {new is not old}")
+    elif "ADDED AFTER REFRESH" not in new.products(extra["DEPARTMENT"].iloc[0]):
+        failures.append("refresh: new catalog lacks the added product")
+    if {dept: old.products(dept) for dept in old.departments} != before:
+        failures.append("refresh: a session's old catalog changed")
+    print(f"\nrefresh: {result}; old catalog intact, new catalog shared by later reruns")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reference loaders: memory per session + sharing")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--reruns", type=int, default=3, help="script runs per session")
+    parser.add_argument("--products", type=int, default=2000, help="translation sheet rows")
+    parser.add_argument("--materials", type=int, default=200)
+    parser.add_argument("--tiers", type=int, default=300, help="price ladder rows")
+    parser.add_argument("--budget-kb", type=float, default=8.0, help="max memory growth per session")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        _write_csvs(root, args.products, args.materials, args.tiers)
+        with SheetsServer(root) as server:
+            os.environ.update({
+                "PEPCO_SNAPSHOT_DB": os.path.join(root, "reference.sqlite3"),
+                "PEPCO_REFRESH_INTERVAL": "0",
+                "PEPCO_PRICE_SHEET_URL": f"{server.url}/prices.csv",
+                "PEPCO_TRANSLATION_SHEET_URL": f"{server.url}/translations.csv",
+                "PEPCO_MATERIAL_SHEET_URL": f"{server.url}/materials.csv",
+            })
+            import app  # noqa: E402  (reads the env at import)
+
+            logging.getLogger("streamlit").setLevel(logging.ERROR)
+            for name in list(logging.root.manager.loggerDict):
+                if name.startswith("streamlit"):
+                    logging.getLogger(name).setLevel(logging.ERROR)
+
+            sizes = {name: os.path.getsize(os.path.join(root, f"{name}.csv")) // 1024 for name in SHEETS}
+            print("sheets: " + ", ".join(f"{n} {kb} KB" for n, kb in sizes.items()))
+
+            sessions, failures = run(app, args.sessions, args.reruns, args.budget_kb)
+            failures += check_refresh(app, root, sessions)
+
+    if failures:
+        print(f"\n❌ {len(failures)} failure(s)")
+        for f in failures:
+            print("  " + f)
+        return 1
+    print("\n✅ one shared copy per process; memory flat as sessions grow")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
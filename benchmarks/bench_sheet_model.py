@@ -0,0 +1,191 @@
+# benchmarks/bench_sheet_model.py
+# Columnar SheetModel vs one dict per SKU + DataFrame (legacy, এই file-এই রাখা) — batch-এর মতো
+# অনেক sheet একসাথে memory-তে রেখে:
+#   - held memory (tracemalloc): extracted rows + final DATAFILE (legacy: records
+#     list + finalized DataFrame; নতুন: build_sheet → enrich_sheet → finalize_sheet)
+#   - build time (extract → enrich → price), CSV export time
+#   - প্রতিটা sheet-এ CSV bytes আর file name দুই path-এ byte-identical কিনা
+#     (Cotton / non-cotton, extra Order-IDs, None field) — না হলে exit code 1
+# ব্যবহার:
+#   python benchmarks/bench_sheet_model.py
+#   python benchmarks/bench_sheet_model.py --sheets 500 --skus 6 96 240
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+
+import pepco_core as core  # noqa: E402
+from bench_pipeline import reference_data  # noqa: E402
+from pepco_prices import format_number  # noqa: E402
+from sheet_factory import ean13  # noqa: E402
+
+MATERIALS = (
+    [{"mat": "Cotton", "pct": 95}, {"mat": "Elastane", "pct": 5}],
+    [{"mat": "Cotton", "pct": 100}],
+)
+
+
+def parsed_sheet(n, skus):
+    """parse_pdf_document-style fields for sheet n with `skus` size rows."""
+    first = 10_000_000 + n * 1000
+    return {
+        "Order_ID": str(400_000 + n), "Style": str(654_321 + n), "Colour": "NAVY BLUE",
+        "Supplier_product_code": f"SP-{n:03d}", "Item_classification": "Baby Boy T-shirt",
+        "Supplier_name": "Supplier Ltd.", "Collection": "CROCO",
+        "Style_Merch_Season": f"{654_321 + n}-SS26", "Batch": None if n % 7 == 0 else f"B{n}",
+        "Item_name_EN": "Baby boy T-shirt basic", "Season": "SS26",
+        "skus": [str(first + i) for i in range(skus)],
+        "barcodes": [ean13(590_123_400_000 + n * 1000 + i) for i in range(skus)],
+    }
+
+
+# ---------- Legacy path: one dict per SKU → DataFrame (reference only) ----------
+def _legacy_enrich(df, template, valid_rows, materials, washing_code_key):
+    """Pre-SheetModel enrichment: selection values broadcast over a DataFrame."""
+    names, compositions = core.translate_material_rows(valid_rows, materials)
+    product_name = template.render([r["mat"] for r in valid_rows], names, compositions)
+
+    item_classes = df["Item_classification"]
+    df["Dept"] = item_classes.map({ic: core.get_dept_value(ic) for ic in item_classes.unique()})
+    if core.cotton_flag(valid_rows) == "Y":
+        df["Cotton"] = "Y"
+    elif "Cotton" in df.columns:
+        df = df.drop(columns=["Cotton"])
+    df["Collection"] = [core.modify_collection(c, ic) for c, ic in zip(df["Collection"], item_classes)]
+    df["product_name"] = product_name
+    df["washing_code"] = core.WASHING_CODES[washing_code_key]
+    return df
+
+
+def _legacy_finalize(df, currency_values, pln_price):
+    for cur in core.CURRENCY_COLUMNS:
+        df[cur] = currency_values.get(cur, "")
+    df["PLN"] = format_number(pln_price, "PLN")
+    df["Item_name_English"] = df["Item_name_EN"].apply(core.clean_item_name_english)
+
+    cols = list(core.DATAFILE_COLUMNS) + (["Cotton"] if "Cotton" in df.columns else [])
+    for col in cols:
+        if col not in df.columns:
+            df[col] = ""
+    return df, cols
+
+
+def _legacy_filename(df):
+    """Name with the SKUs parsed back out of Colour_SKU."""
+    first = df.iloc[0]
+    skus = "_".join(re.sub(r".*SKU\s*", "", x) for x in df["Colour_SKU"])
+    return (
+        f"PEPCO_{first['Season'].upper()}_{skus}_DATAFILE_"
+        f"{first['Supplier_product_code']}_00_{first['Style']}.csv"
+    )
+
+
+def legacy(parsed, reference, valid_rows, extra):
+    """One dict per SKU → DataFrame → enrich / finalize (pre-SheetModel pipeline)."""
+    template, materials, ladder = reference
+    records = core.build_sheet(parsed, parsed["Colour"], parsed["skus"], parsed["barcodes"]).records()
+    df = pd.DataFrame(records)
+    if extra:
+        df["Order_ID"] = df["Order_ID"].astype(str) + "+" + extra
+    df = _legacy_enrich(df.copy(), template, valid_rows, materials, "9")
+    match = core.resolve_price_tier(29.99, ladder)
+    df, cols = _legacy_finalize(df.copy(), match.values, match.pln)
+    return records, df, cols
+
+
+def columnar(parsed, reference, valid_rows, extra):
+    template, materials, ladder = reference
+    sheet = core.build_sheet(parsed, parsed["Colour"], parsed["skus"], parsed["barcodes"])
+    if extra:
+        sheet = sheet.with_fields(Order_ID=f"{sheet['Order_ID']}+{extra}")
+    sheet = core.enrich_sheet(sheet, template, valid_rows, materials, "9")
+    match = core.resolve_price_tier(29.99, ladder)
+    return core.finalize_sheet(sheet, match.values, match.pln)
+
+
+def held(build, count):
+    """(KB held by `count` built results, seconds to build them)."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    kept = [build(n) for n in range(count)]
+    seconds = time.perf_counter() - start
+    gc.collect()
+    size = (tracemalloc.get_traced_memory()[0] - base) / 1024
+    tracemalloc.stop()
+    return size, seconds, kept
+
+
+def check_identical(reference, sizes):
+    failures = []
+    for skus in sizes:
+        for n, valid_rows in enumerate(MATERIALS):
+            for extra in ("", "400111+400112"):
+                parsed = parsed_sheet(n * 7, skus)
+                _, df, cols = legacy(parsed, reference, valid_rows, extra)
+                sheet, sheet_cols = columnar(parsed, reference, valid_rows, extra)
+                label = f"{skus} SKUs, {valid_rows[0]['pct']}% cotton, extra={bool(extra)}"
+                if cols != sheet_cols:
+                    failures.append(f"{label}: columns differ")
+                elif core.build_datafile_csv(df, cols) != core.build_datafile_csv(sheet, sheet_cols):
+                    failures.append(f"{label}: CSV differs")
+                elif core.build_datafile_csv(df[cols], cols) != core.build_datafile_csv(sheet.to_frame(cols), cols):
+                    failures.append(f"{label}: editor frame differs")
+                elif _legacy_filename(df) != core.build_sheet_filename(sheet):
+                    failures.append(f"{label}: file name differs")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SheetModel vs per-SKU dicts: memory, time, identical CSV")
+    parser.add_argument("--sheets", type=int, default=300, help="sheets held at once")
+    parser.add_argument("--skus", type=int, nargs="+", default=[6, 96, 240])
+    args = parser.parse_args(argv)
+
+    reference = reference_data()
+    failures = check_identical(reference, args.skus)
+
+    print(f"{args.sheets} sheets held at once")
+    print(f"{'SKUs':>5} {'legacy MB':>10} {'sheet MB':>9} {'ratio':>6} "
+          f"{'legacy ms':>10} {'sheet ms':>9} {'csv legacy':>11} {'csv sheet':>10}")
+    for skus in args.skus:
+        inputs = [parsed_sheet(n, skus) for n in range(args.sheets)]
+        old_kb, old_s, old = held(lambda n: legacy(inputs[n], reference, MATERIALS[0], ""), args.sheets)
+        new_kb, new_s, new = held(lambda n: columnar(inputs[n], reference, MATERIALS[0], ""), args.sheets)
+
+        start = time.perf_counter()
+        for _, df, cols in old:
+            core.build_datafile_csv(df, cols)
+        old_csv = time.perf_counter() - start
+        start = time.perf_counter()
+        for sheet, cols in new:
+            core.build_datafile_csv(sheet, cols)
+        new_csv = time.perf_counter() - start
+
+        print(f"{skus:>5} {old_kb / 1024:>10.2f} {new_kb / 1024:>9.2f} {old_kb / max(new_kb, 1e-9):>5.0f}x "
+              f"{old_s * 1000:>10.0f} {new_s * 1000:>9.0f} {old_csv * 1000:>11.0f} {new_csv * 1000:>10.0f}")
+        del old, new
+
+    if failures:
+        print(f"\n❌ {len(failures)} mismatch(es)")
+        for f in failures:
+            print("  " + f)
+        return 1
+    print("\n✅ CSV bytes and file names identical on both paths")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
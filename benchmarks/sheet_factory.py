@@ -0,0 +1,301 @@
+# benchmarks/sheet_factory.py
+# Synthetic PEPCO data sheets (PyMuPDF) — benchmark / regression corpus
+#   - 6-page (পুরনো) layout: identifiers | colour table | size/SKU table |
+#     purchase price | packing | sales prices
+#   - 5-page (নতুন) layout: identifiers + colour table একই page-এ
+#   - SKU সংখ্যা, colour table variant, Pantone নেই, merged row — সব configurable
+#   - table_cells: size table-এর প্রতিটা column আলাদা text block (text-এ আগে সব
+#     SKU, তারপর সব barcode — row শুধু word box-এর y দিয়ে মেলে)
+#   - split_rows: size table প্রথম N row-এর পরে পরের page-এ (purchase price-এর
+#     উপরে) চলতে থাকে — page সংখ্যা একই থাকে
+#   - barcode গুলো valid EAN-13; page 1-এ কোনো 8 / 13 digit সংখ্যা নেই
+# ব্যবহার:
+#   python benchmarks/sheet_factory.py --out /tmp/sheets            # default corpus
+#   python benchmarks/sheet_factory.py --out /tmp/sheets --skus 6 48 200 --pages 5 6
+#   from sheet_factory import SheetSpec, make_sheet
+#   raw = make_sheet(SheetSpec(pages=5, skus=12, colour_layout="purchase"))
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+from typing import NamedTuple
+
+__all__ = [
+    "SheetSpec",
+    "COLOUR_LAYOUTS",
+    "DEFAULT_CORPUS",
+    "ean13",
+    "sheet_pages",
+    "make_sheet",
+    "write_corpus",
+]
+
+# table    → "Colour" table (name + Pantone row under a header)
+# purchase → colour only in the "Purchase price" block
+# loose    → "Main colour: ..." free text line
+COLOUR_LAYOUTS = ("table", "purchase", "loose")
+
+SIZES = ["56", "62", "68", "74", "80", "86", "92", "98", "104", "110", "116", "122"]
+
+
+class SheetSpec(NamedTuple):
+    """Shape of one synthetic data sheet."""
+    pages: int = 6              # 6 = old layout, 5 = new layout
+    skus: int = 6
+    colour_layout: str = "table"
+    pantone: bool = True        # False → colour name without Pantone code
+    merged_rows: bool = False   # colour row and first size row on one line
+    table_cells: bool = False   # size table columns as separate text blocks
+    split_rows: int = 0         # > 0: size table continues on the next page after N rows
+    colour: str = "NAVY"
+    pantone_code: str = "19-4024"
+    style: str = "654321"
+    order_id: str = "4500123_AB"
+    item_class: str = "Baby Boys Outerwear"
+    collection: str = "CROCO CLUB - summer"
+    item_name: str = "Baby boy basic T-shirt"
+    sku_base: int = 10000000
+    barcode_base: int = 590123456000
+
+    @property
+    def name(self) -> str:
+        parts = [f"p{self.pages}", f"sku{self.skus}", self.colour_layout]
+        if not self.pantone:
+            parts.append("nopantone")
+        if self.merged_rows:
+            parts.append("merged")
+        if self.table_cells:
+            parts.append("cells")
+        if 0 < self.split_rows < self.skus:
+            parts.append(f"split{self.split_rows}")
+        return "_".join(parts)
+
+
+def ean13(body12: int) -> str:
+    """12-digit body → 13-digit EAN with check digit."""
+    digits = f"{body12:012d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return digits + str((10 - total % 10) % 10)
+
+
+# ---------- Page text blocks ----------
+def _identifiers(spec):
+    return [
+        "PEPCO PRODUCT DATA SHEET",
+        f"Style {spec.style}   Version 3",
+        "Merch code ........ BB/12",
+        "Season ........ SS 26",
+        f"Collection ........ {spec.collection}",
+        "Handover date ........ 15/03/2026",
+        f"Order - ID ........ {spec.order_id}",
+        f"Item classification ........ {spec.item_class}",
+        "Supplier product code ........ SP-001",
+        "Supplier name ........ ACME TEXTILES LTD",
+        f"Item name English: {spec.item_name}",
+        "",
+        "Fabric: single jersey 160 gsm",
+        "Composition: 95% cotton, 5% elastane",
+        "Print: water based, front chest",
+    ]
+
+
+def _colour_value(spec):
+    return f"{spec.colour} {spec.pantone_code} TCX" if spec.pantone else spec.colour
+
+
+def _colour_table(spec):
+    if spec.colour_layout != "table" or spec.merged_rows:
+        return []
+    return ["", "Colour", "Name Pantone Code", _colour_value(spec), ""]
+
+
+def _size_rows(spec):
+    rows = ["Size / Age | SKU | Barcode (EAN13)"]
+    for i in range(spec.skus):
+        size = SIZES[i % len(SIZES)]
+        rows.append(f"{size} | {spec.sku_base + i} | {ean13(spec.barcode_base + i)}")
+    if spec.merged_rows and spec.skus:
+        # broken export: colour cell glued to the first size row
+        label = "Colour " if spec.colour_layout == "table" else ""
+        rows[1] = f"{label}{_colour_value(spec)} {rows[1]}"
+    return rows
+
+
+def _purchase_price(spec):
+    lines = ["Purchase price", "Incoterm FOB   Currency USD"]
+    if spec.colour_layout == "purchase" and not spec.merged_rows:
+        lines.append(f"{_colour_value(spec)}   2.15")
+    else:
+        lines.append("All sizes   2.15")
+    return lines
+
+
+def _packing(spec):
+    lines = [
+        "Packing instructions",
+        "Single polybag, 12 pcs per carton, mixed sizes",
+        "Carton label barcode: " + ean13(590999999999),
+        "Hangtag: PEPCO standard",
+    ]
+    if spec.colour_layout == "loose" and not spec.merged_rows:
+        lines.insert(1, f"Main colour: {_colour_value(spec)}")
+    return lines
+
+
+def _sales_prices(spec):
+    return [
+        "Sales prices",
+        "PL 29,99 PLN",
+        "EUR 7,49   BGN 14,70   RON 35,99",
+        "CZK 179   HUF 2999",
+    ]
+
+
+def sheet_pages(spec: SheetSpec):
+    """Page texts (list of line lists) for a spec."""
+    if spec.pages not in (5, 6):
+        raise ValueError("pages must be 5 or 6")
+    if spec.colour_layout not in COLOUR_LAYOUTS:
+        raise ValueError(f"colour_layout must be one of {COLOUR_LAYOUTS}")
+
+    sizes, continued = _size_rows(spec), []
+    if 0 < spec.split_rows < spec.skus:
+        cut = 1 + spec.split_rows
+        sizes, continued = sizes[:cut], [sizes[0] + " (continued)"] + sizes[cut:] + [""]
+
+    if spec.pages == 6:
+        pages = [
+            _identifiers(spec),
+            ["Artwork details", "See attached artwork"] + _colour_table(spec),
+            sizes,
+        ]
+    else:
+        pages = [
+            _identifiers(spec) + _colour_table(spec),
+            sizes,
+        ]
+    pages += [continued + _purchase_price(spec), _packing(spec), _sales_prices(spec)]
+    return pages
+
+
+def _insert_lines(page, lines, fontsize=9):
+    """Lines top-down, wrapped into columns when a page overflows."""
+    import fitz  # PyMuPDF
+
+    margin, line_height = 40, fontsize * 1.5
+    per_column = max(1, int((page.rect.height - 2 * margin) / line_height))
+    columns = max(1, -(-len(lines) // per_column))
+    width = (page.rect.width - 2 * margin) / columns
+    if columns > 1:
+        fontsize = min(fontsize, max(4, width / 28))
+        line_height = fontsize * 1.5
+        per_column = max(1, int((page.rect.height - 2 * margin) / line_height))
+        columns = max(1, -(-len(lines) // per_column))
+        width = (page.rect.width - 2 * margin) / columns
+
+    for c in range(columns):
+        chunk = lines[c * per_column:(c + 1) * per_column]
+        point = fitz.Point(margin + c * width, margin + fontsize)
+        page.insert_text(point, "\n".join(chunk), fontsize=fontsize)
+
+
+def _insert_cells(page, rows, fontsize=9):
+    """ "a | b | c" rows as a table: one text block per cell column."""
+    import fitz  # PyMuPDF
+
+    margin = 40
+    cells = [row.split(" | ") for row in rows]
+    per_column = max(1, int((page.rect.height - 2 * margin) / (fontsize * 1.5)))
+    groups = max(1, -(-len(cells) // per_column))
+    if groups > 1:
+        fontsize = max(4, fontsize / groups)
+        per_column = max(1, int((page.rect.height - 2 * margin) / (fontsize * 1.5)))
+        groups = max(1, -(-len(cells) // per_column))
+    width = (page.rect.width - 2 * margin) / groups
+    n_cols = max(len(c) for c in cells)
+
+    for g in range(groups):
+        chunk = cells[g * per_column:(g + 1) * per_column]
+        for k in range(n_cols):
+            point = fitz.Point(margin + g * width + k * width / n_cols, margin + fontsize)
+            text = "\n".join(c[k] if k < len(c) else "" for c in chunk)
+            page.insert_text(point, text, fontsize=fontsize)
+
+
+def make_sheet(spec: SheetSpec = SheetSpec()) -> bytes:
+    """Render one data sheet as PDF bytes."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    try:
+        sizes_page = 2 if spec.pages == 6 else 1
+        for i, lines in enumerate(sheet_pages(spec)):
+            if spec.table_cells and i == sizes_page:
+                _insert_cells(doc.new_page(), lines)
+            else:
+                _insert_lines(doc.new_page(), lines)
+        return doc.tobytes(garbage=3, deflate=True)
+    finally:
+        doc.close()
+
+
+# Every layout × variant once at a typical size + SKU scaling on the old layout
+DEFAULT_CORPUS = [
+    SheetSpec(pages=pages, skus=6, colour_layout=layout, pantone=pantone, merged_rows=merged)
+    for pages, layout, pantone, merged in itertools.product(
+        (6, 5), COLOUR_LAYOUTS, (True, False), (False, True)
+    )
+    if pantone or not merged
+] + [SheetSpec(pages=6, skus=n) for n in (24, 96, 240)] + [
+    SheetSpec(pages=6, skus=n, table_cells=True) for n in (6, 240)
+] + [
+    # size table continued on the purchase-price page
+    SheetSpec(pages=6, skus=60, split_rows=30),
+    SheetSpec(pages=5, skus=24, split_rows=12),
+]
+
+
+def write_corpus(out_dir, specs=DEFAULT_CORPUS):
+    """Write each spec as <out_dir>/<spec.name>.pdf; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, spec in enumerate(specs):
+        path = os.path.join(out_dir, f"{spec.name}.pdf")
+        if path in paths:
+            path = os.path.join(out_dir, f"{spec.name}_{i}.pdf")
+        with open(path, "wb") as fh:
+            fh.write(make_sheet(spec._replace(style=f"{654321 + i:06d}", sku_base=spec.sku_base + i * 1000)))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic PEPCO data sheets.")
+    parser.add_argument("--out", required=True, help="output folder")
+    parser.add_argument("--pages", type=int, nargs="+", help="5 and/or 6 (default corpus if omitted)")
+    parser.add_argument("--skus", type=int, nargs="+", default=[6])
+    parser.add_argument("--layouts", nargs="+", choices=COLOUR_LAYOUTS, default=["table"])
+    parser.add_argument("--no-pantone", action="store_true")
+    parser.add_argument("--merged-rows", action="store_true")
+    parser.add_argument("--table-cells", action="store_true", help="size table columns as separate blocks")
+    parser.add_argument("--split-rows", type=int, default=0, help="continue the size table on the next page after N rows")
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        specs = [
+            SheetSpec(pages=p, skus=n, colour_layout=layout,
+                      pantone=not args.no_pantone, merged_rows=args.merged_rows,
+                      table_cells=args.table_cells, split_rows=args.split_rows)
+            for p, n, layout in itertools.product(args.pages, args.skus, args.layouts)
+        ]
+    else:
+        specs = DEFAULT_CORPUS
+
+    for path in write_corpus(args.out, specs):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
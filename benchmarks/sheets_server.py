@@ -0,0 +1,118 @@
+# benchmarks/sheets_server.py
+# Local stand-in for the Google Sheets CSV links (fault injection সহ)
+#   GET /<file>.csv                 → file from --root, with ETag / 304
+#   ?delay=1.5                      → sleep before answering
+#   ?fail=2                         → first 2 requests for this path → 503
+#   ?hang=1                         → never answer (timeout test)
+# ব্যবহার:
+#   python benchmarks/sheets_server.py --root csv_dir --port 8765
+#   PEPCO_PRICE_SHEET_URL=http://127.0.0.1:8765/prices.csv?delay=1 streamlit run app.py
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+__all__ = ["SheetsServer"]
+
+
+class SheetsServer:
+    """Threaded HTTP server over a folder of CSVs, started in the background."""
+
+    def __init__(self, root: str, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.root = root
+        self.hits = Counter()
+        self._hang = threading.Event()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                key = self.path
+                server.hits[key] += 1
+
+                if query.get("hang"):
+                    server._hang.wait(60)
+                    return
+
+                delay = float(query.get("delay", ["0"])[0])
+                if delay:
+                    time.sleep(delay)
+
+                if server.hits[key] <= int(query.get("fail", ["0"])[0]):
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                path = os.path.join(server.root, os.path.basename(url.path))
+                if not os.path.isfile(path):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                with open(path, "rb") as fh:
+                    body = fh.read()
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self) -> "SheetsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._hang.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve CSV sheets with fault injection.")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = SheetsServer(args.root, port=args.port)
+    print(f"Serving {os.path.abspath(args.root)} at {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
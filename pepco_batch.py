@@ -0,0 +1,454 @@
+# pepco_batch.py
+# Headless batch mode: folder/glob of PEPCO PDFs → DATAFILE CSVs
+# ব্যবহার:
+#   python pepco_batch.py "sheets/*.pdf" --manifest styles.csv --out out/
+#   python pepco_batch.py sheets/ --out out/ --zip out/datafiles.zip
+#   python pepco_batch.py sheets/ --out out/ --offline     # local reference snapshot as is
+#
+# Manifest (CSV, optional) — one row per PDF file name:
+#   file;department;product;washing_code;pln_price;materials;price_mode
+#   123456.pdf;Baby Boy;T-SHIRT;9;29.99;Cotton 95%, Elastane 5%;exact
+# Empty cells fall back to the same defaults the UI would pick
+# (department / product from the PDF, washing code 9, 100% Cotton,
+# PLN price detected from the PDF text). Material names must be spelled as on
+# the material translations sheet — an unknown name fails that file.
+#
+# Reference data: the local snapshot (PEPCO_SNAPSHOT_DB) is refreshed first
+# with a conditional request; if Google is unreachable the local copy is used
+# (warning). --offline skips the refresh.
+#
+# Output names longer than DISK_FILENAME_MAX (every SKU joined) keep the
+# first / last SKU + SKU count + a hash instead; two PDFs giving the same
+# name in one run get _2, _3 ... (with a warning) instead of overwriting.
+#
+# Written DATAFILEs are recorded in the DATAFILE history (PEPCO_HISTORY_DB,
+# same index as the app) unless --no-history; barcodes already issued in an
+# earlier DATAFILE are reported as warnings.
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pepco_export import DatafileBundle
+from pepco_prices import PRICE_MATCH_MODES
+
+__all__ = ["collect_pdfs", "load_manifest", "parse_materials", "process_file", "run_batch", "bundle_results", "main"]
+
+DEFAULT_WASHING_CODE = "9"
+
+# Reference data handed to each worker once (initializer)
+_REF = {}
+
+# Extraction cache, opened on first use in each worker
+_CACHE = None
+
+# DATAFILE history (read-only in workers: duplicate barcode check)
+_HISTORY = None
+
+
+class BatchError(Exception):
+    """A single PDF could not be turned into a DATAFILE."""
+
+
+# ---------- Inputs ----------
+def collect_pdfs(inputs):
+    """Expand directories and glob patterns into a sorted, unique PDF list."""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            found.extend(glob.glob(os.path.join(item, "*.pdf")))
+            found.extend(glob.glob(os.path.join(item, "*.PDF")))
+        else:
+            found.extend(glob.glob(item))
+    return sorted(set(os.path.abspath(p) for p in found))
+
+
+def load_manifest(path):
+    """Read manifest rows keyed by PDF file name (`;` or `,` delimited)."""
+    if not path:
+        return {}
+
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        sample = fh.read(4096)
+        fh.seek(0)
+        delimiter = ";" if sample.count(";") >= sample.count(",") else ","
+        reader = csv.DictReader(fh, delimiter=delimiter)
+
+        manifest = {}
+        for row in reader:
+            row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+            name = os.path.basename(row.get("file", ""))
+            if name:
+                manifest[name] = row
+        return manifest
+
+
+def parse_materials(spec, known=None):
+    """
+    'Cotton 95%, Elastane 5%' → [{'mat': 'Cotton', 'pct': 95}, ...]
+    known: material names on the translations sheet; any other name is an
+    error (it would be left out of the AL / MK composition).
+    """
+    rows = [{"mat": "Cotton", "pct": 100}] if not spec else _material_rows(spec)
+    if known:
+        unknown = [r["mat"] for r in rows if r["mat"] not in known]
+        if unknown:
+            raise BatchError(
+                "Unknown material(s) " + ", ".join(repr(m) for m in unknown)
+                + " — not on the material translations sheet"
+            )
+    return rows
+
+
+def _material_rows(spec):
+    rows = []
+    for part in re.split(r"[,|]", spec):
+        part = part.strip()
+        if not part:
+            continue
+        m = re.match(r"^(.+?)\s*[: ]\s*(\d+)\s*%?$", part)
+        if not m:
+            raise BatchError(f"Invalid material entry: {part!r}")
+        pct = int(m.group(2))
+        if pct > 0:
+            rows.append({"mat": m.group(1).strip(), "pct": pct})
+
+    if sum(r["pct"] for r in rows) > 100:
+        raise BatchError(f"Material composition exceeds 100%: {spec!r}")
+    return rows
+
+
+# ---------- Worker ----------
+def _init_worker(ref):
+    _REF.clear()
+    _REF.update(ref)
+
+
+def _extraction_cache():
+    # One per worker process (disk tier shared with the app)
+    global _CACHE
+    if _CACHE is None:
+        import pepco_core
+
+        _CACHE = pepco_core.open_extraction_cache()
+    return _CACHE
+
+
+def _history():
+    global _HISTORY
+    if _HISTORY is None and _REF.get("history", True):
+        import pepco_core
+
+        _HISTORY = pepco_core.open_history() or False
+    return _HISTORY or None
+
+
+def _pdf_full_text(doc):
+    import pepco_core
+
+    # Already extracted by process_file → memory cache hit; pages a known
+    # layout skipped (None) are read now
+    pages_text = pepco_core.extract_document(doc, _extraction_cache())["pages_text"]
+    return "\n".join(doc[i] if text is None else text for i, text in enumerate(pages_text))
+
+
+def process_file(path, choice, out_dir, ref=None):
+    """Build one DATAFILE exactly like the UI would; returns the CSV path."""
+    file_name, csv_bytes, _ = _process_file(path, choice, ref)
+    return _write_datafile(out_dir, file_name, csv_bytes, set())
+
+
+def _write_datafile(out_dir, file_name, csv_bytes, claimed):
+    """Write under file_name, or file_name_2, _3 ... when already claimed in this run."""
+    base, ext = os.path.splitext(file_name)
+    name, n = file_name, 1
+    while name in claimed:
+        n += 1
+        name = f"{base}_{n}{ext}"
+    claimed.add(name)
+    out_path = os.path.join(out_dir, name)
+    with open(out_path, "wb") as fh:
+        fh.write(csv_bytes)
+    return out_path
+
+
+def _process_file(path, choice, ref=None):
+    """(on-disk file name, CSV bytes, HistoryEntry) for one PDF."""
+    import pepco_core as core
+    from pepco_history import HistoryEntry
+    from pepco_reader import PdfDocument
+
+    ref = ref or _REF
+    catalog = ref["catalog"]
+    material_table = ref["materials"]
+
+    with open(path, "rb") as fh:
+        doc = PdfDocument(fh.read(), name=path)
+    with doc:
+        result = core.extract_records(doc, _extraction_cache(), history=_history())
+    if not result.ok:
+        errors = [issue.message for issue in result.issues if issue.level == "error"]
+        raise BatchError("; ".join(errors) or "PDF extraction failed (SKU/Barcode or PDF error)")
+    for issue in result.issues:
+        # e.g. SKUs without a barcode in their table row — written CSV lacks them
+        print(f"Warning: {os.path.basename(path)}: {issue.message}", file=sys.stderr)
+
+    sheet = result.sheet
+
+    # -- Department / Product (same defaults as the UI) --
+    depts = catalog.departments
+    dept = choice.get("department") or (
+        depts[catalog.department_index(
+            core.map_item_class_to_dept_label(sheet.get("Item_classification", ""))
+        )] if depts else None
+    )
+    if dept not in depts:
+        raise BatchError(f"Unknown department: {dept!r}")
+
+    products = catalog.products(dept)
+    product_type = choice.get("product") or (
+        products[catalog.product_index(
+            dept, (sheet.get("Item_name_EN") or "").strip()
+        )] if products else None
+    )
+    if product_type not in products:
+        raise BatchError(f"Unknown product type for {dept}: {product_type!r}")
+
+    # -- Washing code --
+    washing_code_key = choice.get("washing_code") or DEFAULT_WASHING_CODE
+    if washing_code_key not in core.WASHING_CODES:
+        raise BatchError(f"Unknown washing code: {washing_code_key!r}")
+
+    # -- PLN price (manifest → detected from PDF) --
+    pln_raw = choice.get("pln_price") or core.detect_pl_sales_price(_pdf_full_text(doc))
+    if not pln_raw:
+        raise BatchError("No PLN price in manifest and none detected in PDF")
+    try:
+        pln_price = float(str(pln_raw).replace(",", "."))
+    except ValueError:
+        raise BatchError(f"Invalid PLN price: {pln_raw!r}")
+    if not math.isfinite(pln_price):
+        raise BatchError(f"Invalid PLN price: {pln_raw!r}")
+    if pln_price < 0:
+        raise BatchError("PLN price can't be negative")
+
+    price_mode = choice.get("price_mode") or ref.get("price_mode", "exact")
+    if price_mode not in PRICE_MATCH_MODES:
+        raise BatchError(f"Unknown price match mode: {price_mode!r}")
+
+    ladder = ref["prices"]
+    idx = ladder.resolve(pln_price, price_mode)
+    currency_values = ladder.row(idx) if idx is not None else None
+    if not currency_values:
+        raise BatchError(f"PLN {pln_price} not found in price sheet")
+    pln_price = ladder.pln_at(idx)
+
+    # -- Enrich + export --
+    valid_rows = parse_materials(choice.get("materials"), material_table.materials)
+
+    sheet = core.enrich_sheet(
+        sheet, catalog.template(dept, product_type), valid_rows,
+        material_table, washing_code_key
+    )
+    sheet, final_cols = core.finalize_sheet(sheet, currency_values, pln_price)
+
+    # Streamed straight from the sheet's columns (no per-SKU rows / DataFrame)
+    file_name = core.build_sheet_filename(sheet, core.DISK_FILENAME_MAX)
+    csv_bytes = core.build_datafile_csv(sheet, final_cols)
+    return file_name, csv_bytes, HistoryEntry.from_sheet(file_name, sheet, csv_bytes, doc.sha256)
+
+
+def _run_job(path, choice):
+    start = time.perf_counter()
+    try:
+        file_name, csv_bytes, entry = _process_file(path, choice)
+        return {
+            "pdf": path, "csv": None, "name": file_name, "data": csv_bytes,
+            "seconds": time.perf_counter() - start, "error": None, "entry": entry,
+        }
+    except Exception as e:
+        return {
+            "pdf": path, "csv": None, "name": None, "data": None,
+            "seconds": time.perf_counter() - start, "error": str(e), "entry": None,
+        }
+
+
+# ---------- Driver ----------
+def load_reference_data(offline=False):
+    """
+    Load the three Google Sheet datasets once in the parent process: local
+    snapshot, refreshed first (conditional GET) unless offline.
+    """
+    import pepco_core
+
+    snapshots = pepco_core.open_reference_snapshots()
+    if not offline:
+        status = snapshots.status()
+        for name, outcome in snapshots.refresh_all().items():
+            if outcome == "failed" and status[name]["version"] is not None:
+                fetched = time.strftime("%d-%m-%Y %H:%M", time.localtime(status[name]["fetched_at"]))
+                print(
+                    f"Warning: {name} sheet could not be refreshed "
+                    f"({snapshots.status()[name]['error']}); using the local copy from {fetched}",
+                    file=sys.stderr
+                )
+
+    ref, issues = pepco_core.reference_data(snapshots)
+    for issue in issues:
+        print(f"Warning: {issue.message}", file=sys.stderr)
+
+    if ref["catalog"].empty:
+        raise BatchError("Product translations could not be loaded")
+    if ref["prices"] is None:
+        raise BatchError("Price data could not be loaded")
+    return ref
+
+
+def run_batch(
+    pdfs, manifest, out_dir, workers=None, ref=None, price_mode="exact", history=True, offline=False
+):
+    """
+    Process PDFs on a process pool; returns per-file result dicts. history=True
+    records every written DATAFILE in the DATAFILE history (PEPCO_HISTORY_DB);
+    offline=True uses the local reference snapshot without refreshing it.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    ref = dict(ref if ref is not None else load_reference_data(offline))
+    ref["price_mode"] = price_mode
+    ref["history"] = history
+    workers = workers or os.cpu_count() or 1
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=min(workers, max(1, len(pdfs))),
+        initializer=_init_worker,
+        initargs=(ref,)
+    ) as pool:
+        futures = [
+            pool.submit(_run_job, p, manifest.get(os.path.basename(p), {}))
+            for p in pdfs
+        ]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+
+    results.sort(key=lambda r: r["pdf"])
+    _write_results(results, out_dir)
+    if history:
+        _record_history(results)
+    return results
+
+
+def _write_results(results, out_dir):
+    """Write every built DATAFILE in PDF order; a name clash gets a suffix, not an overwrite."""
+    claimed = set()
+    for r in results:
+        data = r.pop("data")
+        if r["error"]:
+            continue
+        try:
+            r["csv"] = _write_datafile(out_dir, r["name"], data, claimed)
+        except OSError as e:
+            r["error"] = f"Could not write {r['name']}: {e}"
+            r["entry"] = None
+            continue
+        written = os.path.basename(r["csv"])
+        if written != r["name"]:
+            print(
+                f"Warning: {os.path.basename(r['pdf'])}: {r['name']} already written "
+                f"for another PDF in this run — saved as {written}",
+                file=sys.stderr
+            )
+            r["entry"] = r["entry"]._replace(file_name=written)
+
+
+def _record_history(results):
+    import pepco_core
+
+    store = pepco_core.open_history()
+    if store is None:
+        return
+    for r in results:
+        if r.get("entry") is not None:
+            store.record(r["entry"])
+    store.close()
+    if store.errors:
+        print(f"Warning: {store.errors} DATAFILE(s) not recorded in history: {store.last_error}", file=sys.stderr)
+
+
+def bundle_results(results, zip_path):
+    """Stream every written DATAFILE into one ZIP; returns archive names."""
+    with DatafileBundle(zip_path) as bundle:
+        for r in results:
+            if r["csv"]:
+                bundle.add_file(r["csv"])
+        return list(bundle.names)
+
+
+def _print_report(results, wall):
+    ok = [r for r in results if not r["error"]]
+    failed = [r for r in results if r["error"]]
+
+    print(f"\n{'PDF':<40} {'sec':>7}  result")
+    for r in results:
+        status = os.path.basename(r["csv"]) if r["csv"] else f"FAILED: {r['error']}"
+        print(f"{os.path.basename(r['pdf'])[:40]:<40} {r['seconds']:>7.2f}  {status}")
+
+    print(f"\n{len(ok)} written, {len(failed)} failed in {wall:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert PEPCO data sheet PDFs into DATAFILE CSVs."
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--manifest", help="Per-style choices CSV (file;department;product;...)")
+    parser.add_argument("--out", default=".", help="Output directory (default: current)")
+    parser.add_argument("--workers", type=int, default=None, help="Process count (default: CPU cores)")
+    parser.add_argument(
+        "--price-mode", default="exact", choices=PRICE_MATCH_MODES,
+        help="PLN → ladder tier matching when the price is not on the ladder"
+    )
+    parser.add_argument("--zip", help="Also bundle all written DATAFILEs into this ZIP")
+    parser.add_argument(
+        "--no-history", action="store_true",
+        help="Do not record the written DATAFILEs in the DATAFILE history"
+    )
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="Use the local reference snapshot without checking Google Sheets for updates"
+    )
+    args = parser.parse_args(argv)
+
+    pdfs = collect_pdfs(args.inputs)
+    if not pdfs:
+        print("No PDF files found.", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    try:
+        results = run_batch(
+            pdfs, load_manifest(args.manifest), args.out, args.workers,
+            price_mode=args.price_mode, history=not args.no_history, offline=args.offline
+        )
+    except BatchError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.zip:
+        names = bundle_results(results, args.zip)
+        print(f"Bundled {len(names)} DATAFILE(s) → {args.zip}")
+
+    _print_report(results, time.perf_counter() - start)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
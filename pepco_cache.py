@@ -0,0 +1,187 @@
+# pepco_cache.py
+# PDF extraction cache — SHA-256 of the PDF bytes (PdfDocument.sha256) → parsed result
+# দুই স্তর:
+#   1) in-memory LRU (প্রতি process)
+#   2) on-disk JSON files, total size সীমার বাইরে গেলে পুরনোগুলো মুছে ফেলে
+# ব্যবহার:
+#   from pepco_cache import ExtractionCache
+#   cache = ExtractionCache(".pepco_cache", version=1)
+#   result = cache.get(doc.sha256)
+#   if result is None:
+#       result = parse(doc)
+#       cache.put(doc.sha256, result)
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+__all__ = ["ExtractionCache"]
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of JSON-able values."""
+
+    def __init__(
+        self,
+        cache_dir: str | None,
+        version: int = 1,
+        max_memory_items: int = 64,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        # Parser version is part of the path → old results never reused
+        self.cache_dir = os.path.join(cache_dir, f"v{version}") if cache_dir else None
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._disk_bytes = sum(size for _, _, size in self._disk_entries())
+            except OSError:
+                self.cache_dir = None
+
+    # ---------- Public API ----------
+    def get(self, key: str):
+        """Cached value for key, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return entry[0]
+
+        payload = self._disk_read(key)
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value = json.loads(payload)
+        with self._lock:
+            self.hits_disk += 1
+            self._memory_put(key, value, len(payload))
+        return value
+
+    def put(self, key: str, value) -> None:
+        """Store value in both tiers."""
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._memory_put(key, value, len(payload))
+        self._disk_write(key, payload)
+
+    def clear(self) -> None:
+        """Drop every entry (memory + disk)."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path, _, _ in self._disk_entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and bytes held per tier."""
+        with self._lock:
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_items": len(self._disk_entries()),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    # ---------- Memory tier ----------
+    def _memory_put(self, key, value, size) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+
+        self._memory[key] = (value, size)
+        self._memory_bytes += size
+
+        while len(self._memory) > self.max_memory_items:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    # ---------- Disk tier ----------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_entries(self):
+        """[(path, mtime, size)] of cache files, oldest first."""
+        if not self.cache_dir:
+            return []
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for e in it:
+                    if e.is_file() and e.name.endswith(".json"):
+                        st = e.stat()
+                        entries.append((e.path, st.st_mtime, st.st_size))
+        except OSError:
+            return []
+        entries.sort(key=lambda x: x[1])
+        return entries
+
+    def _disk_read(self, key: str):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                payload = fh.read()
+            os.utime(path)  # mtime = last use → LRU order on disk
+            return payload
+        except OSError:
+            return None
+
+    def _disk_write(self, key: str, payload: bytes) -> None:
+        if not self.cache_dir or len(payload) > self.max_disk_bytes:
+            return
+
+        path = self._path(key)
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(payload)
+            existed = os.path.exists(path)
+            old_size = os.path.getsize(path) if existed else 0
+            os.replace(tmp, path)  # atomic
+        except OSError:
+            return
+
+        with self._lock:
+            self._disk_bytes += len(payload) - old_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = self._disk_entries()
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
@@ -0,0 +1,178 @@
+# pepco_catalog.py
+# Product translations sheet (DEPARTMENT, PRODUCT_NAME, EN, AL, ..., SK) → catalog index
+# Sheet version প্রতি একবার build হয়:
+#   - department → ordered product list
+#   - case-insensitive department / product lookup (PDF Item_name_EN → default)
+#   - প্রতিটা product-এর |EN| ... |SK| string আগেই তৈরি; শুধু AL / MK
+#     material অংশ request-এর সময় বসে
+# ব্যবহার:
+#   catalog = ProductCatalog(translations_df)
+#   catalog.products("Baby Boy")                     # ('T-SHIRT', ...)
+#   catalog.product_index("Baby Boy", "t-shirt")     # selectbox default
+#   catalog.template("Baby Boy", "T-SHIRT").render(materials, names, compositions)
+
+from __future__ import annotations
+
+__all__ = ["ProductCatalog", "ProductTemplate", "LANGUAGE_ORDER", "COUNTRY_SUFFIXES"]
+
+# Language order after |EN| (ES already carries ES_CA)
+LANGUAGE_ORDER = [
+    'AL', 'BG', 'BiH', 'CZ', 'DE', 'EE',
+    'ES', 'GR', 'HR', 'HU', 'IT', 'LT',
+    'LV', 'MK', 'PL', 'PT', 'RO', 'RS',
+    'SI', 'SK'
+]
+
+# Country suffix rules
+COUNTRY_SUFFIXES = {
+    'BiH': " Sastav materijala na ušivenoj etiketi.",
+    'RS': " Sastav materijala nalazi se na ušivenoj etiketi.",
+}
+
+# Languages that get ": <material composition>" appended
+MATERIAL_SLOTS = ('AL', 'MK')
+
+
+def _isna(value) -> bool:
+    try:
+        return value is None or value != value
+    except Exception:
+        return False
+
+
+class ProductTemplate:
+    """Prebuilt multilingual description with AL / MK material slots."""
+
+    def __init__(self, product_name, translation_row) -> None:
+        # EN fallback
+        chunks = [f"|EN| {translation_row.get('EN', product_name)}"]
+
+        # ES / ES_CA combined
+        es_ca = translation_row.get('ES_CA')
+        combined = {
+            'ES': (
+                f"{translation_row['ES']} / {translation_row['ES_CA']}"
+                if not _isna(es_ca)
+                else translation_row.get('ES')
+            )
+        }
+
+        # Literal text between material slots: chunks[0] + slot AL + chunks[1] + slot MK + chunks[2]
+        self._slots = []
+        current = chunks[0]
+        for lang in LANGUAGE_ORDER:
+            text = combined.get(lang)
+            if text is None:
+                text = translation_row.get(lang, product_name)
+
+            if lang in COUNTRY_SUFFIXES:
+                if not text.endswith('.'):
+                    text += "."
+                text += COUNTRY_SUFFIXES[lang]
+
+            current += f" |{lang}| {text}"
+            if lang in MATERIAL_SLOTS:
+                self._slots.append(lang)
+                chunks[-1] = current
+                chunks.append("")
+                current = ""
+        chunks[-1] = current
+        self._chunks = chunks
+
+    def render(
+        self,
+        selected_materials=None,
+        material_translations=None,
+        material_compositions=None
+    ) -> str:
+        """Fills the AL / MK slots with composition (or material names)."""
+        out = [self._chunks[0]]
+        for lang, chunk in zip(self._slots, self._chunks[1:]):
+            if selected_materials and material_translations:
+                comp = (material_compositions or {}).get(lang, "")
+                names = material_translations.get(lang, "")
+                if comp:
+                    out.append(f": {comp}")
+                elif names:
+                    out.append(f": {names}")
+            out.append(chunk)
+        return "".join(out)
+
+
+class ProductCatalog:
+    """Department → products index with one template per product."""
+
+    def __init__(self, translations_df) -> None:
+        self.departments = []
+        self._products = {}      # dept → [product, ...]
+        self._rows = {}          # (dept, product) → first sheet row (dict)
+        self._templates = {}     # (dept, product) → ProductTemplate | None
+        self._dept_lookup = {}   # lowercased dept → index
+        self._product_lookup = {}  # dept → {lowercased product → index}
+
+        if translations_df is None or translations_df.empty:
+            self.departments = ()
+            return
+
+        for row in translations_df.to_dict('records'):
+            dept = row['DEPARTMENT']
+            if _isna(dept):
+                continue
+            products = self._products.get(dept)
+            if products is None:
+                products = self._products[dept] = []
+                self._product_lookup[dept] = {}
+                self._dept_lookup.setdefault(str(dept).strip().lower(), len(self.departments))
+                self.departments.append(dept)
+
+            product = row['PRODUCT_NAME']
+            if _isna(product) or (dept, product) in self._rows:
+                continue
+            self._product_lookup[dept].setdefault(str(product).strip().lower(), len(products))
+            products.append(product)
+            self._rows[(dept, product)] = row
+
+        # Shared read-only across sessions → hand out tuples
+        self.departments = tuple(self.departments)
+        self._products = {dept: tuple(products) for dept, products in self._products.items()}
+
+        for key, row in self._rows.items():
+            try:
+                self._templates[key] = ProductTemplate(key[1], row)
+            except Exception:
+                # Malformed row → raise only if this product is actually used
+                self._templates[key] = None
+
+    @property
+    def empty(self) -> bool:
+        return not self.departments
+
+    def products(self, dept) -> tuple:
+        return self._products.get(dept, ())
+
+    def department_index(self, wanted) -> int:
+        """Index of `wanted` department (case-insensitive), 0 if missing."""
+        if not wanted:
+            return 0
+        return self._dept_lookup.get(str(wanted).strip().lower(), 0)
+
+    def product_index(self, dept, wanted) -> int:
+        """Index of `wanted` product within dept (case-insensitive), 0 if missing."""
+        if not wanted:
+            return 0
+        return self._product_lookup.get(dept, {}).get(str(wanted).strip().lower(), 0)
+
+    def row(self, dept, product):
+        """First sheet row for the product (dict copy), or None."""
+        row = self._rows.get((dept, product))
+        return dict(row) if row is not None else None
+
+    def template(self, dept, product):
+        """ProductTemplate for the product, or None if not in the catalog."""
+        key = (dept, product)
+        if key not in self._rows:
+            return None
+        template = self._templates.get(key)
+        if template is None:
+            template = ProductTemplate(product, self._rows[key])  # re-raises the row error
+        return template
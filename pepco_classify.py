@@ -0,0 +1,164 @@
+# pepco_classify.py
+# Item classification (PDF "Item classification" text) → সব derived মান এক জায়গায়
+#   class_type  → COLLECTION_MAPPING key (b / a / d / d_girls / yg)
+#   dept_label  → UI Department (Baby Boy, Girls, ...)
+#   dept_code   → DATAFILE Dept column (BABY / KIDS / TEENS / WOMEN / MEN)
+#   gender      → collection suffix (B / G)
+# নতুন department = CLASSIFICATION_RULES-এ নতুন row (code change লাগে না)
+# প্রতিটা আলাদা classification string একবারই evaluate হয় (memoized)।
+# ব্যবহার:
+#   info = CLASSIFIER.classify("Baby Boys Outerwear")
+#   info.dept_code, info.class_type
+#   CLASSIFIER.map_collection("Baby Boys Outerwear", "CROCO CLUB")   # 'MODERN 1'
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+__all__ = [
+    "Classification",
+    "ClassificationRules",
+    "CLASSIFICATION_RULES",
+    "COLLECTION_MAPPING",
+    "CLASSIFIER",
+]
+
+
+class Classification(NamedTuple):
+    """Everything derived from one item classification string."""
+    class_type: str | None = None
+    dept_label: str | None = None
+    dept_code: str = ""
+    gender: str | None = None
+
+
+# A row sets only the attributes it names (None = no opinion); each
+# attribute takes the first matching row that has a value for it.
+CLASSIFICATION_RULES = (
+    # substring (lowercase)      class_type  dept_label    dept_code  gender
+    ("younger girls outerwear",  "yg",       "Girls",      None,      None),
+    ("baby boys outerwear",      "b",        "Baby Boy",   None,      None),
+    ("baby girls outerwear",     "a",        "Baby Girl",  None,      None),
+    ("baby boys essentials",     "d",        "Baby Boy",   None,      None),
+    ("baby girls essentials",    "d_girls",  "Baby Girl",  None,      None),
+    ("younger boys outerwear",   "yg",       "Boys",       None,      None),
+    ("older girls outerwear",    "yg",       "Girls",      None,      None),
+    ("older boys outerwear",     "yg",       "Boys",       None,      None),
+    ("ladies outerwear",         "a",        "Women",      None,      None),
+    ("mens outerwear",           "b",        "Mens",       None,      None),
+    ("baby boys",                None,       None,         "BABY",    None),
+    ("baby girls",               None,       None,         "BABY",    None),
+    ("younger boys",             None,       None,         "KIDS",    "B"),
+    ("younger girls",            None,       None,         "KIDS",    "G"),
+    ("older girls",              None,       None,         "TEENS",   "G"),
+    ("older boys",               None,       None,         "TEENS",   "B"),
+    ("ladies outerwear",         None,       None,         "WOMEN",   None),
+    ("mens outerwear",           None,       None,         "MEN",     None),
+)
+
+COLLECTION_MAPPING = {
+    'b': {
+        'CROCO CLUB': 'MODERN 1',
+        'LITTLE SAILOR': 'MODERN 2',
+        'EXPLORE THE WORLD': 'MODERN 3',
+        'JURASIC ADVENTURE': 'MODERN 4',
+        'WESTERN SPIRIT': 'CLASSIC 1',
+        'SUMMER FUN': 'CLASSIC 2'
+    },
+    'a': {
+        'Rainbow Girl': 'MODERN 1',
+        'NEONS PICNIC': 'MODERN 2',
+        'COUNTRY SIDE': 'ROMANTIC 2',
+        'ESTER GARDENG': 'ROMANTIC 3'
+    },
+    'd': {
+        'LITTLE TREASURE': 'MODERN 1',
+        'DINO FRIENDS': 'CLASSIC 1',
+        'EXOTIC ANIMALS': 'CLASSIC 2'
+    },
+    'd_girls': {
+        'SWEEET PASTELS': 'MODERN 1',
+        'PORCELAIN': 'ROMANTIC 2',
+        'SUMMER VIBE': 'ROMANTIC 3'
+    },
+    'yg': {
+        'CUTE_JUMP': 'COLLECTION_1',
+        'SWEET_HEART': 'COLLECTION_2',
+        'DAISY': 'COLLECTION_3',
+        'SPECIAL OCC': 'COLLECTION_4',
+        'LILALOV': 'COLLECTION_5',
+        'COOL GIRL': 'COLLECTION_6',
+        'DEL MAR': 'COLLECTION_7'
+    }
+}
+
+_EMPTY = Classification()
+
+
+class ClassificationRules:
+    """Compiled rule table with a per-string memo."""
+
+    def __init__(self, rules=CLASSIFICATION_RULES, collection_mapping=None, max_memo=4096) -> None:
+        self.rules = tuple(rules)
+        self.max_memo = max_memo
+        self._memo = {}
+
+        # Per attribute: ordered (substring, value) pairs, rows without a value dropped
+        fields = Classification._fields
+        self._chains = [
+            tuple((row[0], row[i + 1]) for row in self.rules if row[i + 1] is not None)
+            for i in range(len(fields))
+        ]
+        self._patterns = tuple(dict.fromkeys(row[0] for row in self.rules))
+
+        # Upper-cased once for the substring test
+        mapping = COLLECTION_MAPPING if collection_mapping is None else collection_mapping
+        self._collections = {
+            key: tuple((orig.upper(), new) for orig, new in table.items())
+            for key, table in mapping.items()
+        }
+
+    def _evaluate(self, ic: str) -> Classification:
+        hits = {p for p in self._patterns if p in ic}
+        if not hits:
+            return _EMPTY
+        values = []
+        for chain, default in zip(self._chains, _EMPTY):
+            for pattern, value in chain:
+                if pattern in hits:
+                    values.append(value)
+                    break
+            else:
+                values.append(default)
+        return Classification(*values)
+
+    def classify(self, item_class) -> Classification:
+        """Classification for one item classification string (memoized)."""
+        if not item_class:
+            return _EMPTY
+
+        info = self._memo.get(item_class)
+        if info is None:
+            info = self._evaluate(item_class.lower())
+            if len(self._memo) >= self.max_memo:
+                self._memo.clear()
+            self._memo[item_class] = info
+        return info
+
+    def map_collection(self, item_class, collection: str) -> str:
+        """PDF collection name → mapped collection (unchanged if no rule)."""
+        table = self._collections.get(self.classify(item_class).class_type)
+        if table:
+            upper = collection.upper()
+            for orig, new in table:
+                if orig in upper:
+                    return new
+        return collection
+
+    def collection_with_gender(self, collection, item_class):
+        """Append the B / G suffix for boys / girls groups."""
+        gender = self.classify(item_class).gender
+        return f"{collection} {gender}" if gender else collection
+
+
+CLASSIFIER = ClassificationRules()
@@ -0,0 +1,186 @@
+# pepco_colour.py
+# Colour detection — প্রতিটা page একবার line-এ ভাগ হয়, তিনটা strategy সেই একই view ব্যবহার করে
+#   1️⃣ "Colour" header-এর দুই line পরের window-এ "<NAME> <dd-dddd>" row
+#   2️⃣ "Purchase price" header-এর পরের line থেকে window-এ একই row
+#   3️⃣ "colour" আছে এমন page-এর যেকোনো line-এ "<name> <dd-dddd>" (line-এর শেষ token বাদে নাম)
+# আগের DOTALL regex (Colour.*?\n.*?\n\s*([A-Za-z ]+)\s+...) গুলোর মতোই result, কিন্তু
+# প্রতিটা line একবারই দেখা হয় আর কোনো pattern backtrack করে না → page size-এ linear।
+# ব্যবহার:
+#   from pepco_colour import COLOUR_DETECTOR
+#   COLOUR_DETECTOR.detect(pages_text)      # "NAVY" / None
+#   COLOUR_DETECTOR.table_colour(pages)     # শুধু 1️⃣ (layout-এর colour page-গুলোতে)
+#
+# Header-এর পর শুধু HEADER_WINDOW line দেখা হয় (আগে page-এর শেষ পর্যন্ত);
+# table row header-এর ঠিক নিচে থাকে, আর window-এর বাইরের row 3️⃣ ধরে।
+# benchmarks/bench_colour.py adversarial page দিয়ে legacy-র সাথে মেলায় + সময় bound check করে।
+
+from __future__ import annotations
+
+import re
+
+__all__ = ["HEADER_WINDOW", "ColourDetector", "COLOUR_DETECTOR"]
+
+HEADER_WINDOW = 12
+
+_ASCII_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz")
+
+# Maximal name run — nothing follows it in the pattern, so no backtracking
+# (IGNORECASE like the header patterns it replaces)
+_NAME_RUN = re.compile(r"[A-Za-z ]*", re.IGNORECASE)
+_PANTONE = re.compile(r"[0-9]{2}-[0-9]{4}")
+_PANTONE_AFTER_SPACE = re.compile(r"(?<=\s)[0-9]{2}-[0-9]{4}")
+
+
+class _Page:
+    """Line view of one page text, split once and shared by every strategy."""
+    __slots__ = ("text", "_lower", "_lines")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self._lower = None
+        self._lines = None
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def lines(self) -> list:
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    def header_lines(self, keyword: str):
+        """Indexes of lines containing keyword (lowercase), in order."""
+        if keyword not in self.lower:
+            return
+        for i, line in enumerate(self.lines):
+            if keyword in line.lower():
+                yield i
+
+
+def _row_name(lines, j, stop):
+    r"""
+    Name of a "<NAME>  <dd-dddd>" row starting at line j, else None.
+    Same as re.match(r"\s*([A-Za-z ]+)\s+[0-9]{2}-[0-9]{4}") from that
+    line: the pantone may sit on the next non-blank line (before stop).
+    """
+    s = lines[j].lstrip()
+    run = _NAME_RUN.match(s).group()
+    name = run.rstrip(" ")
+    if not name:
+        return None
+    rest = s[len(run):]
+    tail = rest.lstrip()
+    gap = len(run) - len(name) + len(rest) - len(tail)
+    if not tail:
+        # \s+ crosses the line break → pantone on the next non-blank line
+        gap += 1
+        k = j + 1
+        while k < stop and not lines[k].strip():
+            k += 1
+        if k >= stop:
+            return None
+        tail = lines[k].lstrip()
+    if gap and _PANTONE.match(tail):
+        return name.strip().upper()
+    return None
+
+
+def _line_has_pantone_row(line):
+    r"""Same as re.search(r"[A-Za-z ]+\s+[0-9]{2}-[0-9]{4}", line), linear."""
+    if "-" not in line:
+        return False
+    for m in _PANTONE_AFTER_SPACE.finditer(line):
+        # Whitespace run right before the pantone: needs a letter before it,
+        # or a space inside it with more whitespace after (the space is the name)
+        start = m.start()
+        i = start - 1
+        while i >= 0 and line[i].isspace():
+            i -= 1
+        if i >= 0 and line[i] in _ASCII_LETTERS:
+            return True
+        if " " in line[i + 1:start - 1]:
+            return True
+    return False
+
+
+class ColourDetector:
+    """Bounded-cost colour detection over page texts (see module header)."""
+
+    def __init__(self, window: int = HEADER_WINDOW) -> None:
+        self.window = window
+
+    def _after_header(self, page, keyword, skip):
+        """
+        Row name in a window after any header line (each line tested once);
+        "" when a pantone starts a row after a whitespace-only "name" (the
+        legacy pattern's [A-Za-z ]+ then matched spaces), None if nothing.
+        """
+        lines = page.lines
+        scanned = 0
+        for i in page.header_lines(keyword):
+            start = max(i + skip, scanned)
+            stop = min(len(lines), i + skip + self.window)
+            blank_from = None
+            for j in range(start, stop):
+                line = lines[j]
+                s = line.lstrip()
+                if not s:
+                    if blank_from is None:
+                        blank_from = j
+                    continue
+                if _PANTONE.match(s):
+                    first = j if blank_from is None else blank_from
+                    spaces = "\n".join(lines[first:j] + [line[:len(line) - len(s)]])
+                    if " " in spaces[:-1]:
+                        return ""
+                else:
+                    name = _row_name(lines, j, min(len(lines), j + self.window))
+                    if name:
+                        return name
+                blank_from = None
+            scanned = max(scanned, stop)
+        return None
+
+    def table_colour(self, pages_text):
+        """Strategy 1️⃣ only: first Colour-table row name, or None."""
+        return self._table_colour([_Page(txt) for txt in pages_text])
+
+    def _table_colour(self, pages):
+        for page in pages:
+            name = self._after_header(page, "colour", 2)
+            if name is not None:
+                return name
+        return None
+
+    def detect(self, pages_text):
+        """Colour name or None (no UI fallback)."""
+        pages = [_Page(txt) for txt in pages_text]
+
+        # -------- 1️⃣ Standard Colour Table --------
+        name = self._table_colour(pages)
+        if name is not None:
+            return name
+
+        # -------- 2️⃣ Purchase Price block --------
+        for page in pages:
+            name = self._after_header(page, "purchase price", 1)
+            if name is not None:
+                return name
+
+        # -------- 3️⃣ Generic fallback using "colour" keyword --------
+        for page in pages:
+            if "colour" in page.lower:
+                for line in page.lines:
+                    if _line_has_pantone_row(line):
+                        name = line.split()[0:-1]
+                        if name:
+                            return " ".join(name).upper()
+
+        return None
+
+
+COLOUR_DETECTOR = ColourDetector()
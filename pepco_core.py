@@ -0,0 +1,1003 @@
+# pepco_core.py
+# Streamlit-ছাড়া PEPCO pipeline core — extraction, classification, price,
+# translation আর DATAFILE builder; app.py, batch CLI, pool worker সবাই এটা import করে
+#   - import-এর সময় কোনো UI side effect নেই (st.* call নেই)
+#   - pandas / PyMuPDF / requests / sqlite — প্রথম দরকারের সময় import হয়
+#   - সমস্যা st.error না দেখিয়ে Issue হিসেবে result-এ ফেরত আসে; UI সেগুলো দেখায়
+# ব্যবহার:
+#   import pepco_core as core
+#   result = core.extract_records(PdfDocument(raw))       # SheetRecords(sheet, issues, parsed)
+#   sheet = core.enrich_sheet(result.sheet, ...)            # SheetModel (pepco_sheet), columnar
+#   for issue in result.issues: print(issue.level, issue.message)
+#   match = core.resolve_price_tier(29.99, ladder, "nearest")   # PriceMatch(pln, values, issues)
+#   core.history_issues(sheet, core.open_history(), doc.sha256)  # barcodes issued before
+#   core.prescan_issues(OrderIdPrescan(pool).scan(primary, others))  # merged upload notes
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import NamedTuple
+from urllib.parse import quote
+
+from pepco_cache import ExtractionCache
+from pepco_catalog import ProductCatalog, ProductTemplate
+from pepco_classify import CLASSIFIER
+from pepco_colour import COLOUR_DETECTOR
+from pepco_export import datafile_csv_bytes
+from pepco_fields import FIELD_EXTRACTOR
+from pepco_layout import LAYOUT_STATS, identify_layout
+from pepco_materials import MaterialTable
+from pepco_pairing import pair_sku_barcodes
+from pepco_prices import PriceLadder, format_number
+from pepco_reader import as_document
+from pepco_sheet import SheetModel
+from pepco_trace import TRACER, traced
+
+__all__ = [
+    "Issue",
+    "SheetRecords",
+    "PriceMatch",
+    "WASHING_CODES",
+    "DISK_FILENAME_MAX",
+    "CURRENCY_COLUMNS",
+    "DATAFILE_COLUMNS",
+    "EXTRACTION_CACHE_VERSION",
+    "PRICE_SHEET_URL",
+    "TRANSLATION_SHEET_URL",
+    "MATERIAL_SHEET_URL",
+    "parse_price_csv",
+    "parse_translations_csv",
+    "parse_material_csv",
+    "open_reference_snapshots",
+    "REFERENCE_BUILDERS",
+    "build_price_ladder",
+    "open_reference_store",
+    "reference_data",
+    "open_extraction_cache",
+    "open_history",
+    "history_issues",
+    "prescan_issues",
+    "detect_pl_sales_price",
+    "resolve_price_tier",
+    "get_classification_type",
+    "map_item_class_to_dept_label",
+    "get_dept_value",
+    "modify_collection",
+    "clean_item_name_english",
+    "extract_colour_from_page2",
+    "detect_colour_from_pdf_pages",
+    "extract_order_id_only",
+    "extract_sku_barcodes",
+    "parse_pdf_pages",
+    "parse_pdf_document",
+    "build_sheet",
+    "extract_document",
+    "sheet_records",
+    "extract_records",
+    "format_product_translations",
+    "cotton_flag",
+    "translate_material_rows",
+    "enrich_sheet",
+    "finalize_sheet",
+    "build_datafile_csv",
+    "build_sheet_filename",
+]
+
+
+class Issue(NamedTuple):
+    """One user-facing problem; level is error / warning / info."""
+    level: str
+    message: str
+
+
+class SheetRecords(NamedTuple):
+    """Extraction outcome: columnar sheet (None on error) + issues."""
+    sheet: SheetModel | None
+    issues: list
+    parsed: dict | None = None
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.sheet)
+
+    @property
+    def records(self) -> list:
+        """One dict per SKU (materialized on each access)."""
+        return self.sheet.records() if self.sheet else []
+
+
+class PriceMatch(NamedTuple):
+    """Ladder PLN + {currency: formatted} (None, None on failure) + issues."""
+    pln: float | None
+    values: dict | None
+    issues: list
+
+
+# ================================================================
+#  CONSTANTS & MAPPINGS
+# ================================================================
+WASHING_CODES = {
+    '1': '১২৩৪৫', '2': '১৪৭৮৫', '3': 'djnst', '4': 'djnpt', '5': 'djnqt',
+    '6': 'djnqt', '7': 'gjnpt', '8': 'gjnpu', '9': 'gjnqt', '10': 'gjnqu',
+    '11': 'ijnst', '12': 'ijnsu', '13': 'ijnpu', '14': 'ijnsv', '15': 'djnsw'
+}
+
+# On-disk DATAFILE names longer than this get a short SKU part (filesystems
+# stop at 255 bytes; the full name joins every SKU)
+DISK_FILENAME_MAX = 200
+
+
+# ================================================================
+#  REFERENCE SHEET SOURCES (env override → local test server)
+# ================================================================
+PRICE_SHEET_URL = os.environ.get(
+    "PEPCO_PRICE_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/"
+    "2PACX-1vRdAQmBHwDEWCgmLdEdJc0HsFYpPSyERPHLwmr2tnTYU1BDWdBD6I0ZYfEDzataX0wTNhfLfnm-Te6w/"
+    "pub?gid=583402611&single=true&output=csv"
+)
+
+TRANSLATION_SHEET_URL = os.environ.get(
+    "PEPCO_TRANSLATION_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/1ue68TSJQQedKa7sVBB4syOc0OXJNaLS7p9vSnV52mKA"
+    f"/gviz/tq?tqx=out:csv&sheet={quote('SS26 Product_Name')}"
+)
+
+MATERIAL_SHEET_URL = os.environ.get(
+    "PEPCO_MATERIAL_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/"
+    "2PACX-1vRdAQmBHwDEWCgmLdEdJc0HsFYpPSyERPHLwmr2tnTYU1BDWdBD6I0ZYfEDzataX0wTNhfLfnm-Te6w/"
+    "pub?gid=1096440227&single=true&output=csv"
+)
+
+
+# ================================================================
+#  SHEET PARSERS (run on the fetcher's worker threads)
+# ================================================================
+def parse_price_csv(body):
+    """Price CSV → {currency: (values)} (None if the sheet is empty)."""
+    import pandas as pd
+
+    df = pd.read_csv(BytesIO(body))
+
+    if df.empty:
+        return None
+
+    # Convert to dictionary {currency: (values)} — tuples: shared read-only
+    price_data = {}
+    for currency in df.columns:
+        price_data[currency] = tuple(df[currency].dropna().tolist())
+
+    return price_data
+
+
+def parse_translations_csv(body):
+    """Product name translations CSV → DataFrame."""
+    import pandas as pd
+
+    return pd.read_csv(BytesIO(body))
+
+
+def parse_material_csv(body):
+    """Materials CSV → MaterialTable ((material, language) → translation)."""
+    import pandas as pd
+
+    return MaterialTable.from_frame(pd.read_csv(BytesIO(body)))
+
+
+# ================================================================
+#  REFERENCE SNAPSHOTS (headless: batch CLI, replay)
+# ================================================================
+def open_reference_snapshots(refresh_interval=None):
+    """ReferenceSnapshots over the three sheets, configured from the env (not started)."""
+    from pepco_fetch import ReferenceFetcher
+    from pepco_snapshots import ReferenceSnapshots
+
+    if refresh_interval is None:
+        refresh_interval = float(os.environ.get("PEPCO_REFRESH_INTERVAL", "600"))
+
+    return ReferenceSnapshots(
+        os.environ.get("PEPCO_SNAPSHOT_DB", os.path.join(".pepco_cache", "reference.sqlite3")),
+        {
+            "prices": PRICE_SHEET_URL,
+            "translations": TRANSLATION_SHEET_URL,
+            "materials": MATERIAL_SHEET_URL,
+        },
+        parsers={
+            "prices": parse_price_csv,
+            "translations": parse_translations_csv,
+            "materials": parse_material_csv,
+        },
+        refresh_interval=refresh_interval,
+        fetcher=ReferenceFetcher(
+            connect_timeout=float(os.environ.get("PEPCO_FETCH_CONNECT_TIMEOUT", "3.05")),
+            read_timeout=float(os.environ.get("PEPCO_FETCH_READ_TIMEOUT", "15")),
+            retries=int(os.environ.get("PEPCO_FETCH_RETRIES", "2")),
+        ),
+    )
+
+
+def build_price_ladder(price_data):
+    """PriceLadder for parsed price data, None when the sheet has no PLN column."""
+    if not price_data or "PLN" not in price_data:
+        return None
+    return PriceLadder(price_data)
+
+
+# Parsed snapshot → shared object (pepco_refstore.ReferenceStore); materials
+# are parsed straight into a MaterialTable
+REFERENCE_BUILDERS = {
+    "prices": build_price_ladder,
+    "translations": ProductCatalog,
+}
+
+
+def open_reference_store(snapshots):
+    """ReferenceStore over snapshots: one shared ladder / catalog / material table per version."""
+    from pepco_refstore import ReferenceStore
+
+    return ReferenceStore(snapshots, REFERENCE_BUILDERS)
+
+
+def reference_data(snapshots):
+    """
+    ({"catalog", "materials", "prices"}, issues) from the current snapshots,
+    with the same fallbacks as the UI loaders: empty catalog, Cotton-only
+    materials, no price ladder.
+    """
+    issues = []
+
+    def _parsed(name):
+        try:
+            return snapshots.parsed(name)
+        except Exception as e:
+            issues.append(Issue("warning", f"{name} sheet could not be loaded: {e}"))
+            return None
+
+    price_data = _parsed("prices")
+    materials = _parsed("materials")
+    if materials is None:
+        materials = MaterialTable({('Cotton', 'AL'): 'Cotton', ('Cotton', 'MK'): 'Cotton'})
+
+    ref = {
+        "catalog": ProductCatalog(_parsed("translations")),
+        "materials": materials,
+        "prices": build_price_ladder(price_data),
+    }
+    return ref, issues
+
+
+# ================================================================
+#  HELPER FUNCTIONS
+# ================================================================
+
+# ---------- Auto detect PLN price from PDF text ----------
+def detect_pl_sales_price(full_text):
+    try:
+        m = re.search(r"PL\s+[^\n]*?(\d+[\.,]\d+)", full_text)
+        if m:
+            return m.group(1).replace(',', '.')
+    except Exception:
+        pass
+    return None
+
+
+# ---------- Match PLN to price ladder ----------
+def resolve_price_tier(pln_value, ladder, mode="exact") -> PriceMatch:
+    """
+    Ladder tier for the PLN price (mode: exact / nearest / next_higher);
+    failures come back as error issues.
+    """
+    if ladder is None:
+        return PriceMatch(None, None, [Issue("error", "❌ Price data not available")])
+
+    try:
+        pln_value = float(pln_value)
+        idx = ladder.resolve(pln_value, mode)
+
+        if idx is None:
+            return PriceMatch(None, None, [Issue("error", f"❌ PLN {pln_value} not found in price sheet.")])
+
+        currency_values = ladder.row(idx)
+        if currency_values is None:
+            return PriceMatch(None, None, [Issue(
+                "error", f"Invalid price value: incomplete price row for PLN {pln_value}"
+            )])
+
+        return PriceMatch(ladder.pln_at(idx), currency_values, [])
+
+    except Exception as e:
+        return PriceMatch(None, None, [Issue("error", f"Invalid price value: {str(e)}")])
+
+
+# ---------- Classification → mapping (rule table in pepco_classify) ----------
+def get_classification_type(item_class):
+    """Determine class type key used in COLLECTION_MAPPING."""
+    return CLASSIFIER.classify(item_class).class_type
+
+
+# ---------- Map Item_classification → Dept label ----------
+def map_item_class_to_dept_label(item_class):
+    """Map item_class text to UI Department names."""
+    return CLASSIFIER.classify(item_class).dept_label
+
+
+# ---------- Map Item_classification → DEPT column ----------
+def get_dept_value(item_class):
+    """Maps classification → BABY / KIDS / TEENS / WOMEN / MEN."""
+    return CLASSIFIER.classify(item_class).dept_code
+
+
+# ---------- Modify collection name (add B/G) ----------
+def modify_collection(collection, item_class):
+    """Append B/G based on gender groups."""
+    return CLASSIFIER.collection_with_gender(collection, item_class)
+
+# ---------- Item_name_EN ----------
+
+
+def clean_item_name_english(name: str) -> str:
+    """
+    Item_name_EN থেকে নিচের prefix গুলো বাদ দিয়ে
+    বাকি অংশ CAPITAL LETTERS এ রিটার্ন করবে।
+    """
+    if not isinstance(name, str):
+        return ""
+
+    text = name.strip()
+    lower = text.lower()
+
+    # লম্বা phrase আগে, তারপর ছোট – যেন "baby girl basic" থাকলে
+    # শুধু "baby girl" কেটে না যায়।
+    prefixes = [
+        "baby girl basic",
+        "baby boy basic",
+        "baby girl",
+        "baby boy",
+        "girl's",
+        "boy's",
+        "men's",
+        "women's",
+    ]
+
+    for p in prefixes:
+        if lower.startswith(p):
+            # prefix এর দৈর্ঘ্য অনুযায়ী কাটবো
+            cut_len = len(p)
+            text = text[cut_len:].strip(" -_,./").strip()
+            break
+
+    # সবশেষে CAPITAL
+    return text.upper()
+
+
+# ================================================================
+#  COLOUR EXTRACTION (multiple PDF layout compatible)
+# ================================================================
+def extract_colour_from_page2(text, page_number=1):
+    """Old function: Extract colour from page2."""
+    try:
+        m = re.search(
+            r"Colour[^\n]*?\n\s*([A-Za-z]+)\s+([0-9]{2}-[0-9]{4}[A-Za-z]*)",
+            text,
+            re.IGNORECASE
+        )
+        if m:
+            colour_name = m.group(1).strip().upper()
+            pantone = m.group(2).strip().upper()
+            return f"{colour_name} {pantone}"
+        return "UNKNOWN"
+    except Exception:
+        return "UNKNOWN"
+
+
+@traced("parse.colour")
+def detect_colour_from_pdf_pages(pages_text):
+    """
+    Ultra-robust PEPCO Colour Detection (no UI fallback)
+    Supports:
+        ✔ Old 6-page PDF format
+        ✔ New 5-page PDF format
+        ✔ Broken layout (Colour row + size row merged)
+        ✔ Missing pantone
+    Linear in page size (see pepco_colour.py). Returns None when no
+    strategy matches.
+    """
+    return COLOUR_DETECTOR.detect(pages_text)
+
+
+# ================================================================
+#  EXTRACT ORDER ID FROM PDF (for multiple uploads)
+# ================================================================
+def extract_order_id_only(file):
+    """Extract only Order ID from a PDF file (reads page 1 only)."""
+    doc = None
+    try:
+        doc = as_document(file)
+        if len(doc) < 1:
+            return None
+        m = FIELD_EXTRACTOR.extract(doc, names=("order_id_token",))["order_id_token"]
+    except Exception:
+        return None
+    finally:
+        if doc is not None and doc is not file:
+            doc.close()
+
+    return m.group(1).strip() if m else None
+
+
+@traced("parse.pairing")
+def extract_sku_barcodes(pages_text, page_words=None):
+    """
+    SKU ↔ barcode pairs from the size table, row by row (see pepco_pairing.py).
+    "barcode:" references and barcodes outside SKU rows are ignored.
+    """
+    return pair_sku_barcodes(pages_text, page_words)
+
+
+def parse_pdf_pages(pages_text, page_words=None):
+    """
+    Parse all document-level fields + SKU/barcode pairs (no UI calls).
+    pages_text may be a list or a lazy PdfDocument; page_words(i) gives
+    word boxes for tables whose cells are separate text blocks.
+    """
+    # All labelled fields (precompiled table, see pepco_fields.py)
+    with TRACER.span("parse.fields"):
+        fields = FIELD_EXTRACTOR.extract(pages_text)
+
+    # ---------------- AUTO COLOUR EXTRACTION ----------------
+    colour = detect_colour_from_pdf_pages(pages_text)
+
+    # ---------------- SKU + BARCODE ----------------
+    pairing = extract_sku_barcodes(pages_text, page_words)
+
+    return _parsed_fields(fields, colour, pairing)
+
+
+def _parsed_fields(fields, colour, pairing):
+    """Parsed-field dict from field matches, detected colour and pairing."""
+    # ---------------- Item Name EN ----------------
+    m_item = fields["item_name_en"]
+    item_name_en = m_item.group(1).strip() if m_item else None
+
+    # ---------------- Identifiers ----------------
+    merch_code = fields["merch_code"]
+    season = fields["season"]
+    style_code = fields["style_code"]
+
+    style_suffix = ""
+    if merch_code and season:
+        style_suffix = f"{merch_code.group(1).strip()}{season.group(2)}"
+    elif merch_code:
+        style_suffix = merch_code.group(1).strip()
+
+    collection = fields["collection"]
+    date_match = fields["handover_date"]
+
+    batch = "UNKNOWN"
+    if date_match:
+        try:
+            batch_date = datetime.strptime(date_match.group(1), "%d/%m/%Y")
+            batch = (batch_date - timedelta(days=20)).strftime("%m%Y")
+        except Exception:
+            pass
+
+    order_id = fields["order_id"]
+    item_class = fields["item_class"]
+    supplier_code = fields["supplier_code"]
+    supplier_name = fields["supplier_name"]
+
+    item_class_value = item_class.group(1).strip() if item_class else "UNKNOWN"
+
+    collection_value = (
+        collection.group(1).split("-")[0].strip()
+        if collection else "UNKNOWN"
+    )
+
+    # Collection mapping
+    collection_value = CLASSIFIER.map_collection(item_class_value, collection_value)
+
+    season_value = (
+        f"{season.group(1)}{season.group(2)}"
+        if season else "UNKNOWN"
+    )
+
+    return {
+        "Order_ID": order_id.group(1).strip() if order_id else "UNKNOWN",
+        "Style": style_code.group() if style_code else "UNKNOWN",
+        "Colour": colour,
+        "Supplier_product_code": supplier_code.group(1).strip() if supplier_code else "UNKNOWN",
+        "Item_classification": item_class_value,
+        "Supplier_name": supplier_name.group(1).strip() if supplier_name else "UNKNOWN",
+        "Collection": collection_value,
+        "Style_Merch_Season": (
+            f"STYLE {style_code.group()} • {style_suffix} • Batch No./"
+            if style_code else "STYLE UNKNOWN"
+        ),
+        "Batch": f"Data e prodhimit: {batch}",
+        "Item_name_EN": item_name_en or "",
+        "Season": season_value,
+        "skus": pairing.skus,
+        "barcodes": pairing.barcodes,
+        "unmatched_skus": pairing.unmatched_skus,
+        "unmatched_barcodes": pairing.unmatched_barcodes,
+        "pairing": pairing.method,
+    }
+
+
+def _size_table_pages(doc, layout) -> list:
+    """Size page + the following pages while they still hold SKU rows (table continued)."""
+    pages = [layout.sizes_page]
+    while pages[-1] + 1 < len(doc):
+        probe = pair_sku_barcodes([doc[pages[-1] + 1]])
+        if not (probe.skus or probe.unmatched_skus):
+            break
+        pages.append(pages[-1] + 1)
+    return pages
+
+
+def _parse_layout(doc, layout):
+    """
+    Layout-tuned parse: the size table is read from its own page (and the
+    pages it continues onto) and the colour from the colour-table pages;
+    the remaining pages are extracted only when the sheet has no
+    Colour-table row (purchase block / loose text). None when the size
+    page holds no paired SKU → generic.
+    """
+    pages = _size_table_pages(doc, layout)
+    pairing = extract_sku_barcodes([doc[i] for i in pages], lambda i: doc.page_words(pages[i]))
+    if not pairing.skus:
+        return None
+
+    # Strategy 1️⃣ on the leading pages finds what the full scan would
+    with TRACER.span("parse.colour"):
+        colour = COLOUR_DETECTOR.table_colour(doc[:layout.colour_pages])
+    if colour is None:
+        colour = detect_colour_from_pdf_pages(list(doc))
+
+    with TRACER.span("parse.fields"):
+        fields = FIELD_EXTRACTOR.extract(doc)
+    return _parsed_fields(fields, colour, pairing)
+
+
+def parse_pdf_document(doc):
+    """
+    Cacheable extraction result: page texts + parsed fields + layout.
+    A known layout (pepco_layout.py) reads only its table pages; the
+    others stay None in pages_text. Unknown → every page, generic parse.
+    """
+    with TRACER.span("pdf.open"):
+        page_count = len(doc)
+    if not page_count:
+        return {"pages_text": [], "parsed": None, "layout": None}
+
+    with TRACER.span("parse.layout"):
+        fingerprint, layout = identify_layout(doc)
+
+    parsed = None
+    if layout is not None:
+        with TRACER.span("pdf.text", pages=layout.pages_read):
+            doc[:layout.pages_read]
+        with TRACER.span("parse", layout=layout.name, fingerprint=fingerprint.key):
+            parsed = _parse_layout(doc, layout)
+    if parsed is None:
+        layout = None
+        with TRACER.span("pdf.text", pages=page_count):
+            pages_text = list(doc)
+        with TRACER.span("parse", layout="generic", fingerprint=fingerprint.key):
+            parsed = parse_pdf_pages(pages_text, doc.page_words)
+
+    name = layout.name if layout else None
+    LAYOUT_STATS.record(name, fingerprint.key)
+    return {
+        "pages_text": doc.texts(),
+        "parsed": parsed,
+        "layout": {"name": name, "fingerprint": fingerprint.key},
+    }
+
+
+def build_sheet(parsed, colour, skus, barcodes) -> SheetModel:
+    """Document-level fields once + the paired SKU / barcode columns."""
+    return SheetModel(
+        {
+            "Order_ID": parsed["Order_ID"],
+            "Style": parsed["Style"],
+            "Colour": colour,
+            "Supplier_product_code": parsed["Supplier_product_code"],
+            "Item_classification": parsed["Item_classification"],
+            "Supplier_name": parsed["Supplier_name"],
+            "today_date": datetime.today().strftime('%d-%m-%Y'),
+            "Collection": parsed["Collection"],
+            "Style_Merch_Season": parsed["Style_Merch_Season"],
+            "Batch": parsed["Batch"],
+            "Item_name_EN": parsed["Item_name_EN"],
+            "Season": parsed["Season"],
+        },
+        skus,
+        barcodes,
+    )
+
+# ================================================================
+#  EXTRACTION CACHE (content hash → page texts + parsed fields)
+# ================================================================
+# Bump when parse_pdf_pages output changes → old disk entries ignored
+EXTRACTION_CACHE_VERSION = 5
+
+
+def open_extraction_cache():
+    """Extraction cache (memory LRU + disk) configured from the env."""
+    return ExtractionCache(
+        os.environ.get("PEPCO_CACHE_DIR", ".pepco_cache"),
+        version=EXTRACTION_CACHE_VERSION,
+        max_memory_items=int(os.environ.get("PEPCO_CACHE_MEMORY_ITEMS", "64")),
+        max_disk_bytes=int(os.environ.get("PEPCO_CACHE_DISK_MB", "256")) * 1024 * 1024,
+    )
+
+
+# ================================================================
+#  DATAFILE HISTORY (issued SKU / barcode index)
+# ================================================================
+def open_history():
+    """DatafileHistory at PEPCO_HISTORY_DB; None when PEPCO_HISTORY=0."""
+    if os.environ.get("PEPCO_HISTORY", "1") == "0":
+        return None
+    from pepco_history import DatafileHistory
+
+    return DatafileHistory(
+        os.environ.get("PEPCO_HISTORY_DB", os.path.join(".pepco_cache", "history.sqlite3"))
+    )
+
+
+def _listed(names, shown: int) -> str:
+    return ", ".join(names[:shown]) + (f" +{len(names) - shown}" if len(names) > shown else "")
+
+
+def history_issues(sheet, history, pdf_sha256: str | None = None, shown: int = 3) -> list:
+    """
+    Warning for barcodes of this sheet already issued in an earlier DATAFILE
+    (earlier exports of the same PDF do not count); [] without history.
+    """
+    if history is None or not sheet:
+        return []
+    try:
+        with TRACER.span("history.duplicates", barcodes=len(sheet)):
+            hits = history.duplicates(sheet.barcodes, exclude_pdf=pdf_sha256)
+    except Exception as e:
+        return [Issue("warning", f"DATAFILE history check skipped: {e}")]
+    if not hits:
+        return []
+
+    # Grouped by the earlier DATAFILE the barcodes were issued in
+    skus = dict(zip(sheet.barcodes, sheet.skus))
+    by_file = {}
+    other_sku = 0
+    for barcode, found in hits.items():
+        first = found[0]
+        by_file.setdefault((first.file_name, first.created_at), []).append(barcode)
+        other_sku += first.sku != skus.get(barcode)
+
+    details = []
+    for (file_name, created_at), barcodes in list(by_file.items())[:shown]:
+        details.append(f"{file_name} ({datetime.fromtimestamp(created_at):%d-%m-%Y}): {_listed(barcodes, shown)}")
+    if len(by_file) > shown:
+        details.append(f"+{len(by_file) - shown} more DATAFILEs")
+    message = f"{len(hits)} barcode already issued in an earlier DATAFILE — " + "; ".join(details)
+    if other_sku:
+        message += f" ({other_sku} under a different SKU there)"
+    return [Issue("warning", message)]
+
+
+def prescan_issues(report, shown: int = 3) -> list:
+    """
+    What a merged upload's Order-ID prescan (pepco_prescan.PrescanReport)
+    left out: identical files, repeated Order-IDs, files without one.
+    """
+    issues = []
+    if report.duplicate_files:
+        pairs = [f"{name} = {same}" for name, same in report.duplicate_files]
+        issues.append(Issue(
+            "warning",
+            f"{len(pairs)} duplicate upload(s) skipped (same file): {_listed(pairs, shown)}"
+        ))
+    for order_id, names in report.repeated_ids:
+        issues.append(Issue(
+            "warning",
+            f"Order-ID {order_id} is in {len(names)} sheets ({_listed(names, shown)}) — merged once"
+        ))
+    if report.missing:
+        issues.append(Issue(
+            "warning",
+            f"No Order-ID found on page 1 of {_listed(report.missing, shown)} — not merged"
+        ))
+    for name, error in report.errors:
+        issues.append(Issue("error", f"Order-ID of {name} could not be read: {error} — not merged"))
+    return issues
+
+
+# ================================================================
+#  PDF → RECORDS (issues instead of UI messages)
+# ================================================================
+def extract_document(doc, cache=None, fresh: bool = False, pool=None):
+    """
+    parse_pdf_document result, through cache when given (a hit never opens
+    the PDF). fresh=True parses again and overwrites the cached entry.
+    pool (pepco_pool.SheetPool) parses in a sandboxed worker process instead
+    of this one; its SheetPoolError (timeout / memory cap / crash) propagates.
+    """
+    def _parse():
+        if pool is not None:
+            return pool.extract(doc.raw, doc.name)
+        return parse_pdf_document(doc)
+
+    if cache is None:
+        return _parse()
+    # doc.sha256 is computed once per document (or passed in from an earlier rerun)
+    extracted = None if fresh else cache.get(doc.sha256)
+    if extracted is None:
+        extracted = _parse()
+        cache.put(doc.sha256, extracted)
+    return extracted
+
+
+def sheet_records(parsed, colour: str | None = None) -> SheetRecords:
+    """
+    Sheet for parsed fields; colour overrides a missing PDF colour
+    (e.g. typed in by the user).
+    """
+    issues = []
+    colour = parsed["Colour"] or colour
+    if not colour:
+        issues.append(Issue("warning", "⚠️ Colour not found in PDF."))
+        colour = "UNKNOWN"
+
+    skus = parsed["skus"]
+    barcodes = parsed["barcodes"]
+    unmatched_skus = parsed["unmatched_skus"]
+    unmatched_barcodes = parsed["unmatched_barcodes"]
+
+    if unmatched_skus:
+        issues.append(Issue(
+            "warning",
+            f"{len(unmatched_skus)} SKU without a barcode in its table row (not exported): "
+            + ", ".join(unmatched_skus)
+        ))
+    if unmatched_barcodes:
+        issues.append(Issue(
+            "warning",
+            f"{len(unmatched_barcodes)} barcode without a SKU in its table row (ignored): "
+            + ", ".join(unmatched_barcodes)
+        ))
+
+    if not skus:
+        return SheetRecords(None, issues + [Issue("error", "SKU or Barcode missing.")], parsed)
+
+    if parsed["pairing"] == "order":
+        issues.append(Issue(
+            "warning",
+            "SKU table rows could not be located; SKUs and barcodes were paired in page order."
+        ))
+
+    return SheetRecords(build_sheet(parsed, colour, skus, barcodes), issues, parsed)
+
+
+def extract_records(
+    file, cache=None, fresh: bool = False, colour: str | None = None, pool=None, history=None
+) -> SheetRecords:
+    """
+    PDF (bytes holder / upload / PdfDocument) → SheetRecords; never raises on
+    bad PDFs. history (pepco_history.DatafileHistory) adds a warning for
+    barcodes already issued in an earlier DATAFILE.
+    """
+    doc = None
+    try:
+        doc = as_document(file)
+        if not doc.raw:
+            return SheetRecords(None, [Issue("error", "Empty PDF uploaded.")])
+
+        parsed = extract_document(doc, cache, fresh, pool)["parsed"]
+        if parsed is None:
+            return SheetRecords(None, [Issue("error", "PDF must have at least 1 page.")])
+
+        result = sheet_records(parsed, colour)
+        if history is not None and result.sheet:
+            result = result._replace(
+                issues=result.issues + history_issues(result.sheet, history, doc.sha256)
+            )
+        return result
+
+    except Exception as e:
+        return SheetRecords(None, [Issue("error", f"PDF error: {str(e)}")])
+    finally:
+        # Reader opened here → close it (a caller's PdfDocument stays theirs)
+        if doc is not None and doc is not file:
+            doc.close()
+
+
+# ================================================================
+#  TRANSLATION FORMATTER (AL, ES, MK, etc)
+# ================================================================
+def format_product_translations(
+    product_name,
+    translation_row,
+    selected_materials=None,
+    material_translations=None,
+    material_compositions=None
+):
+    """Builds multilingual product description with material info."""
+    return ProductTemplate(product_name, translation_row).render(
+        selected_materials, material_translations, material_compositions
+    )
+
+
+# ================================================================
+#  DATAFILE BUILDERS (shared by UI + batch CLI)
+# ================================================================
+CURRENCY_COLUMNS = ['EUR', 'BGN', 'BAM', 'RON', 'CZK', 'MKD', 'RSD', 'HUF']
+
+DATAFILE_COLUMNS = [
+    "Order_ID", "Style", "Colour", "Supplier_product_code",
+    "Item_classification", "Supplier_name", "today_date",
+    "Collection", "Colour_SKU", "Style_Merch_Season",
+    "Batch", "barcode", "washing_code", "EUR", "BGN",
+    "BAM", "PLN", "RON", "CZK", "MKD", "RSD", "HUF",
+    "product_name", "Dept", "Item_name_English", "Season"
+]
+
+
+# ---------- Cotton flag (single 100% cotton row) ----------
+def cotton_flag(valid_rows):
+    """Returns "Y" when composition is exactly 100% Cotton."""
+    if len(valid_rows) != 1:
+        return ""
+
+    mat0 = (valid_rows[0]["mat"] or "").strip().lower()
+    try:
+        pct0_int = int(valid_rows[0]["pct"])
+    except Exception:
+        pct0_int = 0
+
+    return "Y" if mat0 == "cotton" and pct0_int == 100 else ""
+
+
+# ---------- Material rows → AL / MK names + compositions ----------
+def translate_material_rows(valid_rows, material_table):
+    """Returns (names per lang, composition per lang) for AL and MK."""
+    material_trans_dict = {}
+    material_compositions = {}
+
+    if not valid_rows or material_table.empty:
+        return material_trans_dict, material_compositions
+
+    for lang in ['AL', 'MK']:
+        names = []
+        comp = []
+
+        for r in valid_rows:
+            tr = material_table.get(r['mat'], lang)
+            if tr is not None:
+                names.append(tr)
+                comp.append(f"{r['pct']}% {tr}")
+
+        if names:
+            material_trans_dict[lang] = ", ".join(names)
+        if comp:
+            material_compositions[lang] = ", ".join(comp)
+
+    return material_trans_dict, material_compositions
+
+
+# ---------- Selection-driven values (same on every SKU) ----------
+def _selection_values(product_template, valid_rows, material_table, washing_code_key):
+    """(cotton?, product_name, washing_code) for the chosen materials / product / washing."""
+    selected_materials = [r["mat"] for r in valid_rows]
+    with TRACER.span("translate.materials"):
+        material_trans_dict, material_compositions = translate_material_rows(
+            valid_rows, material_table
+        )
+
+    if product_template is not None:
+        with TRACER.span("translate.product"):
+            product_name = product_template.render(
+                selected_materials,
+                material_trans_dict,
+                material_compositions
+            )
+    else:
+        product_name = ""
+
+    return cotton_flag(valid_rows) == "Y", product_name, WASHING_CODES[washing_code_key]
+
+
+# ---------- Dept, Cotton, Collection, Product, Washing ----------
+@traced("enrich")
+def enrich_sheet(
+    sheet,
+    product_template,
+    valid_rows,
+    material_table,
+    washing_code_key
+):
+    """Adds UI-selection driven fields to the extracted sheet (once, not per SKU)."""
+    cotton, product_name, washing_code = _selection_values(
+        product_template, valid_rows, material_table, washing_code_key
+    )
+    item_class = sheet["Item_classification"]
+    sheet = sheet.with_fields(
+        Dept=get_dept_value(item_class),
+        Collection=modify_collection(sheet["Collection"], item_class),
+        product_name=product_name,
+        washing_code=washing_code,
+    )
+    return sheet.with_fields(Cotton="Y") if cotton else sheet.without("Cotton")
+
+
+# ---------- Currencies + final column layout ----------
+def _price_values(currency_values, pln_price) -> dict:
+    """{currency: formatted} for every DATAFILE price column."""
+    values = {cur: currency_values.get(cur, "") for cur in CURRENCY_COLUMNS}
+    values['PLN'] = format_number(pln_price, 'PLN')
+    return values
+
+
+def _final_columns(with_cotton: bool) -> list:
+    """DATAFILE column layout (+ Cotton when the sheet is 100% cotton)."""
+    final_cols = list(DATAFILE_COLUMNS)
+    if with_cotton and 'Cotton' not in final_cols:
+        final_cols.append("Cotton")
+    return final_cols
+
+
+def finalize_sheet(sheet, currency_values, pln_price):
+    """Fills price fields; returns (sheet, final column list)."""
+    sheet = sheet.with_fields(
+        **_price_values(currency_values, pln_price),
+        # Item name English (cleaned & CAPITAL)
+        Item_name_English=clean_item_name_english(sheet["Item_name_EN"]),
+    )
+    final_cols = _final_columns('Cotton' in sheet)
+
+    # Ensure all columns exist
+    missing = {col: "" for col in final_cols if col not in sheet}
+    return (sheet.with_fields(**missing) if missing else sheet), final_cols
+
+
+# ---------- CSV bytes (; separator, quoted, UTF-8 BOM) ----------
+@traced("export.csv")
+def build_datafile_csv(df, final_cols):
+    """Serialize rows (DataFrame or SheetModel) exactly as the PEPCO DATAFILE import expects."""
+    return datafile_csv_bytes(df, final_cols)
+
+
+# ---------- Custom CSV filename ----------
+def _datafile_filename(first_row, all_skus, max_len=None):
+    """
+    PEPCO_{season}_{skus}_DATAFILE_{supplier code}_00_{style}.csv
+    Over max_len: {first SKU}-{last SKU}_{n}SKU_{hash of the full name} as the SKU part.
+    """
+    season_val = first_row.get("Season", "UNKNOWN").upper()
+    sku_val = "_".join(all_skus) if all_skus else "UNKNOWN"
+
+    supplier_code = first_row.get("Supplier_product_code", "UNKNOWN")
+    style_val = first_row.get("Style", "UNKNOWN")
+
+    name = (
+        f"PEPCO_{season_val}_{sku_val}_DATAFILE_"
+        f"{supplier_code}_00_{style_val}.csv"
+    )
+    if max_len and len(name) > max_len and len(all_skus) > 1:
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+        sku_val = f"{all_skus[0]}-{all_skus[-1]}_{len(all_skus)}SKU_{digest}"
+        name = (
+            f"PEPCO_{season_val}_{sku_val}_DATAFILE_"
+            f"{supplier_code}_00_{style_val}.csv"
+        )
+    return name
+
+
+def build_sheet_filename(sheet, max_len=None):
+    """DATAFILE name for a SheetModel (SKUs straight from the SKU column); max_len: see DISK_FILENAME_MAX."""
+    return _datafile_filename(sheet, list(sheet.skus), max_len)
@@ -0,0 +1,143 @@
+# pepco_export.py
+# DATAFILE CSV writer (; separator, সব field quoted, UTF-8 BOM) — streaming
+#   - rows chunk করে column ধরে str করা হয়, তারপর পুরো chunk একবারে
+#     quote / join / encode হয়ে সরাসরি bytes stream-এ যায়
+#   - output csv.writer(delimiter=';', quoting=QUOTE_ALL) + 'utf-8-sig' এর সাথে byte-identical
+#   - অনেক DATAFILE একটা ZIP-এ, একটা একটা করে লেখা (পুরো ZIP memory-তে নয়)
+#   - DataFrame-এর জায়গায় pepco_sheet.SheetModel-ও চলে: chunk-এর column সরাসরি
+#     sheet থেকে (DataFrame বানানো হয় না)
+# ব্যবহার:
+#   data = datafile_csv_bytes(df, columns)          # df: DataFrame or SheetModel
+#   with open("out.csv", "wb") as fh: write_datafile_csv(df, columns, fh)
+#   with DatafileBundle("bundle.zip") as bundle:
+#       bundle.add("PEPCO_..._DATAFILE_....csv", df, columns)
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import shutil
+import zipfile
+
+from pepco_sheet import SheetModel
+
+__all__ = ["write_datafile_csv", "datafile_csv_bytes", "DatafileBundle"]
+
+BOM = "\ufeff".encode("utf-8")
+
+# Field / row separators used while a chunk is assembled; a chunk that
+# already contains either falls back to csv.writer for that chunk
+_FIELD_SEP = "\x00"
+_ROW_SEP = "\x01"
+
+
+def _column_strings(values):
+    """Cell values → str exactly as csv.writer would stringify them."""
+    if all(type(v) is str for v in values):
+        return values
+    out = []
+    for v in values:
+        if v is None:
+            out.append("")
+        elif isinstance(v, str):
+            out.append(v)
+        elif isinstance(v, float):
+            out.append(repr(v))
+        else:
+            out.append(str(v))
+    return out
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=';', quoting=csv.QUOTE_ALL).writerows(rows)
+    return buffer.getvalue()
+
+
+def _encode_chunk(columns) -> str:
+    """Column lists of one chunk → QUOTE_ALL ';' CSV text (\\r\\n rows)."""
+    rows = list(map(_FIELD_SEP.join, zip(*columns)))
+    block = _ROW_SEP.join(rows)
+
+    separators = len(rows) * (len(columns) - 1) + len(rows) - 1
+    if block.count(_FIELD_SEP) + block.count(_ROW_SEP) != separators:
+        return _csv_chunk(zip(*columns))
+
+    if '"' in block:
+        block = block.replace('"', '""')
+    block = block.replace(_FIELD_SEP, '";"').replace(_ROW_SEP, '"\r\n"')
+    return f'"{block}"\r\n'
+
+
+def write_datafile_csv(df, columns, fh, chunk_rows: int = 1024) -> int:
+    """Stream df[columns] (header + rows) into a binary file object; returns bytes written."""
+    written = fh.write(BOM) or 0
+    written += fh.write(_encode_chunk([[str(c)] for c in columns]).encode("utf-8")) or 0
+
+    if isinstance(df, SheetModel):
+        for start in range(0, len(df), chunk_rows):
+            stop = start + chunk_rows
+            cols = [_column_strings(df.column(c, start, stop)) for c in columns]
+            written += fh.write(_encode_chunk(cols).encode("utf-8")) or 0
+        return written
+
+    frame = df[columns] if list(df.columns) != list(columns) else df
+    for start in range(0, len(frame), chunk_rows):
+        part = frame.iloc[start:start + chunk_rows]
+        cols = [_column_strings(part.iloc[:, j].tolist()) for j in range(part.shape[1])]
+        written += fh.write(_encode_chunk(cols).encode("utf-8")) or 0
+    return written
+
+
+def datafile_csv_bytes(df, columns, chunk_rows: int = 1024) -> bytes:
+    """DATAFILE as bytes (for st.download_button)."""
+    buffer = io.BytesIO()
+    write_datafile_csv(df, columns, buffer, chunk_rows)
+    return buffer.getvalue()
+
+
+class DatafileBundle:
+    """ZIP of many DATAFILEs, each streamed in as it is added."""
+
+    def __init__(self, target, compression=zipfile.ZIP_DEFLATED) -> None:
+        self._zip = zipfile.ZipFile(target, mode="w", compression=compression)
+        self.names = []
+
+    def _unique(self, name) -> str:
+        base, ext = os.path.splitext(name)
+        candidate, n = name, 1
+        while candidate in self.names:
+            n += 1
+            candidate = f"{base}_{n}{ext}"
+        self.names.append(candidate)
+        return candidate
+
+    def add(self, name, df, columns) -> str:
+        """Write one DataFrame / SheetModel as a DATAFILE entry; returns the archive name."""
+        arcname = self._unique(name)
+        with self._zip.open(arcname, mode="w") as entry:
+            write_datafile_csv(df, columns, entry)
+        return arcname
+
+    def add_bytes(self, name, data: bytes) -> str:
+        """Add an already serialized DATAFILE."""
+        arcname = self._unique(name)
+        self._zip.writestr(arcname, data)
+        return arcname
+
+    def add_file(self, path, arcname=None) -> str:
+        """Copy an already written CSV into the bundle (chunked)."""
+        arcname = self._unique(arcname or os.path.basename(path))
+        with open(path, "rb") as src, self._zip.open(arcname, mode="w") as entry:
+            shutil.copyfileobj(src, entry, 1024 * 1024)
+        return arcname
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
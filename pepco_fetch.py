@@ -0,0 +1,122 @@
+# pepco_fetch.py
+# Reference sheets একসাথে (concurrently) download + parse
+#   - একটাই pooled requests.Session (keep-alive)
+#   - per-request timeout (connect, read) + bounded retry with backoff
+#   - parse (CSV → DataFrame/dict) worker thread-এ, Streamlit script thread-এ নয়
+#   - প্রতি sheet-এর fetch / parse সময় ফেরত দেয়
+# ব্যবহার:
+#   fetcher = ReferenceFetcher()
+#   results = fetcher.fetch_all({"prices": (url, {}), ...}, parsers={"prices": parse_fn})
+#   results["prices"].parsed, results["prices"].fetch_seconds
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+__all__ = ["FetchResult", "ReferenceFetcher"]
+
+
+class FetchResult(NamedTuple):
+    """Outcome of one sheet download (+ parse)."""
+    name: str
+    status: int | None          # 200 / 304, None on failure
+    body: bytes
+    headers: dict
+    parsed: object = None
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    error: str | None = None    # fetch or parse failure
+
+
+class ReferenceFetcher:
+    """Concurrent GETs over one pooled session with timeouts and retries."""
+
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 15,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_workers: int = 4,
+    ) -> None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_workers = max_workers
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url, headers=None):
+        """GET url → (status, body bytes, response headers); raises on HTTP error."""
+        resp = self.session.get(url, headers=headers or {}, timeout=self.timeout)
+        if resp.status_code not in (200, 304):
+            resp.raise_for_status()
+        return resp.status_code, resp.content, dict(resp.headers)
+
+    def _fetch_one(self, name, url, headers, parser) -> FetchResult:
+        start = time.perf_counter()
+        try:
+            status, body, resp_headers = self.fetch(url, headers)
+        except Exception as e:
+            return FetchResult(
+                name, None, b"", {},
+                fetch_seconds=time.perf_counter() - start,
+                error=f"{type(e).__name__}: {e}",
+            )
+        fetch_seconds = time.perf_counter() - start
+
+        parsed = None
+        parse_seconds = 0.0
+        error = None
+        if parser is not None and status == 200 and body:
+            start = time.perf_counter()
+            try:
+                parsed = parser(body)
+            except Exception as e:
+                error = f"parse failed: {type(e).__name__}: {e}"
+            parse_seconds = time.perf_counter() - start
+
+        return FetchResult(
+            name, status, body, resp_headers, parsed,
+            fetch_seconds, parse_seconds, error,
+        )
+
+    def fetch_all(self, jobs: dict, parsers: dict | None = None) -> dict:
+        """{name: (url, headers)} → {name: FetchResult}, all in parallel."""
+        parsers = parsers or {}
+        if not jobs:
+            return {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(jobs)),
+            thread_name_prefix="pepco-fetch",
+        ) as pool:
+            futures = {
+                name: pool.submit(self._fetch_one, name, url, headers, parsers.get(name))
+                for name, (url, headers) in jobs.items()
+            }
+            return {name: fut.result() for name, fut in futures.items()}
+
+    def close(self) -> None:
+        self.session.close()
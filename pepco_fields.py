@@ -0,0 +1,182 @@
+# pepco_fields.py
+# Declarative field-spec table for PEPCO data-sheet identifiers
+# সব pattern import-এর সময় একবার compile হয়; নতুন template field লাগলে
+# FIELD_SPECS-এ একটা FieldSpec যোগ করো (অথবা FIELD_EXTRACTOR.register(...)).
+# ব্যবহার:
+#   from pepco_fields import FIELD_EXTRACTOR
+#   fields = FIELD_EXTRACTOR.extract(pages_text)
+#   fields["merch_code"].group(1) if fields["merch_code"] else None
+#
+# Note: a single combined alternation over all labels was measured ~8x
+# slower than plain per-field re.search calls under CPython's `re` (470 vs
+# 60 µs/sheet in benchmarks/bench_fields.py), so each field keeps its own compiled
+# search; the shared work is per-page text preparation (one lowercased
+# copy serves every case-insensitive field) and lazy page access.
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+__all__ = ["FieldSpec", "FieldMatch", "FieldExtractor", "FIELD_SPECS", "FIELD_EXTRACTOR"]
+
+
+class FieldSpec(NamedTuple):
+    """One labelled field: label regex + value regex (+ fallbacks)."""
+    name: str
+    label: str                  # no capturing groups
+    value: str                  # groups 1.. are the field value(s)
+    page: int | None = 0        # page index, None → every page in order
+    flags: int = 0
+    fallbacks: tuple = ()       # ((label, value), ...) tried if not found
+
+
+class FieldMatch:
+    """Match-like result whose groups are sliced from the original text."""
+    __slots__ = ("_text", "_spans")
+
+    def __init__(self, text: str, m: re.Match) -> None:
+        self._text = text
+        self._spans = [m.span(i) for i in range((m.re.groups or 0) + 1)]
+
+    def group(self, index: int = 0):
+        start, end = self._spans[index]
+        return None if start < 0 else self._text[start:end]
+
+    def start(self, index: int = 0) -> int:
+        return self._spans[index][0]
+
+    def end(self, index: int = 0) -> int:
+        return self._spans[index][1]
+
+
+def _lower_literals(src: str) -> str:
+    """Lowercase a regex source, leaving escapes (\\S, \\W, \\D...) intact."""
+    out = []
+    i = 0
+    while i < len(src):
+        ch = src[i]
+        if ch == "\\" and i + 1 < len(src):
+            out.append(src[i:i + 2])
+            i += 2
+            continue
+        out.append(ch.lower())
+        i += 1
+    return "".join(out)
+
+
+class _CompiledPattern:
+    __slots__ = ("regex", "folded", "fallback_regex")
+
+    def __init__(self, label: str, value: str, flags: int) -> None:
+        source = label + value
+        # IGNORECASE disables sre's literal-prefix fast search; searching a
+        # lowercased copy with a lowercased pattern keeps it (same spans).
+        self.folded = bool(flags & re.IGNORECASE)
+        if self.folded:
+            self.regex = re.compile(_lower_literals(source), flags & ~re.IGNORECASE)
+            self.fallback_regex = re.compile(source, flags)
+        else:
+            self.regex = re.compile(source, flags)
+            self.fallback_regex = None
+
+
+class FieldExtractor:
+    """Resolve every registered field from page texts (list or lazy reader)."""
+
+    def __init__(self, specs=()) -> None:
+        self._specs: dict[str, FieldSpec] = {}
+        self._compiled: dict[str, list[_CompiledPattern]] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: FieldSpec) -> None:
+        """Add (or replace) a field; compiled immediately."""
+        chain = [(spec.label, spec.value)] + list(spec.fallbacks)
+        self._specs[spec.name] = spec
+        self._compiled[spec.name] = [
+            _CompiledPattern(label, value, spec.flags) for label, value in chain
+        ]
+
+    @property
+    def names(self):
+        return list(self._specs)
+
+    def extract(self, pages, names=None) -> dict:
+        """{field name: FieldMatch or None}; only requested pages are read."""
+        page_count = None
+        folded_pages: dict[int, str | None] = {}
+
+        def _folded(i, text):
+            if i not in folded_pages:
+                low = text.lower()
+                # lower() may change length for rare non-ASCII chars
+                folded_pages[i] = low if len(low) == len(text) else None
+            return folded_pages[i]
+
+        results = {}
+        for name in (names or self._specs):
+            spec = self._specs[name]
+
+            if spec.page is None:
+                if page_count is None:
+                    page_count = len(pages)
+                indices = range(page_count)
+            else:
+                indices = (spec.page,)
+
+            found = None
+            for pattern in self._compiled[name]:
+                for i in indices:
+                    try:
+                        text = pages[i]
+                    except IndexError:
+                        continue
+
+                    if pattern.folded:
+                        low = _folded(i, text)
+                        m = (
+                            pattern.regex.search(low) if low is not None
+                            else pattern.fallback_regex.search(text)
+                        )
+                    else:
+                        m = pattern.regex.search(text)
+
+                    if m:
+                        found = FieldMatch(text, m)
+                        break
+                if found:
+                    break
+
+            results[name] = found
+        return results
+
+
+# ================================================================
+#  PEPCO FIELD TABLE
+# ================================================================
+FIELD_SPECS = [
+    FieldSpec(
+        "item_name_en",
+        r"Item\s*name\s*English\s*[:\.]{1,}\s*", r"(.+)",
+        page=None, flags=re.IGNORECASE,
+        fallbacks=((r"Item\s*name\s*[:\.]{1,}\s*", r"(.+?)\n"),),
+    ),
+    FieldSpec("merch_code", r"Merch\s*code\s*\.{2,}\s*", r"([\w/]+)"),
+    FieldSpec("season", r"Season\s*\.{2,}\s*", r"(\w+)?\s*(\d{2})"),
+    # == \b\d{6}\b, but starting with \d lets sre skip to digits
+    FieldSpec("style_code", r"", r"\d(?<!\w\d)\d{5}\b"),
+    FieldSpec("collection", r"Collection\s*\.{2,}\s*", r"(.+)"),
+    FieldSpec("handover_date", r"Handover\s*date\s*\.{2,}\s*", r"(\d{2}/\d{2}/\d{4})"),
+    FieldSpec("order_id", r"Order\s*-\s*ID\s*\.{2,}\s*", r"(.+)"),
+    FieldSpec("item_class", r"Item classification\s*\.{2,}\s*", r"(.+)"),
+    FieldSpec("supplier_code", r"Supplier product code\s*\.{2,}\s*", r"(.+)"),
+    FieldSpec("supplier_name", r"Supplier name\s*\.{2,}\s*", r"(.+)"),
+    # Prescan token (multi-upload Order-ID merge)
+    FieldSpec(
+        "order_id_token", r"Order\s*-\s*ID\s*\.{2,}\s*", r"([A-Z0-9_+-]+)",
+        flags=re.IGNORECASE,
+    ),
+]
+
+FIELD_EXTRACTOR = FieldExtractor(FIELD_SPECS)
@@ -0,0 +1,323 @@
+# pepco_history.py
+# Issued DATAFILE history — local SQLite index: কোন DATAFILE-এ কোন SKU / barcode ছিল
+#   - প্রতিটা download হওয়া DATAFILE: file name, Order-ID(s), Style, Season, supplier
+#     code, PDF / CSV sha256, সময় + প্রতি row-এ SKU আর barcode
+#   - index: Order_ID, SKU, barcode, Style, Season → লাখ row-এও lookup < 1 ms
+#   - লেখা হয় background writer thread-এ (queue): record() সাথে সাথে ফেরে, UI
+#     অপেক্ষা করে না; queue-তে জমে থাকা entry এক transaction-এ লেখা হয়
+#   - একই CSV (sha256) আবার download → একবারই থাকে
+#   - duplicates(barcodes): নতুন upload-এর কোন barcode আগের কোন DATAFILE-এ issue
+#     হয়েছে (একই PDF-এর আগের export বাদ দেওয়া যায়)
+# ব্যবহার:
+#   history = DatafileHistory(".pepco_cache/history.sqlite3")
+#   history.record(HistoryEntry.from_sheet(file_name, sheet, csv_bytes, pdf_sha256))
+#   history.lookup("barcode", "5901234123457")            # [HistoryHit, ...] newest first
+#   history.duplicates(sheet.barcodes, exclude_pdf=doc.sha256)   # {barcode: [HistoryHit]}
+#   history.flush(); history.close()
+
+from __future__ import annotations
+
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+__all__ = ["HistoryEntry", "HistoryHit", "DatafileHistory", "LOOKUP_FIELDS"]
+
+# Lookup field → (FROM / JOIN clause, WHERE column); every column is indexed
+_ITEMS = "datafile_items i JOIN datafiles d ON d.id = i.datafile_id"
+_ORDERS = "datafile_orders o JOIN datafiles d ON d.id = o.datafile_id"
+_LOOKUPS = {
+    "barcode": (_ITEMS, "i.barcode"),
+    "sku": (_ITEMS, "i.sku"),
+    "order_id": (_ORDERS, "o.order_id"),
+    "style": ("datafiles d", "d.style"),
+    "season": ("datafiles d", "d.season"),
+}
+LOOKUP_FIELDS = tuple(_LOOKUPS)
+
+_HIT_COLUMNS = "d.file_name, d.order_id, d.style, d.season, d.supplier_code, d.created_at"
+
+# SQLite host-parameter limit is 999 on old builds
+_IN_CHUNK = 500
+
+_STOP = object()
+
+
+class HistoryEntry(NamedTuple):
+    """One issued DATAFILE: document-level values + its SKU / barcode rows."""
+    file_name: str
+    order_ids: tuple
+    style: str | None
+    season: str | None
+    supplier_code: str | None
+    pdf_sha256: str | None
+    csv_sha256: str
+    created_at: float
+    skus: tuple
+    barcodes: tuple
+
+    @classmethod
+    def from_sheet(cls, file_name, sheet, csv_bytes: bytes, pdf_sha256=None) -> HistoryEntry:
+        """Entry for a pepco_sheet.SheetModel exported as csv_bytes."""
+        return cls(
+            file_name,
+            _split_orders(sheet.get("Order_ID")),
+            _text(sheet.get("Style")),
+            _text(sheet.get("Season")),
+            _text(sheet.get("Supplier_product_code")),
+            pdf_sha256,
+            hashlib.sha256(csv_bytes).hexdigest(),
+            time.time(),
+            tuple(str(s) for s in sheet.skus),
+            tuple(str(b) for b in sheet.barcodes),
+        )
+
+    @classmethod
+    def from_frame(cls, file_name, df, csv_bytes: bytes, pdf_sha256=None) -> HistoryEntry:
+        """Entry for an exported DATAFILE frame (e.g. after the editor)."""
+        first = df.iloc[0] if len(df) else {}
+        skus = tuple(re.sub(r".*SKU\s*", "", str(v)) for v in df["Colour_SKU"])
+        return cls(
+            file_name,
+            _split_orders(first.get("Order_ID")),
+            _text(first.get("Style")),
+            _text(first.get("Season")),
+            _text(first.get("Supplier_product_code")),
+            pdf_sha256,
+            hashlib.sha256(csv_bytes).hexdigest(),
+            time.time(),
+            skus,
+            tuple(str(b) for b in df["barcode"]),
+        )
+
+
+class HistoryHit(NamedTuple):
+    """A matching DATAFILE (sku / barcode None for document-level lookups)."""
+    file_name: str
+    order_id: str | None
+    style: str | None
+    season: str | None
+    supplier_code: str | None
+    created_at: float
+    sku: str | None = None
+    barcode: str | None = None
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+def _split_orders(value) -> tuple:
+    """'400111+400112' (merged sheets) → ('400111', '400112')."""
+    if value is None:
+        return ()
+    return tuple(part.strip() for part in str(value).split("+") if part.strip())
+
+
+# ================================================================
+#  SQLITE INDEX + BACKGROUND WRITER
+# ================================================================
+class DatafileHistory:
+    """Issued DATAFILEs in a local SQLite file; writes queued to one writer thread."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS datafiles (
+            id            INTEGER PRIMARY KEY,
+            file_name     TEXT NOT NULL,
+            order_id      TEXT,
+            style         TEXT,
+            season        TEXT,
+            supplier_code TEXT,
+            pdf_sha256    TEXT,
+            csv_sha256    TEXT NOT NULL UNIQUE,
+            rows          INTEGER NOT NULL,
+            created_at    REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS datafile_orders (
+            datafile_id INTEGER NOT NULL REFERENCES datafiles(id),
+            order_id    TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS datafile_items (
+            datafile_id INTEGER NOT NULL REFERENCES datafiles(id),
+            sku         TEXT NOT NULL,
+            barcode     TEXT NOT NULL
+        );
+        -- (value, created_at): newest-first LIMIT reads the index, no sort
+        CREATE INDEX IF NOT EXISTS idx_datafiles_style ON datafiles(style, created_at);
+        CREATE INDEX IF NOT EXISTS idx_datafiles_season ON datafiles(season, created_at);
+        CREATE INDEX IF NOT EXISTS idx_orders_order_id ON datafile_orders(order_id);
+        CREATE INDEX IF NOT EXISTS idx_items_barcode ON datafile_items(barcode);
+        CREATE INDEX IF NOT EXISTS idx_items_sku ON datafile_items(sku);
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(self._SCHEMA)
+
+        # One shared read connection (lookups are sub-ms → a lock is enough)
+        self._read = self._connect(check_same_thread=False)
+        self._read_lock = threading.Lock()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.written = 0
+        self.errors = 0
+        self.last_error = None
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, timeout=10, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ---------- Write (non-blocking) ----------
+    def record(self, entry: HistoryEntry) -> None:
+        """Queue one issued DATAFILE; returns at once (writer thread started on demand)."""
+        self._ensure_writer()
+        self._queue.put(entry)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until everything queued so far is written."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 10) -> None:
+        """Write what is queued, stop the writer, close the read connection."""
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        with self._read_lock:
+            self._read.close()
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pepco-history-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Everything already queued goes into the same transaction
+                while len(batch) < 1000:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                entries = [item for item in batch if isinstance(item, HistoryEntry)]
+                if entries:
+                    try:
+                        self._write(conn, entries)
+                        self.written += len(entries)
+                    except sqlite3.Error as e:
+                        self.errors += len(entries)
+                        self.last_error = f"{type(e).__name__}: {e}"
+
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                if any(item is _STOP for item in batch):
+                    return
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _write(conn, entries) -> None:
+        with conn:
+            for e in entries:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO datafiles "
+                    "(file_name, order_id, style, season, supplier_code, pdf_sha256, csv_sha256, rows, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        e.file_name, "+".join(e.order_ids) or None, e.style, e.season,
+                        e.supplier_code, e.pdf_sha256, e.csv_sha256, len(e.barcodes), e.created_at,
+                    ),
+                )
+                if not cur.rowcount:
+                    continue        # same CSV downloaded again
+                datafile_id = cur.lastrowid
+                conn.executemany(
+                    "INSERT INTO datafile_orders (datafile_id, order_id) VALUES (?, ?)",
+                    [(datafile_id, order_id) for order_id in e.order_ids],
+                )
+                conn.executemany(
+                    "INSERT INTO datafile_items (datafile_id, sku, barcode) VALUES (?, ?, ?)",
+                    [(datafile_id, sku, barcode) for sku, barcode in zip(e.skus, e.barcodes)],
+                )
+
+    # ---------- Read ----------
+    def lookup(self, field: str, value: str, limit: int = 100) -> list:
+        """DATAFILEs where field (barcode / sku / order_id / style / season) == value, newest first."""
+        try:
+            source, column = _LOOKUPS[field]
+        except KeyError:
+            raise ValueError(f"unknown history field {field!r} (one of {', '.join(LOOKUP_FIELDS)})")
+
+        item_columns = ", i.sku, i.barcode" if source == _ITEMS else ""
+        sql = (
+            f"SELECT {_HIT_COLUMNS}{item_columns} FROM {source} "
+            f"WHERE {column} = ? ORDER BY d.created_at DESC LIMIT ?"
+        )
+        with self._read_lock:
+            rows = self._read.execute(sql, (str(value).strip(), int(limit))).fetchall()
+        return [HistoryHit(*row) for row in rows]
+
+    def duplicates(self, barcodes, exclude_pdf: str | None = None) -> dict:
+        """
+        {barcode: [HistoryHit, ...]} for barcodes already in an issued
+        DATAFILE; exclude_pdf skips earlier exports of the same PDF.
+        """
+        wanted = list(dict.fromkeys(str(b) for b in barcodes))
+        hits: dict = {}
+        for start in range(0, len(wanted), _IN_CHUNK):
+            chunk = wanted[start:start + _IN_CHUNK]
+            sql = (
+                f"SELECT {_HIT_COLUMNS}, i.sku, i.barcode FROM {_ITEMS} "
+                f"WHERE i.barcode IN ({', '.join('?' * len(chunk))})"
+            )
+            params = list(chunk)
+            if exclude_pdf:
+                sql += " AND (d.pdf_sha256 IS NULL OR d.pdf_sha256 != ?)"
+                params.append(exclude_pdf)
+            with self._read_lock:
+                rows = self._read.execute(sql + " ORDER BY d.created_at", params).fetchall()
+            for row in rows:
+                hit = HistoryHit(*row)
+                hits.setdefault(hit.barcode, []).append(hit)
+        return hits
+
+    def stats(self) -> dict:
+        """{"datafiles", "items", "queued", "written", "errors", "last_error"}"""
+        with self._read_lock:
+            datafiles = self._read.execute("SELECT COUNT(*) FROM datafiles").fetchone()[0]
+            items = self._read.execute("SELECT COUNT(*) FROM datafile_items").fetchone()[0]
+        return {
+            "datafiles": datafiles,
+            "items": items,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
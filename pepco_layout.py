@@ -0,0 +1,140 @@
+# pepco_layout.py
+# Data-sheet layout fingerprint — page count + page 1-এ দরকারি identifier label আছে কিনা
+#   - label = pepco_fields-এর page-1 field label ("Merch code ......", "Order - ID ......"
+#     ...), field extractor যেভাবে খোঁজে ঠিক সেভাবেই; label-এর ক্রম, title, Style
+#     (শুধু একটা 6-digit সংখ্যা) বা Item name (পুরো document-এ খোঁজা হয়) fingerprint-এ নেই
+#   - সব label আছে + 6 / 5 page → LayoutSpec: কোন page-এ colour table, কোন page-এ
+#     size/SKU table — বাকি page (purchase / packing / sales) extract-ই হয় না; size page-এ
+#     SKU না পেলে generic path
+#   - অচেনা fingerprint → generic path (সব page), logger "pepco.layout"-এ একবার warning
+#     আর LAYOUT_STATS-এ গোনা হয় (Debug panel-এ fast-path hit rate)
+#   - page number গুলো পুরনো 6-page / নতুন 5-page layout-এর বিবরণ থেকে; tree-তে কোনো
+#     আসল supplier PDF নেই, তাই production-এ hit rate Debug panel দেখে যাচাই করতে হবে
+# ব্যবহার:
+#   from pepco_layout import identify_layout, LAYOUT_STATS
+#   fingerprint, layout = identify_layout(doc)       # layout None → generic
+#   LAYOUT_STATS.record(layout.name if layout else None, fingerprint.key)
+#   LAYOUT_STATS.snapshot()                          # {"hits": {...}, "unknown": {...}}
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from collections import Counter
+from typing import NamedTuple
+
+from pepco_fields import FIELD_SPECS
+
+__all__ = [
+    "Fingerprint",
+    "LayoutSpec",
+    "LayoutStats",
+    "KNOWN_LAYOUTS",
+    "LAYOUT_STATS",
+    "REQUIRED_FIELDS",
+    "fingerprint_page",
+    "identify_layout",
+]
+
+_LOG = logging.getLogger("pepco.layout")
+
+# Page-1 identifiers every known layout carries; matched with the field
+# table's own label patterns, anywhere on the page and in any order
+REQUIRED_FIELDS = (
+    "merch_code",
+    "season",
+    "collection",
+    "handover_date",
+    "order_id",
+    "item_class",
+    "supplier_code",
+    "supplier_name",
+)
+
+_SPECS = {spec.name: spec for spec in FIELD_SPECS}
+_LABELS = tuple(
+    (name, re.compile(_SPECS[name].label, _SPECS[name].flags)) for name in REQUIRED_FIELDS
+)
+
+
+class Fingerprint(NamedTuple):
+    """Page count + the required page-1 labels that are missing."""
+    pages: int
+    missing: tuple
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    @property
+    def key(self) -> str:
+        return f"{self.pages}p|" + ("all labels" if self.complete else "missing " + "+".join(self.missing))
+
+
+class LayoutSpec(NamedTuple):
+    """Where a known layout keeps its tables (0-based page indexes)."""
+    name: str
+    pages: int
+    colour_pages: int           # colour table within pages [0, colour_pages)
+    sizes_page: int             # size / SKU / barcode table (may continue on the next pages)
+
+    @property
+    def pages_read(self) -> int:
+        """Leading pages the tuned parse extracts."""
+        return max(self.colour_pages, self.sizes_page + 1)
+
+
+KNOWN_LAYOUTS = (
+    # identifiers | colour table | size table | purchase | packing | sales
+    LayoutSpec("6-page", 6, colour_pages=2, sizes_page=2),
+    # identifiers + colour table | size table | purchase | packing | sales
+    LayoutSpec("5-page", 5, colour_pages=1, sizes_page=1),
+)
+
+_BY_PAGES = {spec.pages: spec for spec in KNOWN_LAYOUTS}
+
+
+def fingerprint_page(page_count: int, first_page: str) -> Fingerprint:
+    """Fingerprint from the page count and page-1 text (one label search per field)."""
+    missing = tuple(name for name, label in _LABELS if not label.search(first_page))
+    return Fingerprint(page_count, missing)
+
+
+def identify_layout(doc):
+    """(Fingerprint, LayoutSpec or None) — reads page 1 of a lazy document."""
+    page_count = len(doc)
+    fingerprint = fingerprint_page(page_count, doc[0] if page_count else "")
+    layout = _BY_PAGES.get(page_count) if fingerprint.complete else None
+    return fingerprint, layout
+
+
+class LayoutStats:
+    """Process-wide count of sheets per layout + unknown fingerprints."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = Counter()
+        self._unknown = Counter()
+
+    def record(self, name: str | None, key: str) -> None:
+        """name None → generic path (unknown or mismatching layout); first sighting is logged."""
+        with self._lock:
+            self._hits[name or "generic"] += 1
+            if name is None:
+                first = key not in self._unknown
+                self._unknown[key] += 1
+        if name is None and first:
+            _LOG.warning("generic extraction for data-sheet layout %s", key)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"hits": dict(self._hits), "unknown": dict(self._unknown)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hits.clear()
+            self._unknown.clear()
+
+
+LAYOUT_STATS = LayoutStats()
@@ -0,0 +1,77 @@
+# pepco_materials.py
+# Material translations sheet (Name, AL, MK, ...) → compact lookup table
+# Sheet version প্রতি একবার vectorized ভাবে build হয়:
+#   - (material, language) → translation (dict, first row wins)
+#   - materials list (sheet order, unique) UI dropdown-এর জন্য আগেই তৈরি
+# ব্যবহার:
+#   table = MaterialTable.from_frame(pd.read_csv(...))
+#   table.get("Cotton", "AL")              # 'Pambuk' or None
+#   table.materials                        # ('Cotton', 'Elastane', ...)
+
+from __future__ import annotations
+
+__all__ = ["MaterialTable", "MATERIAL_LANGUAGES"]
+
+MATERIAL_LANGUAGES = ("AL", "MK")
+
+
+class MaterialTable:
+    """Immutable (material, language) → translation index."""
+
+    def __init__(self, translations: dict) -> None:
+        self._index = dict(translations)
+        self.materials = tuple(dict.fromkeys(m for m, _ in self._index))
+        self.languages = tuple(dict.fromkeys(lang for _, lang in self._index))
+
+    @classmethod
+    def from_frame(cls, df, languages=MATERIAL_LANGUAGES) -> "MaterialTable":
+        """Wide sheet → table. Name column (else first column) is the material."""
+        if df.empty:
+            raise ValueError("Empty sheet")
+
+        first = df.iloc[:, 0]
+        names = df['Name'].where(df['Name'].notna(), first) if 'Name' in df.columns else first
+        keep = names.notna() & names.astype(bool)
+        names = names[keep]
+
+        if names.empty:
+            raise ValueError("No material rows produced")
+
+        # Column-wise: one list per language, then a single zip (no iterrows)
+        columns = [
+            df.loc[keep, lang].astype(object).fillna("").tolist()
+            if lang in df.columns else [""] * len(names)
+            for lang in languages
+        ]
+        index = {}
+        for name, *translations in zip(names.tolist(), *columns):
+            for lang, tr in zip(languages, translations):
+                index.setdefault((name, lang), tr)  # first row wins
+
+        return cls(index)
+
+    @classmethod
+    def from_records(cls, records) -> "MaterialTable":
+        """[{'material', 'language', 'translation'}, ...] → table."""
+        index = {}
+        for rec in records:
+            index.setdefault((rec['material'], rec['language']), rec['translation'])
+        return cls(index)
+
+    def __len__(self) -> int:
+        return len(self.materials)
+
+    @property
+    def empty(self) -> bool:
+        return not self._index
+
+    def get(self, material, language, default=None):
+        """Translation of one material, or default when not on the sheet."""
+        return self._index.get((material, language), default)
+
+    def records(self):
+        """Long format rows (material, language, translation)."""
+        return [
+            {'material': m, 'language': lang, 'translation': tr}
+            for (m, lang), tr in self._index.items()
+        ]
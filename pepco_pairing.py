@@ -0,0 +1,196 @@
+# pepco_pairing.py
+# Size/SKU table → (SKU, barcode) pair — একই table row-এর SKU আর barcode জোড়া হয়
+#   - PyMuPDF text-এর প্রতিটা line = page-এর একটা visual row → প্রতি line-এ একটা
+#     regex (8-digit SKU / 13-digit barcode), row-এর ভেতরেই জোড়া
+#   - cell আলাদা block-এ থাকলে (কোনো line-এ SKU আর barcode একসাথে নেই) শুধু সেই
+#     page-এর word box (x0, y0, x1, y1, word, ...) y অনুযায়ী row-এ ভাগ করে জোড়া হয়
+#   - "barcode: ..." reference (carton label) কখনো item না
+#   - জোড়া না পাওয়া SKU / barcode আলাদা করে ফেরত আসে (truncate হয় না)
+# ব্যবহার:
+#   from pepco_pairing import pair_sku_barcodes
+#   result = pair_sku_barcodes(pages_text, page_words=doc.page_words)
+#   result.skus, result.barcodes                    # same length, row by row
+#   result.unmatched_skus, result.unmatched_barcodes
+
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+__all__ = ["Pairing", "pair_sku_barcodes", "pair_by_order"]
+
+# Whole 8-digit SKUs / 13-digit barcodes; same matches as \b\d{8}\b and
+# \b\d{13}\b, ~40% faster (no \b test at every position)
+_TOKEN = re.compile(r"(?<!\w)[0-9]{8}(?:[0-9]{5})?(?!\w)")
+# Carton / reference barcodes ("Carton label barcode: 59...") — never items
+_REFERENCE = re.compile(r"barcode:\s*(\d{13})")
+
+
+class Pairing(NamedTuple):
+    """Row-paired SKUs / barcodes + what could not be paired."""
+    skus: list
+    barcodes: list
+    unmatched_skus: list
+    unmatched_barcodes: list
+    method: str             # rows / boxes / order / none
+
+
+# ---------- Row → pairs ----------
+def _pair_row(row, out):
+    """
+    row: SKU / barcode values in x order.
+    Equal counts → by x order (SKU | Barcode or Barcode | SKU, wrapped
+    columns too); otherwise each SKU takes the nearest free barcode.
+    """
+    pairs, unmatched_skus, unmatched_barcodes, stray = out
+    skus = [(x, v) for x, v in enumerate(row) if len(v) == 8]
+    barcodes = [(x, v) for x, v in enumerate(row) if len(v) == 13]
+    if not skus:
+        # Table row without SKU, or a barcode outside the table (decided per page)
+        stray.extend(row)
+        return
+    if len(skus) == len(barcodes):
+        pairs.extend((s, b) for (_, s), (_, b) in zip(skus, barcodes))
+        return
+
+    for x, sku in skus:
+        if not barcodes:
+            unmatched_skus.append(sku)
+            continue
+        best = min(range(len(barcodes)), key=lambda i: abs(barcodes[i][0] - x))
+        pairs.append((sku, barcodes.pop(best)[1]))
+    unmatched_barcodes.extend(b for _, b in barcodes)
+
+
+def _pair_rows(rows, out):
+    pairs = out[0]
+    for row in rows:
+        if len(row) == 2:
+            a, b = row
+            if len(a) == 8 and len(b) == 13:
+                pairs.append((a, b))
+                continue
+            if len(a) == 13 and len(b) == 8:
+                pairs.append((b, a))
+                continue
+        _pair_row(row, out)
+
+
+# ---------- Text lines ----------
+def _line_rows(text, excluded):
+    """SKU / barcode values of every text line that has any, minus references."""
+    rows = []
+    for line in text.split("\n"):
+        row = _TOKEN.findall(line)
+        if row:
+            if excluded:
+                row = [v for v in row if v not in excluded]
+            rows.append(row)
+    return rows
+
+
+# ---------- Word boxes (split-cell tables) ----------
+def _box_rows(words, excluded):
+    """
+    (rows, rank): rows = SKU / barcode words whose vertical centres overlap,
+    in x order; rank = word order on the page (keeps records in reading order).
+    """
+    tokens = []
+    rank = {}
+    for i, w in enumerate(words):
+        text = w[4]
+        if len(text) in (8, 13) and text.isdigit() and text not in excluded:
+            tokens.append(((w[1] + w[3]) / 2, w[3] - w[1], w[0], text))
+            rank.setdefault(text, i)
+    tokens.sort()
+
+    rows = []
+    row_y = None
+    for yc, height, x, text in tokens:
+        if row_y is None or abs(yc - row_y) > height / 2:
+            rows.append([])
+            row_y = yc
+        rows[-1].append((x, text))
+    return [[text for _, text in sorted(row)] for row in rows], rank
+
+
+def _references(pages_text):
+    excluded = set()
+    for text in pages_text:
+        if "barcode:" in text:
+            excluded.update(_REFERENCE.findall(text))
+    return excluded
+
+
+def pair_by_order(pages_text, excluded=None) -> Pairing:
+    """Old behaviour: all SKUs / barcodes in page order, zipped."""
+    if excluded is None:
+        excluded = _references(pages_text)
+    skus = []
+    barcodes = []
+    for text in pages_text:
+        for value in _TOKEN.findall(text):
+            if value not in excluded:
+                (skus if len(value) == 8 else barcodes).append(value)
+    skus = list(dict.fromkeys(skus))
+    barcodes = list(dict.fromkeys(barcodes))
+    n = min(len(skus), len(barcodes))
+    return Pairing(skus[:n], barcodes[:n], skus[n:], barcodes[n:], "order" if n else "none")
+
+
+def pair_sku_barcodes(pages_text, page_words=None) -> Pairing:
+    """
+    Pair every SKU with the barcode in its table row.
+    A page with SKUs and barcodes but no line holding both has its cells
+    as separate text blocks: page_words(i) → PyMuPDF words of that page
+    are used there. Without it such pages fall back to page-order pairing
+    (Pairing.method == "order").
+    """
+    pages_text = list(pages_text)
+    excluded = _references(pages_text)
+    pairs, unmatched_skus, unmatched_barcodes = out = ([], [], [])
+    method = "rows"
+
+    for i, text in enumerate(pages_text):
+        rows = _line_rows(text, excluded)
+        if not rows:
+            continue
+        page = ([], [], [], [])
+        _pair_rows(rows, page)
+
+        if not page[0] and page[1] and page[3]:
+            # SKUs and barcodes, never on one line → split cells
+            if page_words is None:
+                fallback = pair_by_order([text], excluded)
+                page = (list(zip(fallback.skus, fallback.barcodes)),
+                        fallback.unmatched_skus, fallback.unmatched_barcodes, [])
+                method = "order"
+            else:
+                rows, rank = _box_rows(page_words(i), excluded)
+                page = ([], [], [], [])
+                _pair_rows(rows, page)
+                page[0].sort(key=lambda pair: rank[pair[0]])
+                method = "boxes"
+
+        for total, part in zip(out, page):
+            total.extend(part)
+        if page[0]:
+            # Barcode-only rows next to paired rows are table rows missing their SKU
+            unmatched_barcodes.extend(page[3])
+
+    # Same SKU listed twice (repeated table) → first row wins
+    seen = {}
+    for sku, barcode in pairs:
+        if sku not in seen:
+            seen[sku] = barcode
+        elif seen[sku] != barcode:
+            unmatched_barcodes.append(barcode)
+    paired_barcodes = set(seen.values())
+
+    return Pairing(
+        list(seen),
+        list(seen.values()),
+        [s for s in dict.fromkeys(unmatched_skus) if s not in seen],
+        [b for b in dict.fromkeys(unmatched_barcodes) if b not in paired_barcodes],
+        method if seen else "none",
+    )
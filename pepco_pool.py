@@ -0,0 +1,272 @@
+# pepco_pool.py
+# PEPCO PDF extraction — আলাদা, persistent worker process-এ (Streamlit server process-এ নয়)
+#   - worker-এ শুধু PDF → {"pages_text", "parsed", "layout"} (UI / widget কিছু নয়)
+#   - প্রতি file-এ wall-clock timeout: সময় পেরোলে শুধু সেই worker kill, পরের job-এ নতুন worker
+#   - প্রতি worker-এ memory ceiling (RLIMIT_AS, worker-এর নিজের baseline-এর উপরে) —
+#     বিশাল PDF server-এর memory খায় না
+#   - N job পরে worker নিজে থেকে বন্ধ হয়ে নতুন worker আসে (fragmentation / leak জমে না)
+#   - result JSON bytes হয়ে ফেরে (extraction cache-এর একই format)
+#   - parent thread শুধু pipe-এ অপেক্ষা করে (GIL ছাড়া) → বাকি session-এর rerun আটকায় না
+# ব্যবহার:
+#   pool = SheetPool(max_workers=4)
+#   extracted = pool.extract(raw, name)             # SheetPoolError: timeout / memory / crash
+#   for key, extracted, error, seconds in pool.extract_many([(key, raw, name), ...]):
+#       ...
+#   pool.extract_many(items, task="order_id")       # page-1 Order-ID prescan only
+#
+# Env: PEPCO_SHEET_TIMEOUT (60 s), PEPCO_SHEET_MEMORY_MB (1024 per file, 0 = no cap),
+#      PEPCO_SHEET_MAX_JOBS (50 jobs per worker, 0 = never restart)
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+__all__ = ["SheetPool", "SheetPoolError", "extract_sheet", "prescan_order_id", "TASKS"]
+
+
+class SheetPoolError(Exception):
+    """A sheet could not be extracted in a worker (timeout, memory cap, crash, parse error)."""
+
+
+def extract_sheet(raw: bytes, name: str | None = None):
+    """Worker: raw PDF bytes → (parse_pdf_document result, seconds)."""
+    # pepco_core, not app → the worker never boots Streamlit / pandas
+    import pepco_core
+    from pepco_reader import PdfDocument
+
+    start = time.perf_counter()
+    with PdfDocument(raw, name=name) as doc:
+        extracted = pepco_core.parse_pdf_document(doc)
+    return extracted, time.perf_counter() - start
+
+
+def prescan_order_id(raw: bytes, name: str | None = None):
+    """Worker: raw PDF bytes → (Order-ID token from page 1 or None, seconds)."""
+    import pepco_core
+    from pepco_reader import PdfDocument
+
+    start = time.perf_counter()
+    with PdfDocument(raw, name=name) as doc:
+        order_id = pepco_core.extract_order_id_only(doc)
+    return order_id, time.perf_counter() - start
+
+
+# Job kinds a worker runs: task name → function(raw, name) -> (result, seconds)
+TASKS = {"extract": extract_sheet, "order_id": prescan_order_id}
+
+
+# ---------- Worker process ----------
+def _address_space() -> int | None:
+    """Current virtual size of this process in bytes (Linux), else None."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _limit_memory(memory_mb: int) -> None:
+    """
+    Address-space ceiling: memory_mb on top of what the warmed-up worker
+    already maps (the spawned child re-imports the server's main module,
+    e.g. Streamlit). POSIX only; no-op elsewhere.
+    """
+    if not memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = (_address_space() or 0) + memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _worker_main(conn, memory_mb: int, max_jobs: int) -> None:
+    # Parser + PyMuPDF loaded before the cap → it only bounds per-file work
+    import fitz  # noqa: F401  (PyMuPDF)
+    import pepco_core  # noqa: F401
+
+    _limit_memory(memory_mb)
+    memory_error = f"memory limit ({memory_mb} MB) exceeded"
+    jobs = 0
+    while not max_jobs or jobs < max_jobs:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        except MemoryError:
+            # PDF bytes alone do not fit under the cap
+            conn.send(("error", memory_error, 0.0))
+            return
+        if job is None:
+            return
+        jobs += 1
+        task, raw, name = job
+        start = time.perf_counter()
+        try:
+            extracted, seconds = TASKS[task](raw, name)
+            payload = json.dumps(extracted, ensure_ascii=False).encode("utf-8")
+            conn.send(("ok", payload, seconds))
+        except MemoryError:
+            # Heap may be in any state after hitting the cap → report and exit
+            conn.send(("error", memory_error, time.perf_counter() - start))
+            return
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}", time.perf_counter() - start))
+
+
+class _Worker:
+    """One worker process + its pipe; used by one job at a time."""
+
+    def __init__(self, ctx, memory_mb: int, max_jobs: int) -> None:
+        self.max_jobs = max_jobs
+        self.jobs = 0
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child, memory_mb, max_jobs), daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    @property
+    def usable(self) -> bool:
+        """Alive and below its job limit (a worker at the limit exits by itself)."""
+        return self.process.is_alive() and (not self.max_jobs or self.jobs < self.max_jobs)
+
+    def run(self, raw: bytes, name: str, timeout: float, task: str = "extract"):
+        """(payload | None, error | None, seconds); kills the process on timeout."""
+        start = time.perf_counter()
+        self.jobs += 1
+        try:
+            self.conn.send((task, raw, name))
+        except OSError:
+            pass        # worker gave up mid-transfer → its reply (if any) is read below
+        try:
+            if not self.conn.poll(timeout):
+                self.kill()
+                return None, f"timed out after {timeout:g}s (worker killed)", time.perf_counter() - start
+            status, value, seconds = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            return None, f"worker crashed (exit code {self.process.exitcode})", time.perf_counter() - start
+        if status != "ok":
+            return None, value, seconds
+        return value, None, seconds
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Let the worker exit on its own; killed if it does not within a second."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+
+# ---------- Pool ----------
+class SheetPool:
+    """Persistent, sandboxed worker processes for per-sheet PDF extraction."""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+        memory_mb: int | None = None,
+        max_jobs: int | None = None,
+    ) -> None:
+        env = os.environ.get
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout if timeout is not None else float(env("PEPCO_SHEET_TIMEOUT", "60"))
+        self.memory_mb = memory_mb if memory_mb is not None else int(env("PEPCO_SHEET_MEMORY_MB", "1024"))
+        self.max_jobs = max_jobs if max_jobs is not None else int(env("PEPCO_SHEET_MAX_JOBS", "50"))
+
+        # spawn: the Streamlit server is multi-threaded, fork is not safe there
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._idle: list[_Worker] = []
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.usable:
+                    return worker
+                worker.stop()
+        try:
+            return _Worker(self._ctx, self.memory_mb, self.max_jobs)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _Worker) -> None:
+        if worker.usable:
+            with self._lock:
+                self._idle.append(worker)
+        else:
+            worker.stop()
+        self._slots.release()
+
+    def run(self, raw: bytes, name: str | None = None, task: str = "extract"):
+        """(extracted | None, error | None, seconds) for one PDF; task: see TASKS."""
+        from pepco_layout import LAYOUT_STATS
+
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            return None, f"worker start failed: {type(e).__name__}: {e}", 0.0
+        try:
+            payload, error, seconds = worker.run(raw, name or "", self.timeout, task)
+        finally:
+            self._release(worker)
+        if error:
+            return None, error, seconds
+
+        extracted = json.loads(payload)
+        if task == "extract" and extracted.get("layout"):
+            # Parsed in a worker → counted here for the Debug panel
+            LAYOUT_STATS.record(extracted["layout"]["name"], extracted["layout"]["fingerprint"])
+        return extracted, None, seconds
+
+    def extract(self, raw: bytes, name: str | None = None):
+        """parse_pdf_document result for one PDF, or SheetPoolError."""
+        extracted, error, _ = self.run(raw, name)
+        if error:
+            raise SheetPoolError(error)
+        return extracted
+
+    def extract_many(self, items, task: str = "extract"):
+        """
+        items: [(key, raw, name), ...]
+        Yields (key, extracted | None, error | None, seconds) as each finishes.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as threads:
+            futures = {threads.submit(self.run, raw, name, task): key for key, raw, name in items}
+            for fut in as_completed(futures):
+                extracted, error, seconds = fut.result()
+                yield futures[fut], extracted, error, seconds
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
@@ -0,0 +1,163 @@
+# pepco_prescan.py
+# Merged upload-এর Order-ID prescan — অনেক secondary sheet, rerun-এ প্রায় কোনো খরচ নেই
+#   - প্রতি PDF-এর শুধু page 1 পড়ে Order-ID token (extract_order_id_only), একসাথে
+#     sandboxed SheetPool-এ (pool না থাকলে thread pool-এ)
+#   - ফল PDF content (sha256) ধরে memoize → একই file-এর জন্য rerun / নতুন session-এ
+#     আবার পড়া হয় না; শুধু নতুন upload scan হয় (timeout / crash memoize হয় না)
+#   - একই file দুইবার upload → একবারই; একই Order-ID একাধিক file-এ (বা primary-র
+#     নিজের) → merge-এ একবারই; Order-ID নেই এমন file — সব report-এ থাকে
+# ব্যবহার:
+#   prescan = OrderIdPrescan(pool=SheetPool())
+#   report = prescan.scan(primary_doc, other_docs)
+#   report.extra_order_ids                  # "4501+4502" (primary-র Order_ID-এর পরে যোগ হয়)
+#   report.duplicate_files, report.repeated_ids, report.missing, report.errors
+#   prescan.stats()                         # {"items", "hits", "misses"}
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+from pepco_pool import prescan_order_id
+
+__all__ = ["PrescanReport", "OrderIdPrescan"]
+
+
+class PrescanReport(NamedTuple):
+    """Order-IDs to merge from the secondary sheets + what was left out and why."""
+    order_ids: tuple        # first-seen order; the primary's own Order-ID excluded
+    duplicate_files: tuple  # ((name, same file as name), ...) identical uploads skipped
+    repeated_ids: tuple     # ((order_id, (name, ...)), ...) merged once
+    missing: tuple          # names with no Order-ID on page 1
+    errors: tuple           # ((name, error), ...) timeout / crash in the worker
+    scanned: int            # files read on this call (0 → all from the memo)
+    seconds: float
+
+    @property
+    def extra_order_ids(self) -> str:
+        return "+".join(self.order_ids)
+
+
+def _name(doc, index: int) -> str:
+    return getattr(doc, "name", "") or f"sheet {index + 1}"
+
+
+class OrderIdPrescan:
+    """Page-1 Order-ID per PDF content hash, scanned in parallel and memoized."""
+
+    def __init__(self, pool=None, max_workers: int | None = None, max_items: int = 4096) -> None:
+        self.pool = pool
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_items = max_items
+        self._memo: OrderedDict[str, str | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- Memo ----------
+    def _lookup(self, key: str):
+        """(True, order_id) when memoized, else (False, None)."""
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return True, self._memo[key]
+            self.misses += 1
+            return False, None
+
+    def _store(self, key: str, order_id) -> None:
+        with self._lock:
+            self._memo[key] = order_id
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_items:
+                self._memo.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._memo), "hits": self.hits, "misses": self.misses}
+
+    # ---------- Scanning ----------
+    def _read_many(self, items):
+        """items: [(key, raw, name)] → yields (key, order_id | None, error | None)."""
+        if self.pool is not None:
+            for key, order_id, error, _ in self.pool.extract_many(items, task="order_id"):
+                yield key, order_id, error
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as threads:
+            futures = {threads.submit(prescan_order_id, raw, name): key for key, raw, name in items}
+            for fut in as_completed(futures):
+                try:
+                    order_id, _ = fut.result()
+                except Exception as e:
+                    yield futures[fut], None, f"{type(e).__name__}: {e}"
+                else:
+                    yield futures[fut], order_id, None
+
+    def read(self, docs) -> tuple:
+        """({sha256: order_id | None}, {sha256: error}, files read); memoized files are not read."""
+        found, errors, pending = {}, {}, {}
+        for i, doc in enumerate(docs):
+            if not doc.raw or doc.sha256 in found or doc.sha256 in pending:
+                continue
+            known, order_id = self._lookup(doc.sha256)
+            if known:
+                found[doc.sha256] = order_id
+            else:
+                pending[doc.sha256] = (doc.raw, _name(doc, i))
+
+        if pending:
+            items = [(key, raw, name) for key, (raw, name) in pending.items()]
+            for key, order_id, error in self._read_many(items):
+                if error:
+                    errors[key] = error
+                else:
+                    self._store(key, order_id)
+                    found[key] = order_id
+        return found, errors, len(pending)
+
+    def scan(self, primary, others) -> PrescanReport:
+        """Order-IDs of `others` to merge into `primary`'s DATAFILE (upload order kept)."""
+        start = time.perf_counter()
+        found, errors, scanned = self.read([primary, *others])
+
+        primary_name = _name(primary, 0)
+        files = {primary.sha256: primary_name} if primary.raw else {}
+        primary_id = found.get(primary.sha256)
+        owners = {primary_id: [primary_name]} if primary_id else {}
+
+        order_ids, duplicate_files, missing, failed = [], [], [], []
+        for i, doc in enumerate(others, 1):
+            name = _name(doc, i)
+            if not doc.raw:
+                missing.append(name)
+                continue
+            if doc.sha256 in files:
+                duplicate_files.append((name, files[doc.sha256]))
+                continue
+            files[doc.sha256] = name
+            if doc.sha256 in errors:
+                failed.append((name, errors[doc.sha256]))
+                continue
+            order_id = found.get(doc.sha256)
+            if not order_id:
+                missing.append(name)
+            elif order_id in owners:
+                owners[order_id].append(name)
+            else:
+                owners[order_id] = [name]
+                order_ids.append(order_id)
+
+        return PrescanReport(
+            tuple(order_ids),
+            tuple(duplicate_files),
+            tuple((oid, tuple(names)) for oid, names in owners.items() if len(names) > 1),
+            tuple(missing),
+            tuple(failed),
+            scanned,
+            time.perf_counter() - start,
+        )
@@ -0,0 +1,181 @@
+# pepco_prices.py
+# PLN price ladder → other currencies (EUR, BGN, BAM, RON, CZK, MKD, RSD, HUF)
+# Sheet version প্রতি একবার build হয়:
+#   - normalized PLN value → row index (hash lookup)
+#   - sorted PLN array → nearest / next-higher tier (bisect)
+#   - প্রতিটা row-এর currency string আগেই format করা থাকে
+# ব্যবহার:
+#   ladder = PriceLadder(price_data)          # {currency: [values]}
+#   ladder.lookup(29.99)                      # {'EUR': '7,49', ...} or None
+#   ladder.lookup(30, mode="next_higher")
+#   ladder.lookup_many([9.99, 29.99, 31])     # bulk jobs
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from bisect import bisect_left
+
+__all__ = ["PriceLadder", "PRICE_MATCH_MODES", "format_number"]
+
+PRICE_MATCH_MODES = ("exact", "nearest", "next_higher")
+
+
+# ---------- Format numbers (PLN, EUR, RON, etc) ----------
+def format_number(value, currency):
+    """Format numeric pricing based on currency."""
+    try:
+        if isinstance(value, str):
+            value = float(value.replace(',', '.'))
+
+        if currency in ['EUR', 'BGN', 'BAM', 'RON', 'PLN']:
+            formatted = f"{float(value):,.2f}".replace(".", ",")
+
+            if ',' in formatted:
+                parts = formatted.split(',')
+                parts[0] = parts[0].replace('.', '')  # remove thousand separator
+                formatted = ','.join(parts)
+
+            return formatted
+
+        return str(int(float(value)))
+
+    except (ValueError, TypeError):
+        return str(value)
+
+
+def _to_float(value):
+    """29.99 / '29,99' / 30 → float (None if not numeric, NaN or infinite)."""
+    try:
+        if isinstance(value, str):
+            value = value.replace(',', '.')
+        value = float(value)
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class PriceLadder:
+    """Immutable PLN ladder with preformatted currency rows."""
+
+    def __init__(self, price_data: dict) -> None:
+        if not price_data or 'PLN' not in price_data:
+            raise ValueError("Price data has no PLN column")
+
+        self.currencies = [c for c in price_data if c != 'PLN']
+        self.version = hashlib.sha256(
+            json.dumps(price_data, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+
+        pln = [_to_float(v) for v in price_data['PLN']]
+        self._pln = pln
+
+        # Row strings formatted once; a currency column shorter than the
+        # PLN column leaves that row unusable (as the old index lookup did)
+        self._rows = []
+        for idx in range(len(pln)):
+            if all(idx < len(price_data[c]) for c in self.currencies):
+                self._rows.append({
+                    c: format_number(price_data[c][idx], c) for c in self.currencies
+                })
+            else:
+                self._rows.append(None)
+
+        # First occurrence wins (same as list.index)
+        self._index = {}
+        for idx, value in enumerate(pln):
+            if value is not None and value not in self._index:
+                self._index[value] = idx
+
+        self._sorted_values = sorted(self._index)
+        self._sorted_rows = [self._index[v] for v in self._sorted_values]
+
+    def __len__(self) -> int:
+        return len(self._pln)
+
+    # ---------- Tier resolution ----------
+    def resolve(self, pln_value, mode: str = "exact"):
+        """Row index for a PLN value, or None (mode: exact / nearest / next_higher; NaN / inf → None)."""
+        if mode not in PRICE_MATCH_MODES:
+            raise ValueError(f"Unknown price match mode: {mode}")
+
+        value = _to_float(pln_value)
+        if value is None:
+            return None
+
+        idx = self._index.get(value)
+        if idx is not None or mode == "exact" or not self._sorted_values:
+            return idx
+
+        pos = bisect_left(self._sorted_values, value)
+
+        if mode == "next_higher":
+            return self._sorted_rows[pos] if pos < len(self._sorted_values) else None
+
+        # nearest (ties → lower tier)
+        if pos == 0:
+            return self._sorted_rows[0]
+        if pos == len(self._sorted_values):
+            return self._sorted_rows[-1]
+        below = self._sorted_values[pos - 1]
+        above = self._sorted_values[pos]
+        return self._sorted_rows[pos - 1 if value - below <= above - value else pos]
+
+    def pln_at(self, idx) -> float:
+        """PLN value of a ladder row."""
+        return self._pln[idx]
+
+    def row(self, idx):
+        """Preformatted {currency: str} for a row (copy), None if incomplete."""
+        row = self._rows[idx]
+        return dict(row) if row is not None else None
+
+    def lookup(self, pln_value, mode: str = "exact"):
+        """{currency: formatted str} for the matching tier, or None."""
+        idx = self.resolve(pln_value, mode)
+        return None if idx is None else self.row(idx)
+
+    # ---------- Bulk ----------
+    def resolve_many(self, pln_values, mode: str = "exact"):
+        """Vectorized resolve: list of row indices (None where unmatched)."""
+        import numpy as np
+
+        if mode not in PRICE_MATCH_MODES:
+            raise ValueError(f"Unknown price match mode: {mode}")
+
+        values = np.array([_to_float(v) for v in pln_values], dtype=float)
+        if not self._sorted_values:
+            return [None] * len(values)
+
+        ladder = np.asarray(self._sorted_values, dtype=float)
+        rows = np.asarray(self._sorted_rows)
+        n = len(ladder)
+
+        pos = np.searchsorted(ladder, values, side="left")
+        clipped = np.minimum(pos, n - 1)
+        exact = ladder[clipped] == values
+
+        if mode == "exact":
+            ok = exact
+            chosen = clipped
+        elif mode == "next_higher":
+            ok = pos < n
+            chosen = clipped
+        else:
+            lower = np.maximum(pos - 1, 0)
+            take_lower = (pos == n) | (
+                (pos > 0) & (values - ladder[lower] <= ladder[clipped] - values)
+            )
+            chosen = np.where(exact, clipped, np.where(take_lower, lower, clipped))
+            ok = np.ones(len(values), dtype=bool)
+
+        ok &= ~np.isnan(values)
+        return [int(rows[c]) if good else None for c, good in zip(chosen, ok)]
+
+    def lookup_many(self, pln_values, mode: str = "exact"):
+        """Vectorized lookup of many PLN prices (bulk / batch jobs)."""
+        return [
+            None if idx is None else self.row(idx)
+            for idx in self.resolve_many(pln_values, mode)
+        ]
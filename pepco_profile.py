@@ -0,0 +1,304 @@
+# pepco_profile.py
+# On-demand profiler capture of one slow sheet run + headless replay
+#   - capture: একটা process_pepco_pdf run cProfile-এর ভেতরে চলে; শেষে
+#     case folder-এ রাখা হয় — profile.prof, top.txt, PDF (sha256 সহ),
+#     UI selection, আর যে reference sheet version-এ run হয়েছিল তার CSV
+#   - replay: একই PDF + selection + reference দিয়ে Streamlit ছাড়াই pipeline
+#     আবার চালায় (extraction cache ছাড়া) আর সবচেয়ে গরম function গুলো দেখায়
+# Env: PEPCO_PROFILE=1 (প্রতি run profile, ধীরগুলো save), PEPCO_PROFILE_MIN_SECONDS=5,
+#      PEPCO_PROFILE_DIR=.pepco_cache/profiles, PEPCO_PROFILE_KEEP=20
+# ব্যবহার:
+#   python pepco_profile.py --list
+#   python pepco_profile.py .pepco_cache/profiles/20260314-101500_ab12cd34ef56
+#   python pepco_profile.py <case> --sort tottime --top 40 --save replay.prof
+#   python pepco_profile.py <case> --captured        # app-এ যা record হয়েছিল
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import hashlib
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+
+__all__ = ["ProfileStore", "ProfileRun", "top_functions", "replay_case", "main"]
+
+REFERENCE_SHEETS = ("prices", "translations", "materials")
+
+
+def top_functions(stats_source, limit: int = 25, sort: str = "cumulative") -> str:
+    """pstats table of the `limit` hottest functions (Profile or .prof path)."""
+    out = io.StringIO()
+    stats = pstats.Stats(stats_source, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+# ================================================================
+#  CAPTURE
+# ================================================================
+class ProfileRun:
+    """
+    cProfile around one run (context manager). Only one capture per
+    process at a time — a second concurrent one runs unprofiled
+    (`active` False) instead of mixing two sessions' calls.
+    """
+
+    _busy = threading.Lock()
+
+    def __init__(self) -> None:
+        self.profile = None
+        self.seconds = None
+        self.active = False
+
+    def __enter__(self) -> "ProfileRun":
+        if ProfileRun._busy.acquire(blocking=False):
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+                self.active = True
+            except ValueError:
+                # Another profiler (debugger / coverage) already hooked in
+                self.profile = None
+                ProfileRun._busy.release()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.seconds = time.perf_counter() - self._start
+        if self.active:
+            self.profile.disable()
+            ProfileRun._busy.release()
+        return False
+
+
+class ProfileStore:
+    """Folder of captured cases, newest `keep` kept."""
+
+    def __init__(self, root: str, keep: int = 20) -> None:
+        self.root = root
+        self.keep = keep
+
+    @classmethod
+    def from_env(cls) -> "ProfileStore":
+        return cls(
+            os.environ.get("PEPCO_PROFILE_DIR", os.path.join(".pepco_cache", "profiles")),
+            keep=int(os.environ.get("PEPCO_PROFILE_KEEP", "20")),
+        )
+
+    def save(self, run: ProfileRun, raw: bytes, name: str, selections: dict,
+             references: dict | None = None, output: tuple | None = None) -> str:
+        """
+        Write one case folder; returns its path.
+        references: {sheet: (sha256, csv bytes)} the run used.
+        output: (file name, csv bytes) the run produced, if any.
+        """
+        sha = hashlib.sha256(raw).hexdigest()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = path = os.path.join(self.root, f"{stamp}_{sha[:12]}")
+        n = 1
+        while os.path.exists(path):
+            n += 1
+            path = f"{base}_{n}"
+        os.makedirs(path)
+
+        with open(os.path.join(path, "sheet.pdf"), "wb") as fh:
+            fh.write(raw)
+
+        refs = {}
+        for sheet, (ref_sha, body) in (references or {}).items():
+            file_name = f"ref_{sheet}.csv"
+            with open(os.path.join(path, file_name), "wb") as fh:
+                fh.write(body)
+            refs[sheet] = {"sha256": ref_sha, "file": file_name}
+
+        if run.active:
+            run.profile.dump_stats(os.path.join(path, "profile.prof"))
+            with open(os.path.join(path, "top.txt"), "w", encoding="utf-8") as fh:
+                fh.write(top_functions(run.profile))
+
+        case = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "pdf": {"name": name, "sha256": sha, "bytes": len(raw), "file": "sheet.pdf"},
+            "seconds": round(run.seconds or 0.0, 4),
+            "profiler": "cProfile" if run.active else None,
+            "selections": selections,
+            "references": refs,
+            "output": {
+                "name": output[0],
+                "sha256": hashlib.sha256(output[1]).hexdigest(),
+            } if output else None,
+            "python": sys.version.split()[0],
+            "pid": os.getpid(),
+        }
+        with open(os.path.join(path, "case.json"), "w", encoding="utf-8") as fh:
+            json.dump(case, fh, indent=2, ensure_ascii=False)
+
+        self.prune()
+        return path
+
+    def cases(self):
+        """[(path, case dict)] newest first."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for entry in sorted(os.listdir(self.root), reverse=True):
+            path = os.path.join(self.root, entry)
+            try:
+                found.append((path, load_case(path)))
+            except (OSError, ValueError):
+                continue
+        return found
+
+    def prune(self) -> None:
+        for path, _case in self.cases()[self.keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_case(path: str) -> dict:
+    with open(os.path.join(path, "case.json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+# ================================================================
+#  REPLAY (headless, no extraction cache)
+# ================================================================
+def _reference_data(path, case):
+    import pepco_core as core
+    from pepco_catalog import ProductCatalog
+    from pepco_prices import PriceLadder
+
+    bodies = {}
+    for sheet in REFERENCE_SHEETS:
+        info = case["references"].get(sheet)
+        if info is None:
+            raise ValueError(f"case has no {sheet} reference sheet")
+        with open(os.path.join(path, info["file"]), "rb") as fh:
+            bodies[sheet] = fh.read()
+
+    return (
+        ProductCatalog(core.parse_translations_csv(bodies["translations"])),
+        core.parse_material_csv(bodies["materials"]),
+        PriceLadder(core.parse_price_csv(bodies["prices"])),
+    )
+
+
+def replay_case(path: str, profile=None):
+    """
+    Run the captured sheet through the same pipeline stages the UI ran
+    (parse → sheet → enrich → price → CSV); returns (file name, csv bytes).
+    Pass a cProfile.Profile to profile only the pipeline, not the setup.
+    """
+    import pepco_core as core
+    from pepco_reader import PdfDocument
+
+    case = load_case(path)
+    sel = case["selections"]
+    catalog, material_table, ladder = _reference_data(path, case)
+    with open(os.path.join(path, case["pdf"]["file"]), "rb") as fh:
+        raw = fh.read()
+
+    if profile is not None:
+        profile.enable()
+    try:
+        with PdfDocument(raw, name=case["pdf"]["name"]) as doc:
+            parsed = core.parse_pdf_document(doc)["parsed"]
+        if parsed is None:
+            raise ValueError("PDF has no pages")
+
+        colour = parsed["Colour"] or sel.get("manual_colour") or "UNKNOWN"
+        if not parsed["skus"]:
+            raise ValueError("SKU or Barcode missing")
+        sheet = core.build_sheet(parsed, colour, parsed["skus"], parsed["barcodes"])
+        if sel.get("extra_order_ids"):
+            sheet = sheet.with_fields(Order_ID=f"{sheet['Order_ID']}+{sel['extra_order_ids']}")
+
+        dept, product = sel["department"], sel["product"]
+        sheet = core.enrich_sheet(
+            sheet, catalog.template(dept, product), sel["materials"],
+            material_table, sel["washing_code"]
+        )
+
+        pln_price = float(str(sel["pln_price"]).replace(",", "."))
+        match = core.resolve_price_tier(pln_price, ladder, sel.get("price_mode", "exact"))
+        if not match.values:
+            raise ValueError("; ".join(issue.message for issue in match.issues))
+        sheet, final_cols = core.finalize_sheet(sheet, match.values, match.pln)
+        return core.build_sheet_filename(sheet), core.build_datafile_csv(sheet, final_cols)
+    finally:
+        if profile is not None:
+            profile.disable()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a captured slow sheet run and show its hot functions.")
+    parser.add_argument("case", nargs="?", help="case folder (default: newest capture)")
+    parser.add_argument("--list", action="store_true", help="list captured cases")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", default="cumulative", choices=("cumulative", "tottime", "ncalls"))
+    parser.add_argument("--save", help="write the replay profile (.prof) here")
+    parser.add_argument("--captured", action="store_true", help="show the profile recorded in the app instead")
+    parser.add_argument("--cold", action="store_true", help="no warm-up run (include import / first-call cost)")
+    args = parser.parse_args(argv)
+
+    store = ProfileStore.from_env()
+    if args.list:
+        for path, case in store.cases():
+            sel = case["selections"]
+            print(f"{os.path.basename(path):<34} {case['seconds']:>8.2f}s  "
+                  f"{case['pdf']['name'][:32]:<32} {sel.get('department')} / {sel.get('product')}")
+        return 0
+
+    path = args.case
+    if path is None:
+        cases = store.cases()
+        if not cases:
+            print(f"No captured cases in {store.root}", file=sys.stderr)
+            return 2
+        path = cases[0][0]
+    case = load_case(path)
+    print(f"Case {path}: {case['pdf']['name']} (sha256 {case['pdf']['sha256'][:12]}), "
+          f"{case['seconds']:.2f}s in the app")
+
+    if args.captured:
+        prof = os.path.join(path, "profile.prof")
+        if not os.path.exists(prof):
+            print("This case was saved without a profile.", file=sys.stderr)
+            return 2
+        print(top_functions(prof, args.top, args.sort))
+        return 0
+
+    profile = cProfile.Profile()
+    try:
+        if not args.cold:
+            # Lazy imports (PyMuPDF, pandas internals) would top the table
+            replay_case(path)
+        start = time.perf_counter()
+        file_name, csv_bytes = replay_case(path, profile)
+    except Exception as e:
+        print(f"Replay failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Replayed in {time.perf_counter() - start:.2f}s → {file_name}")
+
+    expected = case.get("output")
+    if expected:
+        same = hashlib.sha256(csv_bytes).hexdigest() == expected["sha256"]
+        print("Output matches the captured DATAFILE." if same else
+              "Output differs from the captured DATAFILE (edits made in the preview editor are not replayed).")
+
+    if args.save:
+        profile.dump_stats(args.save)
+        print(f"→ {args.save}")
+    print(top_functions(profile, args.top, args.sort))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# pepco_reader.py
+# One reader per uploaded PDF — open once, page text lazily extracted + memoized
+# Order-ID prescan (page 1 only) আর full extraction একই reader share করে,
+# তাই একই upload দুইবার open / parse হয় না।
+# ব্যবহার:
+#   from pepco_reader import PdfDocument
+#   with PdfDocument.from_upload(uploaded_file) as doc:
+#       page1 = doc[0]          # শুধু page 1 extract হয়
+#       for txt in doc: ...     # বাকি page দরকার হলে তখন
+#       doc.page_words(2)       # word box — শুধু split-cell table page-এ
+#   PdfDocument.from_upload(f, sha256=known)   # আগে হিসাব করা hash → আবার hash হয় না
+
+from __future__ import annotations
+
+import hashlib
+
+__all__ = ["PdfDocument", "as_document"]
+
+
+class PdfDocument:
+    """Lazy, memoized page-text view over raw PDF bytes."""
+
+    def __init__(self, raw: bytes, name: str = "", sha256: str | None = None) -> None:
+        self.raw = raw or b""
+        self.name = name
+        self._doc = None
+        self._page_count = None
+        self._texts: dict[int, str] = {}
+        self._sha256 = sha256
+
+    @classmethod
+    def from_upload(cls, file, sha256: str | None = None) -> "PdfDocument":
+        """Read bytes of an uploaded / opened file, restoring its position (sha256: if already known)."""
+        pos = None
+        try:
+            pos = file.tell()
+        except Exception:
+            pass
+
+        try:
+            file.seek(0)
+        except Exception:
+            pass
+
+        raw = file.read()
+
+        try:
+            file.seek(0 if pos is None else pos)
+        except Exception:
+            pass
+
+        return cls(raw, name=getattr(file, "name", "") or "", sha256=sha256)
+
+    # ---------- Identity ----------
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.raw).hexdigest()
+        return self._sha256
+
+    # ---------- Pages ----------
+    def _open(self):
+        if self._doc is None:
+            import fitz  # PyMuPDF
+
+            self._doc = fitz.open(stream=self.raw, filetype="pdf")
+            self._page_count = len(self._doc)
+        return self._doc
+
+    def __bool__(self) -> bool:
+        # Truthiness must not force opening the PDF (len() would)
+        return bool(self.raw)
+
+    def __len__(self) -> int:
+        if self._page_count is None:
+            self._open()
+        return self._page_count
+
+    def page_text(self, index: int) -> str:
+        """Text of one page, extracted on first access only."""
+        if index < 0:
+            index += len(self)
+        if index not in self._texts:
+            self._texts[index] = self._open()[index].get_text()
+        return self._texts[index]
+
+    def page_words(self, index: int) -> list:
+        """Word boxes (x0, y0, x1, y1, word, block, line, word_no) of one page; not memoized."""
+        if index < 0:
+            index += len(self)
+        return self._open()[index].get_text("words")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.page_text(i) for i in range(*index.indices(len(self)))]
+        return self.page_text(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.page_text(i)
+
+    def texts(self) -> list:
+        """Every page's text if already extracted, else None (nothing new is read)."""
+        return [self._texts.get(i) for i in range(len(self))]
+
+    @property
+    def pages_extracted(self) -> int:
+        """How many pages have actually been text-extracted."""
+        return len(self._texts)
+
+    # ---------- Lifecycle ----------
+    def close(self) -> None:
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def as_document(file_or_doc) -> PdfDocument:
+    """Wrap an uploaded/opened file unless it already is a PdfDocument."""
+    if isinstance(file_or_doc, PdfDocument):
+        return file_or_doc
+    return PdfDocument.from_upload(file_or_doc)
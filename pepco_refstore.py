@@ -0,0 +1,76 @@
+# pepco_refstore.py
+# Reference data — process-এ একবার build, সব session একই read-only object share করে
+#   - snapshot version (sha256) প্রতি একবার build: PriceLadder, ProductCatalog, MaterialTable
+#   - loader-রা object-টাই ফেরত দেয় (st.cache_data-র মতো pickle / deep copy নেই) →
+#     session সংখ্যা বাড়লেও memory একই থাকে
+#   - refresh-এ নতুন version পুরো build হওয়ার পরে একবারে swap হয়; পুরনো object যে
+#     session হাতে রেখেছে তার কাছে সেটা অপরিবর্তিত থাকে
+# ব্যবহার:
+#   store = ReferenceStore(snapshots, REFERENCE_BUILDERS)
+#   ladder = store.get("prices")            # shared PriceLadder (None: sheet has no PLN)
+#   store.status()                          # {name: {"sha256", "build_ms"}}
+#
+# Shared objects are never mutated after build: ProductCatalog / MaterialTable
+# hand out tuples, PriceLadder.row() returns a copy.
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import NamedTuple
+
+__all__ = ["SharedReference", "ReferenceStore"]
+
+
+class SharedReference(NamedTuple):
+    """One built reference object and the snapshot version it came from."""
+    name: str
+    sha256: str
+    value: object
+    build_ms: float
+
+
+class ReferenceStore:
+    """Built reference objects, one per snapshot version, shared by every caller."""
+
+    def __init__(self, snapshots, builders: dict | None = None) -> None:
+        self.snapshots = snapshots
+        self.builders = dict(builders or {})
+        self._build_lock = threading.Lock()
+        self._current: dict[str, SharedReference] = {}
+
+    def get(self, name: str):
+        """Shared object for the current snapshot; parse / build errors re-raised."""
+        snap = self.snapshots.get(name)
+        if snap is None:
+            raise ValueError(f"{name} sheet unreachable and no local snapshot yet")
+
+        entry = self._current.get(name)
+        if entry is None or entry.sha256 != snap.sha256:
+            entry = self._build(name, snap.sha256)
+        return entry.value
+
+    def _build(self, name, sha256) -> SharedReference:
+        # One build per version even when many sessions ask at once
+        with self._build_lock:
+            entry = self._current.get(name)
+            if entry is not None and entry.sha256 == sha256:
+                return entry
+
+            start = time.perf_counter()
+            value = self.snapshots.parsed(name)
+            builder = self.builders.get(name)
+            if builder is not None:
+                value = builder(value)
+            entry = SharedReference(name, sha256, value, (time.perf_counter() - start) * 1000)
+
+            # Atomic swap: readers see the old dict or the new one, never a mix
+            self._current = {**self._current, name: entry}
+            return entry
+
+    def status(self) -> dict:
+        """{name: {"sha256", "build_ms"}} of the objects currently shared."""
+        return {
+            name: {"sha256": entry.sha256[:12], "build_ms": entry.build_ms}
+            for name, entry in self._current.items()
+        }
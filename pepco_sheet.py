@@ -0,0 +1,105 @@
+# pepco_sheet.py
+# Columnar DATAFILE sheet — document-level field একবার, প্রতি SKU শুধু SKU + barcode
+#   - Order_ID, Style, Supplier, Collection, Batch, Season, today_date ... আর enrich /
+#     price stage-এর column (Dept, product_name, washing_code, currency) সব field
+#     হিসেবে একবার রাখা; SKU / barcode tuple (row প্রতি dict / DataFrame নেই)
+#   - Colour_SKU ("{Colour} • SKU {sku}") আর barcode row column; বাকি সব column
+#     materialize-এর সময় broadcast হয়
+#   - immutable: with_fields() / without() নতুন sheet দেয়, SKU tuple share করে →
+#     memoized stage-এর আগে copy লাগে না
+#   - DataFrame শুধু editor-এর জন্য (to_frame); CSV export সরাসরি column থেকে
+# ব্যবহার:
+#   sheet = SheetModel(fields, skus, barcodes)
+#   sheet = sheet.with_fields(Dept="BB", washing_code="9")
+#   sheet["Style"], len(sheet), sheet.column("Colour_SKU")
+#   df = sheet.to_frame(final_cols)            # st.data_editor
+#   write_datafile_csv(sheet, final_cols, fh)   # pepco_export, DataFrame ছাড়া
+
+from __future__ import annotations
+
+from types import MappingProxyType
+
+__all__ = ["ROW_COLUMNS", "SheetModel"]
+
+# Columns with one value per SKU; every other column is a document-level field
+ROW_COLUMNS = ("Colour_SKU", "barcode")
+
+
+class SheetModel:
+    """One data sheet: document-level fields once + per-SKU sku / barcode tuples."""
+
+    __slots__ = ("_fields", "skus", "barcodes")
+
+    def __init__(self, fields, skus, barcodes) -> None:
+        skus, barcodes = tuple(skus), tuple(barcodes)
+        if len(skus) != len(barcodes):
+            raise ValueError(f"{len(skus)} SKUs but {len(barcodes)} barcodes")
+        self._fields = dict(fields)
+        self.skus = skus
+        self.barcodes = barcodes
+
+    # ---------- Fields ----------
+    @property
+    def fields(self):
+        """Read-only view of the document-level fields."""
+        return MappingProxyType(self._fields)
+
+    @property
+    def columns(self) -> tuple:
+        """Field names in insertion order, then the per-SKU columns."""
+        return (*self._fields, *ROW_COLUMNS)
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def __contains__(self, name) -> bool:
+        return name in self._fields or name in ROW_COLUMNS
+
+    def __getitem__(self, name):
+        return self._fields[name]
+
+    def get(self, name, default=None):
+        return self._fields.get(name, default)
+
+    def with_fields(self, **fields) -> SheetModel:
+        """New sheet with fields set / replaced; SKU tuples are shared."""
+        return self._derive({**self._fields, **fields})
+
+    def without(self, *names) -> SheetModel:
+        """New sheet without the given fields (missing ones ignored)."""
+        if not any(name in self._fields for name in names):
+            return self
+        return self._derive({k: v for k, v in self._fields.items() if k not in names})
+
+    def _derive(self, fields) -> SheetModel:
+        sheet = SheetModel.__new__(SheetModel)
+        sheet._fields = fields
+        sheet.skus = self.skus
+        sheet.barcodes = self.barcodes
+        return sheet
+
+    # ---------- Materialization ----------
+    def column(self, name, start: int = 0, stop: int | None = None) -> list:
+        """Values of one column for rows [start, stop); unknown names → ""."""
+        if name == "barcode":
+            return list(self.barcodes[start:stop])
+        if name == "Colour_SKU":
+            colour = self._fields.get("Colour")
+            return [f"{colour} • SKU {sku}" for sku in self.skus[start:stop]]
+        value = self._fields.get(name, "")
+        return [value] * len(self.skus[start:stop])
+
+    def records(self) -> list:
+        """One dict per SKU (legacy row layout)."""
+        names = self.columns
+        return [dict(zip(names, row)) for row in zip(*(self.column(name) for name in names))]
+
+    def to_frame(self, columns=None):
+        """pandas DataFrame with the given columns (default: all)."""
+        import pandas as pd
+
+        columns = list(columns if columns is not None else self.columns)
+        return pd.DataFrame({name: self.column(name) for name in columns}, columns=columns)
+
+    def __repr__(self) -> str:
+        return f"SheetModel({self._fields.get('Style')!r}, {len(self)} SKUs)"
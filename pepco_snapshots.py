@@ -0,0 +1,328 @@
+# pepco_snapshots.py
+# Google Sheets reference data → local SQLite snapshot (prices, translations, materials)
+# App শুরু হয় local snapshot থেকে (network ছাড়াই), পিছনে background thread
+# conditional request (ETag / Last-Modified, নাহলে content hash) দিয়ে refresh করে।
+# Refresh fail করলে পুরনো (stale) snapshot-ই serve হয়। Parse error বা খালি sheet
+# (শুধু header / কোনো row নেই) ভালো snapshot-এর জায়গা নেয় না।
+# ব্যবহার:
+#   snaps = ReferenceSnapshots("ref.sqlite3", {"prices": url, ...}, parsers={"prices": fn})
+#   snaps.start()                       # background refresh
+#   snap = snaps.get("prices")          # Snapshot(body=b"...csv...", sha256=..., ...)
+#   data = snaps.parsed("prices")       # fn(body), parsed off the script thread
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+__all__ = ["Snapshot", "SnapshotStore", "ReferenceSnapshots"]
+
+
+class Snapshot(NamedTuple):
+    """One stored version of a reference sheet (raw CSV bytes)."""
+    name: str
+    version: int
+    sha256: str
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    checked_at: float
+
+
+def _is_empty(parsed) -> bool:
+    """Parsed sheet with nothing in it (None, empty DataFrame / dict / table)."""
+    if parsed is None:
+        return True
+    empty = getattr(parsed, "empty", None)
+    if isinstance(empty, bool):
+        return empty
+    try:
+        return len(parsed) == 0
+    except TypeError:
+        return False
+
+
+# ================================================================
+#  SQLITE STORE
+# ================================================================
+class SnapshotStore:
+    """Latest snapshot per dataset in a local SQLite file."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS snapshots (
+            name          TEXT PRIMARY KEY,
+            version       INTEGER NOT NULL,
+            sha256        TEXT NOT NULL,
+            body          BLOB NOT NULL,
+            etag          TEXT,
+            last_modified TEXT,
+            fetched_at    REAL NOT NULL,
+            checked_at    REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(self._SCHEMA)
+
+    def _connect(self):
+        # One short-lived connection per call → safe from any thread
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, name: str) -> Snapshot | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT name, version, sha256, body, etag, last_modified, fetched_at, checked_at "
+                "FROM snapshots WHERE name = ?",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Snapshot(row[0], row[1], row[2], bytes(row[3]), *row[4:])
+
+    def put(self, name, body, etag=None, last_modified=None) -> Snapshot:
+        """Store a new body (version + 1) in one transaction."""
+        now = time.time()
+        sha = hashlib.sha256(body).hexdigest()
+        with self._connect() as conn:
+            row = conn.execute("SELECT version FROM snapshots WHERE name = ?", (name,)).fetchone()
+            version = (row[0] if row else 0) + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots "
+                "(name, version, sha256, body, etag, last_modified, fetched_at, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, version, sha, sqlite3.Binary(body), etag, last_modified, now, now),
+            )
+        return Snapshot(name, version, sha, body, etag, last_modified, now, now)
+
+    def touch(self, name, etag=None, last_modified=None) -> None:
+        """Record a successful 'not modified' check."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE snapshots SET checked_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                "WHERE name = ?",
+                (time.time(), etag, last_modified, name),
+            )
+
+
+# ================================================================
+#  REFRESHING SNAPSHOT MANAGER
+# ================================================================
+class ReferenceSnapshots:
+    """
+    Current snapshots (+ their parsed form) backed by SnapshotStore.
+    Refresh fetches every sheet concurrently through a ReferenceFetcher
+    and parses in its worker threads; a new version is swapped in only
+    after it parsed cleanly.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        sources: dict,
+        parsers: dict | None = None,
+        refresh_interval: float = 600,
+        fetcher=None,
+    ) -> None:
+        self.store = SnapshotStore(db_path)
+        self.sources = dict(sources)
+        self.parsers = dict(parsers or {})
+        self.refresh_interval = refresh_interval
+
+        if fetcher is None:
+            from pepco_fetch import ReferenceFetcher
+            fetcher = ReferenceFetcher()
+        self.fetcher = fetcher
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Start from whatever is on disk (instant, no network)
+        self._current = {}
+        self._parsed = {}     # name → (sha256, parsed object | exception)
+        self._errors = {}
+        self._timings = {}
+        for name in self.sources:
+            snap = self.store.get(name)
+            if snap is not None:
+                self._current[name] = snap
+
+    # ---------- Read ----------
+    def get(self, name: str) -> Snapshot | None:
+        """Current snapshot; fetched synchronously only if none exists yet."""
+        snap = self._current.get(name)
+        if snap is None:
+            # Cold start → fetch every missing sheet at once, not one by one
+            missing = [n for n in self.sources if n not in self._current]
+            self.refresh_many(missing)
+            snap = self._current.get(name)
+        return snap
+
+    def parsed(self, name: str):
+        """Parsed form of the current snapshot (parse errors re-raised)."""
+        snap = self.get(name)
+        if snap is None:
+            return None
+
+        entry = self._parsed.get(name)
+        if entry is None or entry[0] != snap.sha256:
+            entry = (snap.sha256, self._parse(name, snap.body))
+            with self._lock:
+                self._parsed[name] = entry
+
+        if isinstance(entry[1], Exception):
+            raise entry[1]
+        return entry[1]
+
+    def _parse(self, name, body):
+        parser = self.parsers.get(name)
+        if parser is None:
+            return body
+        start = time.perf_counter()
+        try:
+            return parser(body)
+        except Exception as e:
+            return e
+        finally:
+            self._timings.setdefault(name, {})["parse_ms"] = (time.perf_counter() - start) * 1000
+
+    def status(self) -> dict:
+        """{name: {version, sha256, bytes, fetched_at, checked_at, fetch_ms, parse_ms, error}}"""
+        out = {}
+        for name in self.sources:
+            snap = self._current.get(name)
+            timings = self._timings.get(name, {})
+            out[name] = {
+                "version": snap.version if snap else None,
+                "sha256": snap.sha256[:12] if snap else None,
+                "bytes": len(snap.body) if snap else 0,
+                "fetched_at": snap.fetched_at if snap else None,
+                "checked_at": snap.checked_at if snap else None,
+                "fetch_ms": timings.get("fetch_ms"),
+                "parse_ms": timings.get("parse_ms"),
+                "error": self._errors.get(name),
+            }
+        return out
+
+    # ---------- Refresh ----------
+    def refresh(self, name: str) -> str:
+        """Conditional refresh of one dataset → updated / not_modified / unchanged / failed."""
+        return self.refresh_many([name])[name]
+
+    def refresh_all(self) -> dict:
+        return self.refresh_many(list(self.sources))
+
+    def refresh_many(self, names) -> dict:
+        """Concurrent conditional refresh of several datasets."""
+        with self._refresh_lock:
+            jobs = {}
+            for name in names:
+                current = self._current.get(name)
+                headers = {}
+                if current is not None:
+                    if current.etag:
+                        headers["If-None-Match"] = current.etag
+                    if current.last_modified:
+                        headers["If-Modified-Since"] = current.last_modified
+                jobs[name] = (self.sources[name], headers)
+
+            results = self.fetcher.fetch_all(jobs, parsers=self.parsers)
+            return {name: self._apply(name, result) for name, result in results.items()}
+
+    def _apply(self, name, result) -> str:
+        timings = self._timings.setdefault(name, {})
+        timings["fetch_ms"] = result.fetch_seconds * 1000
+        if result.parse_seconds:
+            timings["parse_ms"] = result.parse_seconds * 1000
+
+        current = self._current.get(name)
+
+        if result.status is None:
+            self._errors[name] = result.error
+            return "failed"
+
+        etag = result.headers.get("ETag")
+        last_modified = result.headers.get("Last-Modified")
+
+        if result.status == 304 and current is not None:
+            return self._mark_checked(name, current, etag, last_modified, "not_modified")
+
+        if not result.body:
+            self._errors[name] = "empty response"
+            return "failed"
+
+        if current is not None and hashlib.sha256(result.body).hexdigest() == current.sha256:
+            return self._mark_checked(name, current, etag, last_modified, "unchanged")
+
+        # Broken or emptied sheet never replaces a good snapshot
+        if current is not None:
+            if result.error:
+                self._errors[name] = result.error
+                return "failed"
+            if name in self.parsers and _is_empty(result.parsed):
+                self._errors[name] = "sheet has no data rows"
+                return "failed"
+
+        snap = self.store.put(name, result.body, etag, last_modified)
+        parsed = result.parsed if not result.error else ValueError(result.error)
+        with self._lock:
+            self._current[name] = snap  # atomic swap
+            if name in self.parsers:
+                self._parsed[name] = (snap.sha256, parsed)
+            self._errors[name] = result.error
+        return "updated"
+
+    def _mark_checked(self, name, current, etag, last_modified, result) -> str:
+        self.store.touch(name, etag, last_modified)
+        with self._lock:
+            self._current[name] = current._replace(
+                checked_at=time.time(),
+                etag=etag or current.etag,
+                last_modified=last_modified or current.last_modified,
+            )
+            self._errors.pop(name, None)
+        return result
+
+    # ---------- Background thread ----------
+    def start(self) -> None:
+        """Refresh every refresh_interval seconds on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="pepco-reference-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        # Parse disk snapshots here so the script thread finds them ready
+        for name in list(self._current):
+            try:
+                self.parsed(name)
+            except Exception:
+                pass
+
+        if self.refresh_interval <= 0:
+            return
+
+        while not self._stop.is_set():
+            self.refresh_all()
+            self._stop.wait(self.refresh_interval)
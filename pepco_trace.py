@@ -0,0 +1,294 @@
+# pepco_trace.py
+# Pipeline stage spans — wall time + tracemalloc peak
+#   - বন্ধ থাকলে span() একটা shared no-op ফেরত দেয় (প্রায় শূন্য overhead)
+#   - শেষ হওয়া span → recent buffer (debug panel) + JSON-lines log
+#   - stage প্রতি count / sum / max → Prometheus text file (textfile collector)
+#   - nested span: ভেতরের span-এর peak বাইরের span-এর peak-এও ধরা হয়
+#   - tracemalloc process-wide — একসাথে চলা thread-এর allocation-ও peak-এ আসে
+# Env: PEPCO_TRACE=1, PEPCO_TRACE_MEMORY=0 (শুধু সময়), PEPCO_TRACE_LOG=spans.jsonl,
+#      PEPCO_TRACE_PROM=pepco.prom
+# ব্যবহার:
+#   with TRACER.span("pdf.text", pages=6):
+#       ...
+#   @traced("enrich")
+#   def enrich_sheet(...): ...
+#   TRACER.flush()          # Prometheus file (throttled)
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from functools import wraps
+
+__all__ = ["Tracer", "TRACER", "traced"]
+
+
+class _NoSpan:
+    """Shared do-nothing span used while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attrs", "parent", "start", "mem_start", "child_peak")
+
+    def __init__(self, tracer, name, attrs) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.mem_start = None
+        self.child_peak = 0
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent = stack[-1] if stack else None
+        if self.tracer.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak() below would lose the parent's peak so far
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+
+        peak = None
+        if self.mem_start is not None and tracemalloc.is_tracing():
+            raw_peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak = max(0, raw_peak - self.mem_start)
+            if self.parent is not None:
+                self.parent.child_peak = max(self.parent.child_peak, raw_peak)
+
+        self.tracer._record(self, elapsed, peak, exc_type)
+        return False
+
+
+class Tracer:
+    """Span recorder with in-memory, JSON-lines and Prometheus sinks."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        memory: bool = True,
+        log_path: str | None = None,
+        prom_path: str | None = None,
+        keep: int = 500,
+        prom_interval: float = 5.0,
+    ) -> None:
+        self.memory = memory
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self.prom_interval = prom_interval
+        self.recent = deque(maxlen=keep)
+        self.enabled = False
+
+        self._totals = {}           # name → [count, seconds, max seconds, max peak, errors]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._log = None
+        self._prom_written = 0.0
+        self._owns_tracemalloc = False
+
+        if enabled:
+            self.enable()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        return cls(
+            enabled=os.environ.get("PEPCO_TRACE", "") not in ("", "0"),
+            memory=os.environ.get("PEPCO_TRACE_MEMORY", "1") != "0",
+            log_path=os.environ.get("PEPCO_TRACE_LOG") or None,
+            prom_path=os.environ.get("PEPCO_TRACE_PROM") or None,
+        )
+
+    # ---------- On / off ----------
+    def enable(self, memory: bool | None = None) -> None:
+        if memory is not None:
+            self.memory = memory
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._owns_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._owns_tracemalloc = False
+
+    # ---------- Spans ----------
+    def span(self, name: str, **attrs):
+        """Context manager timing one stage (no-op while disabled)."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, attrs)
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, span, elapsed, peak, exc_type) -> None:
+        record = {
+            "ts": round(time.time(), 3),
+            "name": span.name,
+            "ms": round(elapsed * 1000, 3),
+            "peak_kb": None if peak is None else round(peak / 1024, 1),
+            "parent": span.parent.name if span.parent is not None else None,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if span.attrs:
+            record.update(span.attrs)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        with self._lock:
+            self.recent.append(record)
+            totals = self._totals.get(span.name)
+            if totals is None:
+                totals = self._totals[span.name] = [0, 0.0, 0.0, 0, 0]
+            totals[0] += 1
+            totals[1] += elapsed
+            totals[2] = max(totals[2], elapsed)
+            if peak is not None:
+                totals[3] = max(totals[3], peak)
+            if exc_type is not None:
+                totals[4] += 1
+            if self.log_path:
+                self._write_log(record)
+
+    def _write_log(self, record) -> None:
+        try:
+            if self._log is None:
+                folder = os.path.dirname(self.log_path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                self._log = open(self.log_path, "a", encoding="utf-8", buffering=1)
+            self._log.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            # A broken log must never break the pipeline
+            self.log_path = None
+
+    # ---------- Read side ----------
+    def summary(self):
+        """Per-stage aggregate rows (for the debug panel)."""
+        with self._lock:
+            items = sorted(self._totals.items())
+        return [
+            {
+                "stage": name,
+                "count": count,
+                "mean ms": round(seconds / count * 1000, 3) if count else 0.0,
+                "max ms": round(max_s * 1000, 3),
+                "total ms": round(seconds * 1000, 1),
+                "max peak KB": round(peak / 1024, 1),
+                "errors": errors,
+            }
+            for name, (count, seconds, max_s, peak, errors) in items
+        ]
+
+    def prometheus_text(self) -> str:
+        """Aggregates in Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._totals.items())
+
+        def _label(name):
+            return name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = [
+            "# HELP pepco_stage_duration_seconds Wall time per pipeline stage.",
+            "# TYPE pepco_stage_duration_seconds summary",
+        ]
+        for name, (count, seconds, *_rest) in items:
+            lines.append(f'pepco_stage_duration_seconds_sum{{stage="{_label(name)}"}} {seconds:.6f}')
+            lines.append(f'pepco_stage_duration_seconds_count{{stage="{_label(name)}"}} {count}')
+        lines += [
+            "# HELP pepco_stage_duration_max_seconds Slowest single run per stage.",
+            "# TYPE pepco_stage_duration_max_seconds gauge",
+        ]
+        lines += [
+            f'pepco_stage_duration_max_seconds{{stage="{_label(name)}"}} {max_s:.6f}'
+            for name, (_c, _s, max_s, _p, _e) in items
+        ]
+        lines += [
+            "# HELP pepco_stage_peak_memory_bytes Largest tracemalloc peak per stage.",
+            "# TYPE pepco_stage_peak_memory_bytes gauge",
+        ]
+        lines += [
+            f'pepco_stage_peak_memory_bytes{{stage="{_label(name)}"}} {peak}'
+            for name, (_c, _s, _m, peak, _e) in items
+        ]
+        lines += [
+            "# HELP pepco_stage_errors_total Spans that ended with an exception.",
+            "# TYPE pepco_stage_errors_total counter",
+        ]
+        lines += [
+            f'pepco_stage_errors_total{{stage="{_label(name)}"}} {errors}'
+            for name, (_c, _s, _m, _p, errors) in items
+        ]
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force: bool = False) -> bool:
+        """Rewrite the Prometheus file (atomically, at most every prom_interval s)."""
+        if not self.prom_path or not self._totals:
+            return False
+        now = time.monotonic()
+        if not force and now - self._prom_written < self.prom_interval:
+            return False
+        self._prom_written = now
+
+        tmp = f"{self.prom_path}.{os.getpid()}.tmp"
+        try:
+            folder = os.path.dirname(self.prom_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(self.prometheus_text())
+            # Scrapers must never see a half-written file
+            os.replace(tmp, self.prom_path)
+            return True
+        except OSError:
+            return False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.recent.clear()
+            self._totals.clear()
+
+
+def traced(name: str, tracer: Tracer | None = None):
+    """Decorator: run the function inside a span (plain call while disabled)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = tracer or TRACER
+            if not t.enabled:
+                return fn(*args, **kwargs)
+            with _Span(t, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+TRACER = Tracer.from_env()
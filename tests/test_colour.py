@@ -0,0 +1,90 @@
+# tests/test_colour.py
+# Colour detector worst case — benchmarks/bench_colour.py-র adversarial page দিয়ে
+#   - সময়: সবচেয়ে বড় size-এ generous budget-এর ভেতরে, আর 16x input → ≤ 32x সময়
+#   - operation count: row / pantone / fallback line test line সংখ্যার নির্দিষ্ট গুণের
+#     বেশি নয়, header যত ঘনই থাকুক (timer ছাড়া, deterministic)
+#   - equivalence / differential check: python benchmarks/bench_colour.py
+# ব্যবহার:
+#   python -m pytest -q tests/test_colour.py
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pepco_colour  # noqa: E402
+from bench_colour import ADVERSARIAL  # noqa: E402
+from pepco_colour import COLOUR_DETECTOR  # noqa: E402
+
+SMALL, LARGE = 1000, 16000
+BUDGET_MS = 250.0           # engine needs a few ms here; legacy needs seconds at n=1000
+NOISE_FLOOR = 0.2e-3        # below this, time ratios are timer noise
+
+cases = pytest.mark.parametrize("name", list(ADVERSARIAL))
+
+
+def _best_seconds(pages, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        COLOUR_DETECTOR.detect(pages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@cases
+def test_adversarial_time_is_bounded_and_linear(name):
+    make = ADVERSARIAL[name]
+    small, large = _best_seconds(make(SMALL)), _best_seconds(make(LARGE))
+    assert large * 1000 < BUDGET_MS, f"{name}: {large * 1000:.1f} ms at n={LARGE}"
+    growth = LARGE / SMALL
+    assert large / max(small, NOISE_FLOOR) <= 2 * growth, (
+        f"{name}: {growth:.0f}x input took {large / max(small, NOISE_FLOOR):.0f}x time"
+    )
+
+
+class _Counting:
+    """Wraps a function or compiled pattern and counts calls."""
+
+    def __init__(self, target) -> None:
+        self.target = target
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.target(*args)
+
+    def match(self, *args):
+        self.calls += 1
+        return self.target.match(*args)
+
+
+@cases
+def test_adversarial_operation_count(name, monkeypatch):
+    counters = {
+        attr: _Counting(getattr(pepco_colour, attr))
+        for attr in ("_row_name", "_PANTONE", "_line_has_pantone_row")
+    }
+    for attr, counter in counters.items():
+        monkeypatch.setattr(pepco_colour, attr, counter)
+
+    pages = ADVERSARIAL[name](LARGE)
+    COLOUR_DETECTOR.detect(pages)
+
+    lines = sum(len(page.splitlines()) for page in pages) + 1
+    calls = {attr: counter.calls for attr, counter in counters.items()}
+    # Each line is a row candidate at most once per header strategy (Colour,
+    # Purchase price) however many headers overlap — rescanning the window
+    # after every header would be lines x HEADER_WINDOW; the pantone test runs
+    # once in the window loop and once inside _row_name; the fallback tests
+    # each line once. Work inside one long line is covered by the timing test.
+    assert calls["_row_name"] <= 2 * lines, f"{name}: {calls} for {lines} lines"
+    assert calls["_PANTONE"] <= 4 * lines, f"{name}: {calls} for {lines} lines"
+    assert calls["_line_has_pantone_row"] <= lines, f"{name}: {calls} for {lines} lines"
@@ -0,0 +1,57 @@
+# tests/test_layout.py
+# Layout fingerprint — page count + page-1 identifier labels (ক্রম / title / Style লাগে না)
+# ব্যবহার:
+#   python -m pytest -q tests/test_layout.py
+
+from __future__ import annotations
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pepco_layout import REQUIRED_FIELDS, fingerprint_page, identify_layout  # noqa: E402
+
+PAGE1 = [
+    "Merch code ........ BB/12",
+    "Season ........ SS 26",
+    "Collection ........ CROCO CLUB - summer",
+    "Handover date ........ 15/03/2026",
+    "Order - ID ........ 4500123_AB",
+    "Item classification ........ Baby Boys Outerwear",
+    "Supplier product code ........ SP-001",
+    "Supplier name ........ ACME TEXTILES LTD",
+]
+
+
+class _Doc(list):
+    """Page texts with the len / [0] access identify_layout needs."""
+
+
+def test_labels_in_any_order_without_title_or_style():
+    page = "\n".join(["654321   Version 3"] + PAGE1[::-1])
+    fingerprint, layout = identify_layout(_Doc([page] + [""] * 5))
+    assert fingerprint.complete
+    assert layout.name == "6-page"
+    assert identify_layout(_Doc([page] + [""] * 4))[1].name == "5-page"
+
+
+def test_missing_label_falls_back():
+    page = "\n".join(line for line in PAGE1 if not line.startswith("Order"))
+    fingerprint, layout = identify_layout(_Doc([page] + [""] * 5))
+    assert layout is None
+    assert fingerprint.missing == ("order_id",)
+    assert fingerprint.key == "6p|missing order_id"
+
+
+def test_label_needs_dotted_leader():
+    # "Season" in running text is not the identifier label
+    page = "\n".join(PAGE1[:1] + ["Season: SS 26"] + PAGE1[2:])
+    assert fingerprint_page(6, page).missing == ("season",)
+
+
+def test_unknown_page_count_falls_back():
+    fingerprint, layout = identify_layout(_Doc(["\n".join(PAGE1)] + [""] * 6))
+    assert fingerprint.complete and layout is None
+    assert fingerprint_page(0, "").missing == REQUIRED_FIELDS
@@ -0,0 +1,53 @@
+# tests/test_prices.py
+# PriceLadder bulk lookup (resolve_many / lookup_many) == scalar resolve / lookup
+#   - random PLN (seeded), ladder value, ঠিক মাঝখানের tie, ladder-এর নিচে / উপরে,
+#     string ("29,99"), NaN / inf / non-numeric — প্রতিটা match mode-এ
+# ব্যবহার:
+#   python -m pytest -q tests/test_prices.py
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pepco_prices import PRICE_MATCH_MODES, PriceLadder  # noqa: E402
+
+# Unsorted, with a repeated tier and a short currency column (last row unusable)
+PRICE_DATA = {
+    "PLN": [29.99, 9.99, 19.99, 29.99, 49.99, 39.99, 59.99],
+    "EUR": [7.49, 2.5, 4.99, 7.5, 12.49, 9.99, 14.99],
+    "HUF": [2999, 999, 1999, 3000, 4999, 3999],
+}
+
+
+def _values():
+    rng = random.Random(20260301)
+    ladder = sorted(set(PRICE_DATA["PLN"]))
+    values = [rng.uniform(0, 80) for _ in range(500)]
+    values += ladder
+    values += [(a + b) / 2 for a, b in zip(ladder, ladder[1:])]       # ties → lower tier
+    values += [0, -5.0, 1e9, "29,99", "19.99", "abc", None, ""]
+    values += [float("nan"), float("inf"), float("-inf"), "nan", "inf"]
+    return values
+
+
+@pytest.mark.parametrize("mode", PRICE_MATCH_MODES)
+def test_resolve_many_matches_resolve(mode):
+    ladder = PriceLadder(PRICE_DATA)
+    values = _values()
+    assert ladder.resolve_many(values, mode) == [ladder.resolve(v, mode) for v in values]
+    assert ladder.lookup_many(values, mode) == [ladder.lookup(v, mode) for v in values]
+
+
+@pytest.mark.parametrize("mode", PRICE_MATCH_MODES)
+def test_non_finite_never_matches(mode):
+    ladder = PriceLadder(PRICE_DATA)
+    values = [float("nan"), float("inf"), float("-inf"), "nan", "-inf"]
+    assert [ladder.resolve(v, mode) for v in values] == [None] * len(values)
+    assert ladder.resolve_many(values, mode) == [None] * len(values)
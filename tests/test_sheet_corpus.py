@@ -0,0 +1,140 @@
+# tests/test_sheet_corpus.py
+# Synthetic sheet corpus (benchmarks/sheet_factory.py) — parse + DATAFILE correctness
+#   - প্রতিটা DEFAULT_CORPUS variant (split size table সহ): document field, colour,
+#     SKU / barcode pair (spec থেকে হিসাব করা), layout fast path == generic path
+#   - DATAFILE CSV bytes: stdlib csv.writer (';', QUOTE_ALL, UTF-8 BOM) এর সাথে
+#     byte-identical, প্রতিটা row-এ ঠিক SKU / barcode
+#   - timing আলাদা: benchmarks/bench_pipeline.py
+# ব্যবহার:
+#   python -m pytest -q tests
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import sys
+from functools import lru_cache
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import pepco_core as core  # noqa: E402
+from bench_pipeline import VALID_ROWS, reference_data  # noqa: E402
+from pepco_reader import PdfDocument  # noqa: E402
+from sheet_factory import DEFAULT_CORPUS, SheetSpec, ean13, make_sheet  # noqa: E402
+
+TODAY = "01-03-2026"
+
+# Colour as the detector reads each variant today: (colour_layout, pantone, merged_rows) → value.
+# Merged rows and loose lines keep their label / row text; a change here is a behaviour change.
+EXPECTED_COLOUR = {
+    ("table", True, False): "NAVY",
+    ("table", True, True): "COLOUR NAVY 19-4024 TCX 56 | {sku} |",
+    ("table", False, False): None,
+    ("purchase", True, False): "NAVY",
+    ("purchase", True, True): None,
+    ("purchase", False, False): None,
+    ("loose", True, False): "MAIN COLOUR: NAVY 19-4024",
+    ("loose", True, True): None,
+    ("loose", False, False): None,
+}
+
+
+@lru_cache(maxsize=None)
+def parsed_sheet(spec: SheetSpec):
+    """(fast-path result, generic parse_pdf_pages result) for one rendered spec."""
+    doc = PdfDocument(make_sheet(spec), name=f"{spec.name}.pdf")
+    try:
+        fast = core.parse_pdf_document(doc)
+        generic = core.parse_pdf_pages(list(doc), doc.page_words)
+    finally:
+        doc.close()
+    return fast, generic
+
+
+def expected_pairs(spec):
+    skus = [str(spec.sku_base + i) for i in range(spec.skus)]
+    return skus, [ean13(spec.barcode_base + i) for i in range(spec.skus)]
+
+
+corpus = pytest.mark.parametrize("spec", DEFAULT_CORPUS, ids=lambda spec: spec.name)
+
+
+@corpus
+def test_document_fields(spec):
+    fast, _ = parsed_sheet(spec)
+    parsed = fast["parsed"]
+    assert fast["layout"]["name"] == f"{spec.pages}-page"
+    assert parsed["Order_ID"] == spec.order_id
+    assert parsed["Style"] == spec.style
+    assert parsed["Supplier_product_code"] == "SP-001"
+    assert parsed["Supplier_name"] == "ACME TEXTILES LTD"
+    assert parsed["Item_classification"] == spec.item_class
+    assert parsed["Item_name_EN"] == spec.item_name
+    assert parsed["Season"] == "SS26"
+    assert parsed["Style_Merch_Season"] == f"STYLE {spec.style} • BB/1226 • Batch No./"
+    assert parsed["Batch"] == "Data e prodhimit: 022026"
+
+    colour = EXPECTED_COLOUR[spec.colour_layout, spec.pantone, spec.merged_rows]
+    assert parsed["Colour"] == (colour.format(sku=spec.sku_base) if colour else None)
+
+
+@corpus
+def test_sku_barcode_pairs(spec):
+    parsed = parsed_sheet(spec)[0]["parsed"]
+    skus, barcodes = expected_pairs(spec)
+    assert parsed["skus"] == skus
+    assert parsed["barcodes"] == barcodes
+    assert parsed["unmatched_skus"] == [] and parsed["unmatched_barcodes"] == []
+    assert parsed["pairing"] == ("boxes" if spec.table_cells else "rows")
+    # carton label on the packing page is never a product barcode
+    assert ean13(590999999999) not in parsed["barcodes"]
+
+
+@corpus
+def test_layout_fast_path_matches_generic(spec):
+    fast, generic = parsed_sheet(spec)
+    assert fast["parsed"] == generic
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return reference_data()
+
+
+def _reference_csv(rows, columns) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", quoting=csv.QUOTE_ALL)
+    writer.writerow(columns)
+    writer.writerows([row.get(col, "") for col in columns] for row in rows)
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+@corpus
+def test_datafile_csv(spec, reference):
+    template, materials, ladder = reference
+    parsed = parsed_sheet(spec)[0]["parsed"]
+    colour = parsed["Colour"] or "UNKNOWN"
+
+    sheet = core.build_sheet(parsed, colour, parsed["skus"], parsed["barcodes"]).with_fields(today_date=TODAY)
+    sheet = core.enrich_sheet(sheet, template, VALID_ROWS, materials, "9")
+    match = core.resolve_price_tier(29.99, ladder)
+    sheet, columns = core.finalize_sheet(sheet, match.values, match.pln)
+    data = core.build_datafile_csv(sheet, columns)
+
+    assert data == _reference_csv(sheet.records(), columns)
+
+    header, *rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig")), delimiter=";"))
+    assert header == columns
+    skus, barcodes = expected_pairs(spec)
+    assert [row[columns.index("Colour_SKU")] for row in rows] == [f"{colour} • SKU {sku}" for sku in skus]
+    assert [row[columns.index("barcode")] for row in rows] == barcodes
+    for row in rows:
+        assert row[columns.index("Order_ID")] == spec.order_id
+        assert row[columns.index("today_date")] == TODAY
+        assert row[columns.index("PLN")] == "29,99"
+        assert row[columns.index("EUR")] == "7,49"